@@ -0,0 +1,367 @@
+"""baseline schema
+
+Schema as created by Base.metadata.create_all before migrations were
+introduced. Tables and indexes are created only if missing, so a database
+that predates migrations upgrades in place; its whoop_daily also gains the
+typed WHOOP columns (filled by python -m app.services.whoop_raw).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 23:46:47.030537
+
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0001'
+down_revision: str | None = None
+branch_labels: str | tuple[str, ...] | None = None
+depends_on: str | tuple[str, ...] | None = None
+
+WHOOP_TYPED_COLUMNS = (
+    ('sleep_light_minutes', sa.Integer),
+    ('sleep_deep_minutes', sa.Integer),
+    ('sleep_rem_minutes', sa.Integer),
+    ('sleep_awake_minutes', sa.Integer),
+    ('respiratory_rate', sa.Float),
+    ('spo2_percentage', sa.Float),
+    ('skin_temp_celsius', sa.Float),
+)
+
+
+def upgrade() -> None:
+    op.create_table('daily_feature',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('features', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('date'),
+    if_not_exists=True
+    )
+    op.create_table('exercise',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=128), nullable=False),
+    sa.Column('exercise_type', sa.String(length=16), nullable=False),
+    sa.Column('muscle_group', sa.String(length=64), nullable=False),
+    sa.Column('equipment', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('nutrition_daily',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('calories', sa.Integer(), nullable=False),
+    sa.Column('protein_g', sa.Float(), nullable=False),
+    sa.Column('fat_g', sa.Float(), nullable=False),
+    sa.Column('carbs_g', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('date'),
+    if_not_exists=True
+    )
+    op.create_table('pipeline_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('trigger', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('stages', sa.JSON(), nullable=False),
+    sa.Column('error', sa.String(length=512), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('recommendation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('type', sa.String(length=32), nullable=False),
+    sa.Column('message', sa.String(length=512), nullable=False),
+    sa.Column('confidence_score', sa.Float(), nullable=False),
+    sa.Column('model_version', sa.String(length=64), nullable=False),
+    sa.Column('explanation_json', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('telegram_message',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('chat_id', sa.String(length=64), nullable=False),
+    sa.Column('text', sa.String(length=4096), nullable=False),
+    sa.Column('reply_markup', sa.JSON(), nullable=True),
+    sa.Column('edit_of_id', sa.Integer(), nullable=True),
+    sa.Column('topic', sa.String(length=64), nullable=True),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('telegram_message_id', sa.BigInteger(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(length=512), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['edit_of_id'], ['telegram_message.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_telegram_message_topic'), 'telegram_message', ['topic'], unique=False, if_not_exists=True)
+    op.create_table('telegram_update',
+    sa.Column('update_id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('update_id'),
+    if_not_exists=True
+    )
+    op.create_table('training_program',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=128), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('height_cm', sa.Float(), nullable=True),
+    sa.Column('weight_current_kg', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('user_goal',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('goal_type', sa.String(length=16), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('priority_muscle_groups', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('whoop_daily',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hrv', sa.Float(), nullable=True),
+    sa.Column('resting_heart_rate', sa.Float(), nullable=True),
+    sa.Column('recovery_score', sa.Float(), nullable=True),
+    sa.Column('strain', sa.Float(), nullable=True),
+    sa.Column('sleep_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('sleep_efficiency', sa.Float(), nullable=True),
+    sa.Column('body_weight_kg', sa.Float(), nullable=True),
+    sa.Column('sleep_light_minutes', sa.Integer(), nullable=True),
+    sa.Column('sleep_deep_minutes', sa.Integer(), nullable=True),
+    sa.Column('sleep_rem_minutes', sa.Integer(), nullable=True),
+    sa.Column('sleep_awake_minutes', sa.Integer(), nullable=True),
+    sa.Column('respiratory_rate', sa.Float(), nullable=True),
+    sa.Column('spo2_percentage', sa.Float(), nullable=True),
+    sa.Column('skin_temp_celsius', sa.Float(), nullable=True),
+    sa.Column('missing_flag', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('date'),
+    if_not_exists=True
+    )
+    # A whoop_daily created before the typed columns were added keeps its
+    # rows; add what it lacks. Offline (--sql) output assumes a new database.
+    if not context.is_offline_mode():
+        existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('whoop_daily')}
+        for name, type_ in WHOOP_TYPED_COLUMNS:
+            if name not in existing:
+                op.add_column('whoop_daily', sa.Column(name, type_(), nullable=True))
+    op.create_table('whoop_oauth_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.String(length=32), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('state'),
+    if_not_exists=True
+    )
+    op.create_table('whoop_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('access_token', sa.String(length=512), nullable=False),
+    sa.Column('refresh_token', sa.String(length=512), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('scope', sa.String(length=256), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('workout_template',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=128), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('calendar_workout',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('workout_template_id', sa.Integer(), nullable=False),
+    sa.Column('name_snapshot', sa.String(length=128), nullable=False),
+    sa.ForeignKeyConstraint(['workout_template_id'], ['workout_template.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('daily_snapshot',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('goal_progress', sa.String(length=64), nullable=False),
+    sa.Column('whoop_date', sa.Date(), nullable=True),
+    sa.Column('recovery_score', sa.Float(), nullable=True),
+    sa.Column('strain', sa.Float(), nullable=True),
+    sa.Column('hrv', sa.Float(), nullable=True),
+    sa.Column('resting_heart_rate', sa.Float(), nullable=True),
+    sa.Column('sleep_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('sleep_is_previous', sa.Boolean(), nullable=False),
+    sa.Column('body_weight_kg', sa.Float(), nullable=True),
+    sa.Column('recommendation_id', sa.Integer(), nullable=True),
+    sa.Column('recommendation_message', sa.String(length=512), nullable=True),
+    sa.Column('recommendation_explanation_json', sa.JSON(), nullable=True),
+    sa.Column('nutrition_date', sa.Date(), nullable=False),
+    sa.Column('calories', sa.Integer(), nullable=True),
+    sa.Column('protein_g', sa.Float(), nullable=True),
+    sa.Column('fat_g', sa.Float(), nullable=True),
+    sa.Column('carbs_g', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['recommendation_id'], ['recommendation.id'], ),
+    sa.PrimaryKeyConstraint('date'),
+    if_not_exists=True
+    )
+    op.create_table('program_day',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('program_id', sa.Integer(), nullable=False),
+    sa.Column('day_name', sa.String(length=32), nullable=False),
+    sa.ForeignKeyConstraint(['program_id'], ['training_program.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('recommendation_feedback',
+    sa.Column('recommendation_id', sa.Integer(), nullable=False),
+    sa.Column('feedback', sa.String(length=16), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['recommendation_id'], ['recommendation.id'], ),
+    sa.PrimaryKeyConstraint('recommendation_id'),
+    if_not_exists=True
+    )
+    op.create_table('whoop_daily_raw',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('cycle', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('recovery', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('sleep', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('workouts', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['date'], ['whoop_daily.date'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('date'),
+    if_not_exists=True
+    )
+    op.create_table('whoop_workout',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('sport_name', sa.String(length=64), nullable=True),
+    sa.Column('duration_minutes', sa.Float(), nullable=True),
+    sa.Column('strain', sa.Float(), nullable=True),
+    sa.Column('average_heart_rate', sa.Integer(), nullable=True),
+    sa.Column('max_heart_rate', sa.Integer(), nullable=True),
+    sa.Column('kilojoule', sa.Float(), nullable=True),
+    sa.Column('zone_zero_minutes', sa.Float(), nullable=True),
+    sa.Column('zone_one_minutes', sa.Float(), nullable=True),
+    sa.Column('zone_two_minutes', sa.Float(), nullable=True),
+    sa.Column('zone_three_minutes', sa.Float(), nullable=True),
+    sa.Column('zone_four_minutes', sa.Float(), nullable=True),
+    sa.Column('zone_five_minutes', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['date'], ['whoop_daily.date'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_whoop_workout_date'), 'whoop_workout', ['date'], unique=False, if_not_exists=True)
+    op.create_index('ix_whoop_workout_sport_name_date', 'whoop_workout', ['sport_name', 'date'], unique=False, if_not_exists=True)
+    op.create_table('workout_template_exercise',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workout_template_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('target_sets', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercise.id'], ),
+    sa.ForeignKeyConstraint(['workout_template_id'], ['workout_template.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('calendar_workout_exercise',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('calendar_workout_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_name', sa.String(length=128), nullable=False),
+    sa.Column('exercise_type', sa.String(length=16), nullable=False),
+    sa.Column('muscle_group', sa.String(length=64), nullable=False),
+    sa.Column('equipment', sa.String(length=64), nullable=False),
+    sa.Column('set_number', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=True),
+    sa.Column('weight_kg', sa.Float(), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['calendar_workout_id'], ['calendar_workout.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercise.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('program_exercise',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('program_day_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_type', sa.String(length=16), nullable=False),
+    sa.Column('exercise_name', sa.String(length=128), nullable=False),
+    sa.Column('muscle_group', sa.String(length=64), nullable=True),
+    sa.Column('equipment', sa.String(length=64), nullable=True),
+    sa.Column('target_sets', sa.Integer(), nullable=False),
+    sa.Column('target_reps', sa.Integer(), nullable=False),
+    sa.Column('target_weight_kg', sa.Float(), nullable=True),
+    sa.Column('target_duration_minutes', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['program_day_id'], ['program_day.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('workout',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('subjective_fatigue', sa.Integer(), nullable=False),
+    sa.Column('workout_quality', sa.String(length=16), nullable=False),
+    sa.Column('program_day_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['program_day_id'], ['program_day.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_table('workout_exercise',
+    sa.Column('workout_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_name', sa.String(length=128), nullable=False),
+    sa.Column('set_number', sa.Integer(), nullable=False),
+    sa.Column('exercise_type', sa.String(length=16), nullable=False),
+    sa.Column('muscle_group', sa.String(length=64), nullable=True),
+    sa.Column('equipment', sa.String(length=64), nullable=True),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('weight_kg', sa.Float(), nullable=False),
+    sa.Column('rpe', sa.Float(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['workout_id'], ['workout.id'], ),
+    sa.PrimaryKeyConstraint('workout_id', 'exercise_name', 'set_number'),
+    if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workout_exercise')
+    op.drop_table('workout')
+    op.drop_table('program_exercise')
+    op.drop_table('calendar_workout_exercise')
+    op.drop_table('workout_template_exercise')
+    op.drop_index('ix_whoop_workout_sport_name_date', table_name='whoop_workout')
+    op.drop_index(op.f('ix_whoop_workout_date'), table_name='whoop_workout')
+    op.drop_table('whoop_workout')
+    op.drop_table('whoop_daily_raw')
+    op.drop_table('recommendation_feedback')
+    op.drop_table('program_day')
+    op.drop_table('daily_snapshot')
+    op.drop_table('calendar_workout')
+    op.drop_table('workout_template')
+    op.drop_table('whoop_token')
+    op.drop_table('whoop_oauth_state')
+    op.drop_table('whoop_daily')
+    op.drop_table('user_goal')
+    op.drop_table('user')
+    op.drop_table('training_program')
+    op.drop_table('telegram_update')
+    op.drop_index(op.f('ix_telegram_message_topic'), table_name='telegram_message')
+    op.drop_table('telegram_message')
+    op.drop_table('recommendation')
+    op.drop_table('pipeline_run')
+    op.drop_table('nutrition_daily')
+    op.drop_table('exercise')
+    op.drop_table('daily_feature')
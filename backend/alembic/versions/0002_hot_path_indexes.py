@@ -0,0 +1,48 @@
+"""hot path indexes
+
+Indexes for the date-range and lookup queries behind /calendar,
+/workouts/last, /recommendations and the daily snapshot. Built with
+CREATE INDEX CONCURRENTLY on PostgreSQL, so writes continue during the
+build; that cannot run inside a transaction, hence the autocommit block.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 23:58:12.418205
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision: str = '0002'
+down_revision: str | None = '0001'
+branch_labels: str | tuple[str, ...] | None = None
+depends_on: str | tuple[str, ...] | None = None
+
+INDEXES = (
+    ("ix_workout_date", "workout", ["date"]),
+    ("ix_workout_program_day_id_date", "workout", ["program_day_id", "date"]),
+    ("ix_workout_exercise_exercise_name", "workout_exercise", ["exercise_name"]),
+    ("ix_calendar_workout_date", "calendar_workout", ["date"]),
+    (
+        "ix_calendar_workout_exercise_calendar_workout_id",
+        "calendar_workout_exercise",
+        ["calendar_workout_id"],
+    ),
+    ("ix_recommendation_date_id", "recommendation", ["date", "id"]),
+    ("ix_whoop_daily_missing_flag_date", "whoop_daily", ["missing_flag", "date"]),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
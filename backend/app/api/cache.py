@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import time
+from functools import wraps
+from typing import Any, Callable, get_type_hints
+
+import orjson
+import redis
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.cache_tags import CACHE_PREFIX, tag_key
+
+logger = logging.getLogger(__name__)
+
+
+def _stats_key(route: str) -> str:
+    return f"{CACHE_PREFIX}:stats:{route}"
+
+
+def _params_digest(kwargs: dict[str, Any]) -> str:
+    params = {k: v for k, v in kwargs.items() if not isinstance(v, Session)}
+    raw = json.dumps(jsonable_encoder(params), sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _render(result: Any) -> bytes:
+    if isinstance(result, Response):
+        return result.body
+    return orjson.dumps(jsonable_encoder(result))
+
+
+def _tag_versions(client: redis.Redis, tags: tuple[str, ...]) -> str:
+    keys = [tag_key(tag) for tag in tags]
+    versions = client.mget(keys)
+    if any(v is None for v in versions):
+        # Seed unknown tags with a unique value so a flushed Redis can never
+        # hand out a version (and ETag) that was already issued for other data.
+        for key, value in zip(keys, versions):
+            if value is None:
+                client.set(key, time.time_ns(), nx=True)
+        versions = client.mget(keys)
+    return ":".join(v.decode() for v in versions)
+
+
+def _etag(key: str, request: Request) -> str:
+    encoding = "gzip" if "gzip" in request.headers.get("accept-encoding", "") else "identity"
+    return '"' + hashlib.sha1(f"{key}:{encoding}".encode()).hexdigest() + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip() for value in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _validator_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+# Keys embed the current version of every tag, so invalidation only bumps a
+# counter; entries written under an older version become unreachable and expire.
+# The same versions give each response a strong ETag that can be checked
+# without touching the database.
+def cached_route(*tags: str, ttl: int | None = None) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        route = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Request = kwargs.pop("_cache_request")
+            try:
+                client = get_redis()
+                version = _tag_versions(client, tags)
+                key = f"{CACHE_PREFIX}:{route}:{version}:{_params_digest(kwargs)}"
+                etag = _etag(key, request)
+                if _not_modified(request, etag):
+                    client.hincrby(_stats_key(route), "not_modified", 1)
+                    return Response(status_code=304, headers=_validator_headers(etag))
+                body = client.get(key)
+                if body is not None:
+                    client.hincrby(_stats_key(route), "hits", 1)
+            except redis.RedisError:
+                logger.warning("Response cache unavailable for %s", route)
+                return func(*args, **kwargs)
+
+            if body is None:
+                body = _render(func(*args, **kwargs))
+                try:
+                    pipe = client.pipeline()
+                    pipe.set(key, body, ex=ttl or settings.response_cache_ttl_seconds)
+                    pipe.hincrby(_stats_key(route), "misses", 1)
+                    pipe.execute()
+                except redis.RedisError:
+                    logger.warning("Failed to store cached response for %s", route)
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers=_validator_headers(etag),
+            )
+
+        # FastAPI resolves string annotations against the endpoint's globals,
+        # which would be this module's after wrapping.
+        hints = get_type_hints(func)
+        signature = inspect.signature(func)
+        parameters = [
+            p.replace(annotation=hints.get(p.name, p.annotation))
+            for p in signature.parameters.values()
+        ]
+        parameters.append(
+            inspect.Parameter(
+                "_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            )
+        )
+        wrapper.__signature__ = signature.replace(
+            parameters=parameters,
+            return_annotation=hints.get("return", signature.return_annotation),
+        )
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict:
+    client = get_redis()
+    prefix = _stats_key("")
+    stats = []
+    try:
+        rows = [(key, client.hgetall(key)) for key in client.scan_iter(match=f"{prefix}*")]
+    except redis.RedisError:
+        logger.warning("Response cache stats unavailable")
+        return {"routes": [], "redis": "unavailable"}
+    for key, counters in rows:
+        hits = int(counters.get(b"hits", 0))
+        not_modified = int(counters.get(b"not_modified", 0))
+        misses = int(counters.get(b"misses", 0))
+        total = hits + not_modified + misses
+        stats.append(
+            {
+                "route": key.decode()[len(prefix):],
+                "hits": hits,
+                "not_modified": not_modified,
+                "misses": misses,
+                "hit_ratio": round((hits + not_modified) / total, 4) if total else 0.0,
+            }
+        )
+    return {"routes": sorted(stats, key=lambda s: s["route"]), "redis": "ok"}
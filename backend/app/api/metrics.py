@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Histogram, render_histogram, render_samples
+from app.db.instrumentation import QueryStats, current_query_stats
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+# Per-process state; the API runs as a single uvicorn process.
+_latency: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+_db_time: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+_query_count: dict[tuple[str, str], Histogram] = defaultdict(
+    lambda: Histogram(QUERY_COUNT_BUCKETS)
+)
+_responses: dict[tuple[str, str, str], int] = defaultdict(int)
+_in_flight = 0
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners cannot explode cardinality.
+    return getattr(route, "path", None) or "unmatched"
+
+
+class PerformanceMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f"app;dur={elapsed_ms:.1f}, "
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                )
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"server-timing", timing.encode())]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _in_flight -= 1
+            current_query_stats.reset(token)
+            key = (scope["method"], _route_template(scope))
+            _latency[key].observe(time.perf_counter() - started)
+            _db_time[key].observe(stats.seconds)
+            _query_count[key].observe(stats.count)
+            _responses[(*key, status)] += 1
+
+
+def render_metrics() -> str:
+    def labelled(data: dict[tuple[str, str], Histogram]):
+        return (({"method": m, "route": r}, hist) for (m, r), hist in sorted(data.items()))
+
+    lines = render_histogram(
+        "athletica_http_request_duration_seconds", "Request latency.", labelled(_latency)
+    )
+    lines += render_histogram(
+        "athletica_http_request_db_seconds", "SQL time per request.", labelled(_db_time)
+    )
+    lines += render_histogram(
+        "athletica_http_request_queries", "SQL statements per request.", labelled(_query_count)
+    )
+    lines += render_samples(
+        "athletica_http_responses_total",
+        "counter",
+        "Responses by route and status.",
+        (
+            ({"method": m, "route": r, "status": s}, count)
+            for (m, r, s), count in sorted(_responses.items())
+        ),
+    )
+    lines += render_samples(
+        "athletica_http_requests_in_flight",
+        "gauge",
+        "Requests currently being served.",
+        [({}, _in_flight)],
+    )
+    return "\n".join(lines) + "\n"
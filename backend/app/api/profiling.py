@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.profiling import SamplingProfiler, profile_path, write_profile
+
+PROFILE_HEADER = "x-athletica-profile"
+
+
+def _requested(scope: Scope) -> bool:
+    secret = settings.profile_secret
+    if not secret:
+        return False
+    value = Headers(scope=scope).get(PROFILE_HEADER)
+    return value is not None and hmac.compare_digest(value.encode(), secret.encode())
+
+
+# Samples every busy thread of the process while the request runs, so sync
+# routes executing in the threadpool are included.
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope['method']} {scope['path']}"
+        path = profile_path(name)
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-athletica-profile-file", path.name.encode()),
+                ]
+            await send(message)
+
+        profiler = SamplingProfiler().start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+            await asyncio.to_thread(write_profile, profiler, path, name)
@@ -3,12 +3,14 @@ from __future__ import annotations
 from fastapi import APIRouter
 
 from app.api.routes import (
+    cache,
     dashboard,
     calendar,
     exercises,
     goals,
     ml,
     nutrition,
+    pipeline,
     recommendations,
     telegram,
     templates,
@@ -30,3 +32,5 @@ api_router.include_router(recommendations.router)
 api_router.include_router(whoop.router)
 api_router.include_router(ml.router)
 api_router.include_router(telegram.router)
+api_router.include_router(cache.router)
+api_router.include_router(pipeline.router)
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.api.cache import cache_stats
+from app.schemas.cache import CacheStats
+
+router = APIRouter(tags=["cache"])
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+def get_cache_stats() -> CacheStats:
+    return CacheStats(**cache_stats())
@@ -1,60 +1,92 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.calendar import CalendarWorkout, CalendarWorkoutExercise
 from app.models.exercise import Exercise
 from app.models.workout_template import WorkoutTemplate, WorkoutTemplateExercise
-from app.schemas.calendar import CalendarWorkoutCreate, CalendarWorkoutDetail, CalendarWorkoutOut
+from app.schemas.calendar import (
+    CalendarWorkoutCreate,
+    CalendarWorkoutDetail,
+    CalendarWorkoutExerciseIn,
+    CalendarWorkoutOut,
+)
+from app.services.cache_tags import invalidate_tags
 
 router = APIRouter(tags=["calendar"])
 
 
+def _save_calendar_exercises(
+    db: Session, calendar_id: int, items: list[CalendarWorkoutExerciseIn]
+) -> None:
+    ids = {ex.exercise_id for ex in items}
+    exercises = {e.id: e for e in db.query(Exercise).filter(Exercise.id.in_(ids))} if ids else {}
+    rows = []
+    for ex in items:
+        exercise = exercises.get(ex.exercise_id)
+        if not exercise:
+            raise HTTPException(status_code=404, detail=f"Exercise {ex.exercise_id} not found")
+        rows.append(
+            {
+                "calendar_workout_id": calendar_id,
+                "exercise_id": exercise.id,
+                "exercise_name": exercise.name,
+                "exercise_type": exercise.exercise_type,
+                "muscle_group": exercise.muscle_group,
+                "equipment": exercise.equipment,
+                "set_number": ex.set_number,
+                "reps": ex.reps,
+                "weight_kg": ex.weight_kg,
+                "duration_minutes": ex.duration_minutes,
+            }
+        )
+    # One executemany instead of an ORM flush that fetches every new id.
+    if rows:
+        db.execute(insert(CalendarWorkoutExercise), rows)
+
+
 @router.get("/calendar", response_model=list[CalendarWorkoutOut])
+@cached_route(CalendarWorkout.__tablename__)
 def list_calendar(
     date_from: str | None = Query(default=None),
     date_to: str | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> list[CalendarWorkoutOut]:
-    query = db.query(CalendarWorkout)
+) -> ORJSONResponse:
+    query = db.query(*columns_for(CalendarWorkout, CalendarWorkoutOut))
     if date_from:
         query = query.filter(CalendarWorkout.date >= date_from)
     if date_to:
         query = query.filter(CalendarWorkout.date <= date_to)
     rows = query.order_by(CalendarWorkout.date.desc()).all()
-    return [CalendarWorkoutOut.model_validate(r.__dict__) for r in rows]
+    return rows_response(rows)
 
 
 @router.get("/calendar/{calendar_id}", response_model=CalendarWorkoutDetail)
-def get_calendar(calendar_id: int, db: Session = Depends(get_db)) -> CalendarWorkoutDetail:
-    row = db.query(CalendarWorkout).filter(CalendarWorkout.id == calendar_id).first()
+def get_calendar(calendar_id: int, db: Session = Depends(get_db)) -> ORJSONResponse:
+    row = (
+        db.query(*columns_for(CalendarWorkout, CalendarWorkoutOut))
+        .filter(CalendarWorkout.id == calendar_id)
+        .first()
+    )
     if not row:
         raise HTTPException(status_code=404, detail="Calendar item not found")
-    exercises = db.query(CalendarWorkoutExercise).filter(
-        CalendarWorkoutExercise.calendar_workout_id == row.id
-    ).all()
-    return CalendarWorkoutDetail(
-        id=row.id,
-        date=row.date,
-        workout_template_id=row.workout_template_id,
-        name_snapshot=row.name_snapshot,
-        exercises=[
-            {
-                "exercise_id": ex.exercise_id,
-                "set_number": ex.set_number,
-                "reps": ex.reps,
-                "weight_kg": ex.weight_kg,
-                "duration_minutes": ex.duration_minutes,
-            }
-            for ex in exercises
-        ],
+    exercises = (
+        db.query(*columns_for(CalendarWorkoutExercise, CalendarWorkoutExerciseIn))
+        .filter(CalendarWorkoutExercise.calendar_workout_id == row.id)
+        .all()
     )
+    return ORJSONResponse({**row._asdict(), "exercises": [ex._asdict() for ex in exercises]})
 
 
 @router.post("/calendar", response_model=CalendarWorkoutOut)
-def create_calendar(payload: CalendarWorkoutCreate, db: Session = Depends(get_db)) -> CalendarWorkoutOut:
+def create_calendar(
+    payload: CalendarWorkoutCreate, db: Session = Depends(get_db)
+) -> ORJSONResponse:
     template = db.query(WorkoutTemplate).filter(WorkoutTemplate.id == payload.workout_template_id).first()
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -67,33 +99,17 @@ def create_calendar(payload: CalendarWorkoutCreate, db: Session = Depends(get_db
     db.add(calendar)
     db.flush()
 
-    for ex in payload.exercises:
-        exercise = db.query(Exercise).filter(Exercise.id == ex.exercise_id).first()
-        if not exercise:
-            raise HTTPException(status_code=404, detail=f"Exercise {ex.exercise_id} not found")
-        db.add(
-            CalendarWorkoutExercise(
-                calendar_workout_id=calendar.id,
-                exercise_id=exercise.id,
-                exercise_name=exercise.name,
-                exercise_type=exercise.exercise_type,
-                muscle_group=exercise.muscle_group,
-                equipment=exercise.equipment,
-                set_number=ex.set_number,
-                reps=ex.reps,
-                weight_kg=ex.weight_kg,
-                duration_minutes=ex.duration_minutes,
-            )
-        )
+    _save_calendar_exercises(db, calendar.id, payload.exercises)
 
     db.commit()
-    return CalendarWorkoutOut.model_validate(calendar.__dict__)
+    invalidate_tags(CalendarWorkout.__tablename__)
+    return model_response(CalendarWorkoutOut, calendar)
 
 
 @router.put("/calendar/{calendar_id}", response_model=CalendarWorkoutOut)
 def update_calendar(
     calendar_id: int, payload: CalendarWorkoutCreate, db: Session = Depends(get_db)
-) -> CalendarWorkoutOut:
+) -> ORJSONResponse:
     calendar = db.query(CalendarWorkout).filter(CalendarWorkout.id == calendar_id).first()
     if not calendar:
         raise HTTPException(status_code=404, detail="Calendar item not found")
@@ -109,27 +125,11 @@ def update_calendar(
         CalendarWorkoutExercise.calendar_workout_id == calendar.id
     ).delete()
 
-    for ex in payload.exercises:
-        exercise = db.query(Exercise).filter(Exercise.id == ex.exercise_id).first()
-        if not exercise:
-            raise HTTPException(status_code=404, detail=f"Exercise {ex.exercise_id} not found")
-        db.add(
-            CalendarWorkoutExercise(
-                calendar_workout_id=calendar.id,
-                exercise_id=exercise.id,
-                exercise_name=exercise.name,
-                exercise_type=exercise.exercise_type,
-                muscle_group=exercise.muscle_group,
-                equipment=exercise.equipment,
-                set_number=ex.set_number,
-                reps=ex.reps,
-                weight_kg=ex.weight_kg,
-                duration_minutes=ex.duration_minutes,
-            )
-        )
+    _save_calendar_exercises(db, calendar.id, payload.exercises)
 
     db.commit()
-    return CalendarWorkoutOut.model_validate(calendar.__dict__)
+    invalidate_tags(CalendarWorkout.__tablename__)
+    return model_response(CalendarWorkoutOut, calendar)
 
 
 @router.delete("/calendar/{calendar_id}")
@@ -142,4 +142,5 @@ def delete_calendar(calendar_id: int, db: Session = Depends(get_db)) -> dict:
     ).delete()
     db.delete(row)
     db.commit()
+    invalidate_tags(CalendarWorkout.__tablename__)
     return {"status": "deleted"}
@@ -1,19 +1,32 @@
 from __future__ import annotations
 
-from datetime import date
-
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 
+from app.db.session import get_db
 from app.schemas.dashboard import DashboardResponse
+from app.services.daily_snapshot import get_daily_snapshot
 
 router = APIRouter(tags=["dashboard"])
 
 
 @router.get("/dashboard", response_model=DashboardResponse)
-def get_dashboard() -> DashboardResponse:
+def get_dashboard(db: Session = Depends(get_db)) -> DashboardResponse:
+    snapshot = get_daily_snapshot(db)
     return DashboardResponse(
-        date=date.today(),
-        goal_progress="Stable",
-        recovery_score=None,
-        latest_recommendation=None,
+        date=snapshot.date,
+        goal_progress=snapshot.goal_progress,
+        recovery_score=snapshot.recovery_score,
+        latest_recommendation=snapshot.recommendation_message,
+        whoop_date=snapshot.whoop_date,
+        sleep_hours=(
+            round(snapshot.sleep_duration_minutes / 60, 1)
+            if snapshot.sleep_duration_minutes
+            else None
+        ),
+        strain=snapshot.strain,
+        hrv=snapshot.hrv,
+        resting_heart_rate=snapshot.resting_heart_rate,
+        calories=snapshot.calories,
+        protein_g=snapshot.protein_g,
     )
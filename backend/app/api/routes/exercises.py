@@ -3,21 +3,25 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.exercise import Exercise
 from app.schemas.exercise import ExerciseCreate, ExerciseOut
+from app.services.cache_tags import invalidate_tags
 
 router = APIRouter(tags=["exercises"])
 
 
 @router.get("/exercises", response_model=list[ExerciseOut])
-def list_exercises(db: Session = Depends(get_db)) -> list[ExerciseOut]:
-    rows = db.query(Exercise).order_by(Exercise.name.asc()).all()
-    return [ExerciseOut.model_validate(r.__dict__) for r in rows]
+@cached_route(Exercise.__tablename__)
+def list_exercises(db: Session = Depends(get_db)) -> ORJSONResponse:
+    rows = db.query(*columns_for(Exercise, ExerciseOut)).order_by(Exercise.name.asc()).all()
+    return rows_response(rows)
 
 
 @router.post("/exercises", response_model=ExerciseOut)
-def create_exercise(payload: ExerciseCreate, db: Session = Depends(get_db)) -> ExerciseOut:
+def create_exercise(payload: ExerciseCreate, db: Session = Depends(get_db)) -> ORJSONResponse:
     row = Exercise(
         name=payload.name,
         exercise_type=payload.exercise_type,
@@ -26,5 +30,5 @@ def create_exercise(payload: ExerciseCreate, db: Session = Depends(get_db)) -> E
     )
     db.add(row)
     db.commit()
-    db.refresh(row)
-    return ExerciseOut.model_validate(row.__dict__)
+    invalidate_tags(Exercise.__tablename__)
+    return model_response(ExerciseOut, row)
@@ -3,21 +3,26 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.goal import UserGoal
 from app.schemas.goal import GoalCreate, GoalOut
+from app.services.cache_tags import invalidate_tags
+from app.services.daily_snapshot import rebuild_daily_snapshot
 
 router = APIRouter(tags=["goals"])
 
 
 @router.get("/goals", response_model=list[GoalOut])
-def list_goals(db: Session = Depends(get_db)) -> list[GoalOut]:
-    rows = db.query(UserGoal).order_by(UserGoal.id.desc()).all()
-    return [GoalOut.model_validate(r.__dict__) for r in rows]
+@cached_route(UserGoal.__tablename__)
+def list_goals(db: Session = Depends(get_db)) -> ORJSONResponse:
+    rows = db.query(*columns_for(UserGoal, GoalOut)).order_by(UserGoal.id.desc()).all()
+    return rows_response(rows)
 
 
 @router.post("/goals", response_model=GoalOut)
-def create_goal(payload: GoalCreate, db: Session = Depends(get_db)) -> GoalOut:
+def create_goal(payload: GoalCreate, db: Session = Depends(get_db)) -> ORJSONResponse:
     db.query(UserGoal).update({UserGoal.is_active: False})
     goal = UserGoal(
         goal_type=payload.goal_type,
@@ -28,12 +33,15 @@ def create_goal(payload: GoalCreate, db: Session = Depends(get_db)) -> GoalOut:
     )
     db.add(goal)
     db.commit()
-    db.refresh(goal)
-    return GoalOut.model_validate(goal.__dict__)
+    invalidate_tags(UserGoal.__tablename__)
+    rebuild_daily_snapshot(db)
+    return model_response(GoalOut, goal)
 
 
 @router.put("/goals/{goal_id}", response_model=GoalOut)
-def update_goal(goal_id: int, payload: GoalCreate, db: Session = Depends(get_db)) -> GoalOut:
+def update_goal(
+    goal_id: int, payload: GoalCreate, db: Session = Depends(get_db)
+) -> ORJSONResponse:
     goal = db.query(UserGoal).filter(UserGoal.id == goal_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
@@ -42,8 +50,9 @@ def update_goal(goal_id: int, payload: GoalCreate, db: Session = Depends(get_db)
     goal.end_date = payload.end_date
     goal.priority_muscle_groups = payload.priority_muscle_groups
     db.commit()
-    db.refresh(goal)
-    return GoalOut.model_validate(goal.__dict__)
+    invalidate_tags(UserGoal.__tablename__)
+    rebuild_daily_snapshot(db)
+    return model_response(GoalOut, goal)
 
 
 @router.delete("/goals/{goal_id}")
@@ -53,6 +62,8 @@ def delete_goal(goal_id: int, db: Session = Depends(get_db)) -> dict:
         raise HTTPException(status_code=404, detail="Goal not found")
     db.delete(goal)
     db.commit()
+    invalidate_tags(UserGoal.__tablename__)
+    rebuild_daily_snapshot(db)
     return {"status": "deleted"}
 
 
@@ -64,4 +75,6 @@ def activate_goal(goal_id: int, db: Session = Depends(get_db)) -> dict:
     db.query(UserGoal).update({UserGoal.is_active: False})
     goal.is_active = True
     db.commit()
+    invalidate_tags(UserGoal.__tablename__)
+    rebuild_daily_snapshot(db)
     return {"status": "ok"}
@@ -5,30 +5,35 @@ from datetime import date
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.nutrition import NutritionDaily
 from app.schemas.nutrition import NutritionCreate, NutritionOut
+from app.services.cache_tags import invalidate_tags
+from app.services.recompute import request_recompute
 
 router = APIRouter(tags=["nutrition"])
 
 
 @router.get("/nutrition", response_model=list[NutritionOut])
+@cached_route(NutritionDaily.__tablename__)
 def list_nutrition(
     start: date | None = Query(default=None),
     end: date | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> list[NutritionOut]:
-    query = db.query(NutritionDaily)
+) -> ORJSONResponse:
+    query = db.query(*columns_for(NutritionDaily, NutritionOut))
     if start:
         query = query.filter(NutritionDaily.date >= start)
     if end:
         query = query.filter(NutritionDaily.date <= end)
     rows = query.order_by(NutritionDaily.date.desc()).all()
-    return [NutritionOut.model_validate(r, from_attributes=True) for r in rows]
+    return rows_response(rows)
 
 
 @router.post("/nutrition", response_model=NutritionOut)
-def upsert_nutrition(payload: NutritionCreate, db: Session = Depends(get_db)) -> NutritionOut:
+def upsert_nutrition(payload: NutritionCreate, db: Session = Depends(get_db)) -> ORJSONResponse:
     row = db.query(NutritionDaily).filter(NutritionDaily.date == payload.date).first()
     if not row:
         row = NutritionDaily(date=payload.date)
@@ -38,4 +43,6 @@ def upsert_nutrition(payload: NutritionCreate, db: Session = Depends(get_db)) ->
     row.fat_g = payload.fat_g
     row.carbs_g = payload.carbs_g
     db.commit()
-    return NutritionOut.model_validate(row, from_attributes=True)
+    invalidate_tags(NutritionDaily.__tablename__)
+    request_recompute("api_nutrition", nutrition={payload.date})
+    return model_response(NutritionOut, row)
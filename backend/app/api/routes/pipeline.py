@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.serialization import ORJSONResponse, columns_for, rows_response
+from app.db.session import get_db
+from app.models.pipeline import PipelineRun
+from app.schemas.pipeline import PipelineRunOut
+
+router = APIRouter(tags=["pipeline"])
+
+
+@router.get("/pipeline/runs", response_model=list[PipelineRunOut])
+def list_pipeline_runs(
+    limit: int = Query(default=20, ge=1, le=200), db: Session = Depends(get_db)
+) -> ORJSONResponse:
+    rows = (
+        db.query(*columns_for(PipelineRun, PipelineRunOut))
+        .order_by(PipelineRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return rows_response(rows)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, rows_response
 from app.db.session import get_db
 from app.models.recommendation import Recommendation, RecommendationFeedback
 from app.schemas.recommendation import RecommendationFeedbackIn, RecommendationOut
@@ -11,9 +13,15 @@ router = APIRouter(tags=["recommendations"])
 
 
 @router.get("/recommendations", response_model=list[RecommendationOut])
-def list_recommendations(db: Session = Depends(get_db)) -> list[RecommendationOut]:
-    rows = db.query(Recommendation).order_by(Recommendation.date.desc()).limit(30).all()
-    return [RecommendationOut.model_validate(r.__dict__) for r in rows]
+@cached_route(Recommendation.__tablename__)
+def list_recommendations(db: Session = Depends(get_db)) -> ORJSONResponse:
+    rows = (
+        db.query(*columns_for(Recommendation, RecommendationOut))
+        .order_by(Recommendation.date.desc())
+        .limit(30)
+        .all()
+    )
+    return rows_response(rows)
 
 
 @router.post("/recommendations/{recommendation_id}/feedback")
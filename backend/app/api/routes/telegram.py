@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.api.serialization import ORJSONResponse, model_response
 from app.db.session import get_db
-import re
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-
-from app.models.nutrition import NutritionDaily
-from app.models.recommendation import Recommendation, RecommendationFeedback
-from app.workers.tasks import send_daily_insight
-from app.services.telegram import send_telegram_message
+from app.models.telegram import TelegramMessage, TelegramUpdate
+from app.schemas.telegram import TelegramMessageOut
+from app.services.telegram import (
+    forget_update,
+    mark_update_seen,
+    send_telegram_message,
+    webhook_metrics,
+)
+from app.workers.signatures import PROCESS_TELEGRAM_UPDATE, enqueue
 
 router = APIRouter(tags=["telegram"])
 
@@ -24,66 +26,42 @@ def telegram_test(message: str = "Athletica test message") -> dict:
     return {"status": "ok"}
 
 
-@router.post("/telegram/webhook")
-async def telegram_webhook(request: Request, db: Session = Depends(get_db)) -> dict:
-    payload = await request.json()
-    callback = payload.get("callback_query") if isinstance(payload, dict) else None
-    if not callback:
-        message = payload.get("message") if isinstance(payload, dict) else None
-        if not message:
-            return {"status": "ignored"}
+@router.get("/telegram/messages/{message_id}", response_model=TelegramMessageOut)
+def telegram_message_status(message_id: int, db: Session = Depends(get_db)) -> ORJSONResponse:
+    message = db.get(TelegramMessage, message_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return model_response(TelegramMessageOut, message)
 
-        text = message.get("text") or ""
-        target_day = datetime.now(ZoneInfo("Europe/Moscow")).date() - timedelta(days=1)
-        date_match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
-        if date_match:
-            try:
-                target_day = datetime.fromisoformat(date_match.group(1)).date()
-            except ValueError:
-                pass
-        numbers = [int(n) for n in re.findall(r"\d+", text)]
-        if len(numbers) < 4:
-            return {"status": "ignored"}
-        calories, protein, fat, carbs = numbers[:4]
-        row = (
-            db.query(NutritionDaily).filter(NutritionDaily.date == target_day).first()
-        )
-        if not row:
-            row = NutritionDaily(date=target_day)
-            db.add(row)
-        row.calories = calories
-        row.protein_g = protein
-        row.fat_g = fat
-        row.carbs_g = carbs
-        db.commit()
 
-        send_telegram_message(f"Nutrition saved ✅ for {target_day}")
-        # After nutrition input, send the daily insight message.
-        send_daily_insight.delay()
-        return {"status": "ok"}
+@router.get("/telegram/metrics")
+def telegram_metrics() -> dict:
+    return webhook_metrics()
 
-    data = callback.get("data", "")
-    if not data.startswith("rec:"):
-        return {"status": "ignored"}
-    try:
-        _, rec_id, feedback = data.split(":", 2)
-        rec_id_int = int(rec_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid callback data")
 
-    exists = db.query(Recommendation).filter(Recommendation.id == rec_id_int).first()
-    if not exists:
-        raise HTTPException(status_code=404, detail="Recommendation not found")
+# Sync handler so FastAPI runs it in the threadpool: the webhook only stores
+# the update and acks; parsing, DB writes and replies happen in the worker.
+@router.post("/telegram/webhook")
+def telegram_webhook(payload: dict = Body(...), db: Session = Depends(get_db)) -> dict:
+    update_id = payload.get("update_id")
+    if not isinstance(update_id, int):
+        raise HTTPException(status_code=400, detail="Invalid update")
 
-    existing = (
-        db.query(RecommendationFeedback)
-        .filter(RecommendationFeedback.recommendation_id == rec_id_int)
-        .first()
-    )
-    if existing:
-        existing.feedback = feedback
-    else:
-        row = RecommendationFeedback(recommendation_id=rec_id_int, feedback=feedback)
-        db.add(row)
-    db.commit()
-    return {"status": "ok"}
+    seen = mark_update_seen(update_id)
+    if seen is False:
+        return {"status": "duplicate"}
+    if seen is None and db.get(TelegramUpdate, update_id) is not None:
+        return {"status": "duplicate"}
+    if not payload.get("message") and not payload.get("callback_query"):
+        return {"status": "ignored"}
+
+    try:
+        if seen is None or db.get(TelegramUpdate, update_id) is None:
+            db.add(TelegramUpdate(update_id=update_id, payload=payload))
+            db.commit()
+        enqueue(PROCESS_TELEGRAM_UPDATE, update_id)
+    except Exception:
+        # Let Telegram's redelivery through if the update was not handed off.
+        forget_update(update_id)
+        raise
+    return {"status": "queued"}
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.exercise import Exercise
 from app.models.workout_template import WorkoutTemplate, WorkoutTemplateExercise
@@ -12,47 +15,52 @@ from app.schemas.template import (
     WorkoutTemplateExercisesSave,
     WorkoutTemplateOut,
 )
+from app.services.cache_tags import invalidate_tags
 
 router = APIRouter(tags=["workout-templates"])
 
 
 @router.get("/workouts/templates", response_model=list[WorkoutTemplateOut])
-def list_templates(db: Session = Depends(get_db)) -> list[WorkoutTemplateOut]:
-    rows = db.query(WorkoutTemplate).order_by(WorkoutTemplate.id.desc()).all()
-    return [WorkoutTemplateOut.model_validate(r.__dict__) for r in rows]
+@cached_route(WorkoutTemplate.__tablename__)
+def list_templates(db: Session = Depends(get_db)) -> ORJSONResponse:
+    rows = (
+        db.query(*columns_for(WorkoutTemplate, WorkoutTemplateOut))
+        .order_by(WorkoutTemplate.id.desc())
+        .all()
+    )
+    return rows_response(rows)
 
 
 @router.get("/workouts/templates/{template_id}/exercises")
-def list_template_exercises(template_id: int, db: Session = Depends(get_db)) -> list[dict]:
+@cached_route(WorkoutTemplateExercise.__tablename__, Exercise.__tablename__)
+def list_template_exercises(template_id: int, db: Session = Depends(get_db)) -> ORJSONResponse:
     rows = (
-        db.query(WorkoutTemplateExercise, Exercise)
+        db.query(
+            Exercise.id.label("exercise_id"),
+            Exercise.name,
+            Exercise.exercise_type,
+            Exercise.muscle_group,
+            Exercise.equipment,
+            WorkoutTemplateExercise.target_sets,
+        )
+        .select_from(WorkoutTemplateExercise)
         .join(Exercise, Exercise.id == WorkoutTemplateExercise.exercise_id)
         .filter(WorkoutTemplateExercise.workout_template_id == template_id)
         .order_by(WorkoutTemplateExercise.order_index.asc())
         .all()
     )
-    return [
-        {
-            "exercise_id": ex.id,
-            "name": ex.name,
-            "exercise_type": ex.exercise_type,
-            "muscle_group": ex.muscle_group,
-            "equipment": ex.equipment,
-            "target_sets": row.target_sets,
-        }
-        for row, ex in rows
-    ]
+    return rows_response(rows)
 
 
 @router.post("/workouts/templates", response_model=WorkoutTemplateOut)
 def create_template(
     payload: WorkoutTemplateCreate, db: Session = Depends(get_db)
-) -> WorkoutTemplateOut:
+) -> ORJSONResponse:
     row = WorkoutTemplate(name=payload.name)
     db.add(row)
     db.commit()
-    db.refresh(row)
-    return WorkoutTemplateOut.model_validate(row.__dict__)
+    invalidate_tags(WorkoutTemplate.__tablename__)
+    return model_response(WorkoutTemplateOut, row)
 
 
 @router.post("/workouts/templates/{template_id}/exercises")
@@ -73,6 +81,7 @@ def add_template_exercise(
     )
     db.add(row)
     db.commit()
+    invalidate_tags(WorkoutTemplateExercise.__tablename__)
     return {"status": "ok"}
 
 
@@ -86,21 +95,28 @@ def save_template_exercises(
     db.query(WorkoutTemplateExercise).filter(
         WorkoutTemplateExercise.workout_template_id == template_id
     ).delete()
+    ids = {item.exercise_id for item in payload.exercises}
+    known = {row.id for row in db.query(Exercise.id).filter(Exercise.id.in_(ids))} if ids else set()
     for item in payload.exercises:
-        exercise = db.query(Exercise).filter(Exercise.id == item.exercise_id).first()
-        if not exercise:
+        if item.exercise_id not in known:
             raise HTTPException(
                 status_code=404, detail=f"Exercise {item.exercise_id} not found"
             )
-        db.add(
-            WorkoutTemplateExercise(
-                workout_template_id=template_id,
-                exercise_id=item.exercise_id,
-                order_index=item.order_index,
-                target_sets=item.target_sets,
-            )
+    if payload.exercises:
+        db.execute(
+            insert(WorkoutTemplateExercise),
+            [
+                {
+                    "workout_template_id": template_id,
+                    "exercise_id": item.exercise_id,
+                    "order_index": item.order_index,
+                    "target_sets": item.target_sets,
+                }
+                for item in payload.exercises
+            ],
         )
     db.commit()
+    invalidate_tags(WorkoutTemplateExercise.__tablename__)
     return {"status": "saved"}
 
 
@@ -117,6 +133,7 @@ def delete_template_exercise(
         .delete()
     )
     db.commit()
+    invalidate_tags(WorkoutTemplateExercise.__tablename__)
     if not deleted:
         raise HTTPException(status_code=404, detail="Exercise not found in template")
     return {"status": "deleted"}
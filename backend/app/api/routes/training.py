@@ -3,6 +3,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_route
+from app.api.serialization import ORJSONResponse, columns_for, model_response, rows_response
 from app.db.session import get_db
 from app.models.training import ProgramDay, ProgramExercise, TrainingProgram
 from app.schemas.training import (
@@ -13,43 +15,48 @@ from app.schemas.training import (
     ProgramExerciseOut,
     ProgramOut,
 )
+from app.services.cache_tags import invalidate_tags
 
 router = APIRouter(tags=["training"])
 
 
 @router.get("/programs", response_model=list[ProgramOut])
-def list_programs(db: Session = Depends(get_db)) -> list[ProgramOut]:
-    rows = db.query(TrainingProgram).order_by(TrainingProgram.id.desc()).all()
-    return [ProgramOut.model_validate(r.__dict__) for r in rows]
+@cached_route(TrainingProgram.__tablename__)
+def list_programs(db: Session = Depends(get_db)) -> ORJSONResponse:
+    rows = (
+        db.query(*columns_for(TrainingProgram, ProgramOut))
+        .order_by(TrainingProgram.id.desc())
+        .all()
+    )
+    return rows_response(rows)
 
 
 @router.post("/programs", response_model=ProgramOut)
-def create_program(payload: ProgramCreate, db: Session = Depends(get_db)) -> ProgramOut:
+def create_program(payload: ProgramCreate, db: Session = Depends(get_db)) -> ORJSONResponse:
     program = TrainingProgram(name=payload.name, is_active=True)
     db.add(program)
     db.commit()
-    db.refresh(program)
-    return ProgramOut.model_validate(program.__dict__)
+    invalidate_tags(TrainingProgram.__tablename__)
+    return model_response(ProgramOut, program)
 
 
 @router.post("/programs/{program_id}/days", response_model=ProgramDayOut)
 def create_program_day(
     program_id: int, payload: ProgramDayCreate, db: Session = Depends(get_db)
-) -> ProgramDayOut:
+) -> ORJSONResponse:
     program = db.query(TrainingProgram).filter(TrainingProgram.id == program_id).first()
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
     day = ProgramDay(program_id=program_id, day_name=payload.day_name)
     db.add(day)
     db.commit()
-    db.refresh(day)
-    return ProgramDayOut.model_validate(day.__dict__)
+    return model_response(ProgramDayOut, day)
 
 
 @router.post("/program-days/{day_id}/exercises", response_model=ProgramExerciseOut)
 def create_program_exercise(
     day_id: int, payload: ProgramExerciseCreate, db: Session = Depends(get_db)
-) -> ProgramExerciseOut:
+) -> ORJSONResponse:
     day = db.query(ProgramDay).filter(ProgramDay.id == day_id).first()
     if not day:
         raise HTTPException(status_code=404, detail="Program day not found")
@@ -66,5 +73,4 @@ def create_program_exercise(
     )
     db.add(exercise)
     db.commit()
-    db.refresh(exercise)
-    return ProgramExerciseOut.model_validate(exercise.__dict__)
+    return model_response(ProgramExerciseOut, exercise)
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.whoop import WhoopAuthUrl, WhoopCallbackResult
 from app.services.whoop_oauth import build_auth_url, exchange_code, get_valid_token
-from app.workers.tasks import sync_whoop
+from app.services.whoop_sync import request_whoop_sync
 
 router = APIRouter(tags=["whoop"])
 
@@ -36,5 +36,4 @@ def trigger_sync(db: Session = Depends(get_db)) -> dict:
     token = get_valid_token(db)
     if not token:
         raise HTTPException(status_code=401, detail="WHOOP not authorized")
-    sync_whoop.delay()
-    return {"status": "queued"}
+    return request_whoop_sync()
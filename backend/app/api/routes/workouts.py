@@ -3,9 +3,11 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.api.serialization import ORJSONResponse, columns_for
 from app.db.session import get_db
 from app.models.workout import Workout, WorkoutExercise
-from app.schemas.workout import WorkoutCreate
+from app.schemas.workout import WorkoutCreate, WorkoutExerciseOut, WorkoutLastOut, WorkoutOut
+from app.services.recompute import request_recompute
 
 router = APIRouter(tags=["workouts"])
 
@@ -41,28 +43,31 @@ def create_workout(payload: WorkoutCreate, db: Session = Depends(get_db)) -> dic
         )
 
     db.commit()
+    request_recompute("api_workouts", workouts={payload.date})
     return {"id": workout.id}
 
 
-@router.get("/workouts/last")
+@router.get("/workouts/last", response_model=WorkoutLastOut)
 def last_workout(
     program_day_id: int | None = Query(default=None),
     exercise_name: str | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> dict:
+) -> ORJSONResponse:
     if not program_day_id and not exercise_name:
         raise HTTPException(status_code=400, detail="program_day_id or exercise_name required")
-    query = db.query(Workout).order_by(Workout.date.desc())
+    query = db.query(*columns_for(Workout, WorkoutOut)).order_by(Workout.date.desc())
     if program_day_id:
         query = query.filter(Workout.program_day_id == program_day_id)
     workout = query.first()
     if not workout:
-        return {"workout": None, "exercises": []}
-    exercises_q = db.query(WorkoutExercise).filter(WorkoutExercise.workout_id == workout.id)
+        return ORJSONResponse({"workout": None, "exercises": []})
+    exercises_q = db.query(*columns_for(WorkoutExercise, WorkoutExerciseOut)).filter(
+        WorkoutExercise.workout_id == workout.id
+    )
     if exercise_name:
         exercises_q = exercises_q.filter(WorkoutExercise.exercise_name == exercise_name)
-    exercises = [e.__dict__ for e in exercises_q.all()]
-    return {"workout": workout.__dict__, "exercises": exercises}
+    exercises = [e._asdict() for e in exercises_q.all()]
+    return ORJSONResponse({"workout": workout._asdict(), "exercises": exercises})
 
 
 @router.delete("/workouts/{workout_id}")
@@ -71,6 +76,8 @@ def delete_workout(workout_id: int, db: Session = Depends(get_db)) -> dict:
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     db.query(WorkoutExercise).filter(WorkoutExercise.workout_id == workout_id).delete()
+    day = workout.date
     db.delete(workout)
     db.commit()
+    request_recompute("api_workouts", workouts={day})
     return {"status": "deleted"}
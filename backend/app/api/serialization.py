@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Routes return ORJSONResponse directly so FastAPI skips response_model
+# re-validation; response_model is kept only for the OpenAPI schema.
+def columns_for(model: type, schema: type[BaseModel]) -> list[InstrumentedAttribute]:
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(rows: Iterable[Any]) -> ORJSONResponse:
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+def model_response(schema: type[BaseModel], obj: Any) -> ORJSONResponse:
+    return ORJSONResponse(schema.model_validate(obj, from_attributes=True).model_dump())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import AnyHttpUrl
+from pydantic import AnyHttpUrl, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,16 +11,49 @@ class Settings(BaseSettings):
     # Default avoids secrets in repo; override via SOPS-decrypted envs in real use.
     database_url: str = "postgresql+psycopg2://localhost/athletica"
     redis_url: str = "redis://redis:6379/0"
+    response_cache_ttl_seconds: int = 300
     whoop_client_id: str | None = None
     whoop_client_secret: str | None = None
     whoop_redirect_url: AnyHttpUrl | None = None
     whoop_token_url: AnyHttpUrl = "https://api.prod.whoop.com/oauth/oauth2/token"
     whoop_auth_url: AnyHttpUrl = "https://api.prod.whoop.com/oauth/oauth2/auth"
+    whoop_api_base_url: AnyHttpUrl = "https://api.prod.whoop.com/developer"
+    whoop_rate_limit_retries: int = 3
+    whoop_max_retry_after_seconds: float = 60.0
+    whoop_archive_enabled: bool = True
+    whoop_archive_dir: str = "/var/lib/athletica/whoop-archive"
+    whoop_archive_level: int = 10
+    whoop_token_refresh_margin_seconds: int = 300
+    whoop_sync_lock_seconds: int = 1800
 
     telegram_bot_token: str | None = None
+    telegram_api_base_url: AnyHttpUrl = "https://api.telegram.org"
     telegram_chat_id: str | None = None
+    telegram_global_rate_per_second: float = 30.0
+    telegram_chat_rate_per_second: float = 1.0
+    telegram_max_delivery_attempts: int = 8
+    # Queued messages no worker has attempted after this long are published again.
+    telegram_requeue_after_seconds: int = 600
+    telegram_update_ttl_seconds: int = 172800
+    insight_debounce_seconds: int = 30
+
+    worker_metrics_port: int = 0
+
+    # Profiling is off unless a request sends X-Athletica-Profile with this
+    # secret, or a task is listed in profile_tasks ("*" for all tasks).
+    profile_secret: str | None = None
+    profile_tasks: list[str] = []
+    profile_dir: str = "/tmp/athletica-profiles"
+    profile_keep: int = 50
+    profile_interval_ms: float = 5.0
+    profile_format: str = "speedscope"
 
     mlflow_tracking_uri: str | None = None
+    ml_artifacts_dir: str = "/tmp/athletica-ml"
+    # Includes the run just written, so at least 1.
+    ml_artifacts_keep: PositiveInt = 20
+    ml_max_rss_mb: int = 2048
+    ml_timeout_seconds: int = 1700
 
 
 settings = Settings()
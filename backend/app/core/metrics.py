@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Iterable
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; counts are per slot, not cumulative.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bucket_index(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @classmethod
+    def from_fields(
+        cls, fields: dict, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        hist = cls(buckets)
+        decoded = {
+            (k.decode() if isinstance(k, bytes) else k): float(v) for k, v in fields.items()
+        }
+        for i in range(len(hist.counts)):
+            hist.counts[i] = int(decoded.get(f"b{i}", 0))
+        hist.sum = decoded.get("sum", 0.0)
+        hist.count = int(decoded.get("count", 0))
+        return hist
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+def bucket_index(buckets: tuple[float, ...], value: float) -> int:
+    return bisect.bisect_left(buckets, value)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in sorted(labels.items()):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_histogram(
+    name: str, help_text: str, series: Iterable[tuple[dict[str, str], Histogram]]
+) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, hist in series:
+        cumulative = 0
+        for i, count in enumerate(hist.counts):
+            cumulative += count
+            le = hist.buckets[i] if i < len(hist.buckets) else math.inf
+            bucket_labels = format_labels({**labels, "le": _format_value(le)})
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {_format_value(hist.sum)}")
+        lines.append(f"{name}_count{format_labels(labels)} {hist.count}")
+    return lines
+
+
+def render_samples(
+    name: str, kind: str, help_text: str, series: Iterable[tuple[dict[str, str], float]]
+) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in series:
+        lines.append(f"{name}{format_labels(labels)} {_format_value(value)}")
+    return lines
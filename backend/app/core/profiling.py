@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+
+from app.core.config import settings
+
+# Leaf frames in these modules are idle threads (pool workers, the event loop
+# waiting on I/O) and are dropped from request profiles.
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    parts = Path(code.co_filename).parts
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+def _stack(frame: FrameType | None) -> tuple[str, ...]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float | None = None, thread_ids: set[int] | None = None) -> None:
+        self.interval = interval or settings.profile_interval_ms / 1000
+        self.thread_ids = thread_ids
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                if self.thread_ids is None and frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                self.samples[_stack(frame)] += 1
+
+    def start(self) -> SamplingProfiler:
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> SamplingProfiler:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+
+def profile_path(name: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:80] or "profile"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    suffix = ".speedscope.json" if settings.profile_format == "speedscope" else ".folded"
+    return Path(settings.profile_dir) / f"{stamp}-{slug}{suffix}"
+
+
+def _collapsed(profiler: SamplingProfiler) -> str:
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in profiler.samples.items())
+
+
+def _speedscope(profiler: SamplingProfiler, name: str) -> str:
+    frames: dict[str, int] = {}
+    samples, weights = [], []
+    for stack, count in profiler.samples.items():
+        samples.append([frames.setdefault(label, len(frames)) for label in stack])
+        weights.append(round(count * profiler.interval, 6))
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "athletica",
+        "shared": {"frames": [{"name": label} for label in frames]},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+    return json.dumps(document)
+
+
+def _rotate(directory: Path, keep: int) -> None:
+    files = sorted(p for p in directory.iterdir() if p.is_file())
+    for path in files[:-keep] if keep else files:
+        path.unlink(missing_ok=True)
+
+
+def write_profile(profiler: SamplingProfiler, path: Path, name: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.name.endswith(".speedscope.json"):
+        content = _speedscope(profiler, name)
+    else:
+        content = _collapsed(profiler)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+    _rotate(path.parent, settings.profile_keep)
+    return path
+
+
+def task_profiling_enabled(task_name: str, request: object | None = None) -> bool:
+    # Custom message headers land on the request itself in workers and under
+    # request.headers for eagerly applied tasks.
+    headers = getattr(request, "headers", None) or {}
+    if getattr(request, "athletica_profile", False) or headers.get("athletica_profile"):
+        return True
+    targets = settings.profile_tasks
+    return "*" in targets or task_name in targets
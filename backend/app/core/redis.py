@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        settings.redis_url, socket_connect_timeout=1.0, socket_timeout=1.0
+    )
+
+
+# Yields whether the lock is held. If Redis itself is unreachable the caller
+# proceeds unlocked rather than stalling the work it guards.
+@contextmanager
+def redis_lock(name: str, timeout: float, blocking_timeout: float | None = None) -> Iterator[bool]:
+    try:
+        lock = get_redis().lock(name, timeout=timeout, blocking_timeout=blocking_timeout)
+        acquired = lock.acquire(blocking=blocking_timeout is not None)
+    except redis.RedisError:
+        logger.warning("Redis unavailable; running %s without a lock", name)
+        yield True
+        return
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except redis.RedisError:
+                logger.warning("Failed to release lock %s", name)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# Holds the stats object of the request (or task) being served. Sync routes
+# run in a threadpool that copies the context, so they update the same object.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def install_query_hooks(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+_PLACEHOLDER = r"(?:\?|%s|%\([^)]+\)s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class RecordedQuery:
+    statement: str
+    shape: str
+    seconds: float
+
+
+@dataclass
+class QueryRecorder:
+    # Listens on the engine itself rather than a contextvar so statements run
+    # from other threads (TestClient portal, threadpool routes) are captured.
+    engine: Engine
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("recorder_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["recorder_started"].pop()
+        self.queries.append(
+            RecordedQuery(statement, statement_shape(statement), time.perf_counter() - started)
+        )
+
+    def __enter__(self) -> QueryRecorder:
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated(self, threshold: int = 2) -> list[tuple[str, int]]:
+        counts = Counter(q.shape for q in self.queries)
+        return [(shape, n) for shape, n in counts.most_common() if n >= threshold]
+
+    def report(self, limit: int = 10) -> str:
+        total_ms = sum(q.seconds for q in self.queries) * 1000
+        lines = [f"{self.count} statements, {total_ms:.1f} ms"]
+        repeated = self.repeated()
+        if repeated:
+            lines.append("Repeated statement shapes:")
+            for shape, n in repeated[:limit]:
+                lines.append(f"  {n:>4}x  {shape[:200]}")
+        lines.append("Statements in order:")
+        for i, query in enumerate(self.queries[: limit * 3], start=1):
+            lines.append(f"  {i:>4}. {query.shape[:200]}")
+        if self.count > limit * 3:
+            lines.append(f"  ... {self.count - limit * 3} more")
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(
+    engine: Engine, max_queries: int, max_repeats: int | None = None, label: str = "block"
+) -> Iterator[QueryRecorder]:
+    with QueryRecorder(engine) as recorder:
+        yield recorder
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f"{recorder.count} statements, budget is {max_queries}")
+    if max_repeats is not None:
+        worst = recorder.repeated(max_repeats + 1)
+        if worst:
+            problems.append(
+                f"statement shape repeated {worst[0][1]}x, at most {max_repeats} allowed"
+            )
+    if problems:
+        raise QueryBudgetExceeded(
+            f"Query budget exceeded for {label}: {'; '.join(problems)}\n{recorder.report()}"
+        )
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+# INSERT ... ON CONFLICT (keys) DO UPDATE for PostgreSQL and SQLite, so
+# concurrent writers of the same row both succeed instead of one failing on
+# the primary key. Columns with onupdate defaults must be passed explicitly.
+def upsert(db: Session, model: type, rows: list[dict], keys: tuple[str, ...]) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(model)
+    updates = {name: statement.excluded[name] for name in rows[0] if name not in keys}
+    db.execute(statement.on_conflict_do_update(index_elements=list(keys), set_=updates), rows)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import logging
+import time
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class WhoopToken:
@@ -17,14 +22,47 @@ class WhoopToken:
     token_type: str
 
 
+def retry_after_seconds(response: httpx.Response, default: float = 1.0) -> float:
+    value = response.headers.get("retry-after") or response.headers.get("x-ratelimit-reset")
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    return max(0.0, seconds)
+
+
 class WhoopClient:
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, base_url: str | None = None):
         self.access_token = access_token
-        self.base_url = "https://api.prod.whoop.com/developer"
+        self.base_url = (base_url or str(settings.whoop_api_base_url)).rstrip("/")
 
     def _headers(self) -> dict[str, str]:
         return {"Authorization": f"Bearer {self.access_token}"}
 
+    # 429s are waited out in place (up to whoop_max_retry_after_seconds) so a
+    # rate-limited page does not restart the whole sync.
+    def _get(
+        self, client: httpx.Client, path: str, params: dict[str, Any] | None = None
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            resp = client.get(f"{self.base_url}{path}", headers=self._headers(), params=params)
+            if resp.status_code != 429 or attempt >= settings.whoop_rate_limit_retries:
+                break
+            wait = retry_after_seconds(resp, default=2**attempt)
+            if wait > settings.whoop_max_retry_after_seconds:
+                break
+            attempt += 1
+            logger.info("WHOOP rate limited on %s; retrying in %.1fs", path, wait)
+            time.sleep(wait)
+        resp.raise_for_status()
+        return resp
+
     def _get_paginated(self, path: str, params: dict[str, Any]) -> list[dict[str, Any]]:
         records: list[dict[str, Any]] = []
         next_token: str | None = None
@@ -33,11 +71,7 @@ class WhoopClient:
                 page_params = dict(params)
                 if next_token:
                     page_params["nextToken"] = next_token
-                resp = client.get(
-                    f"{self.base_url}{path}", headers=self._headers(), params=page_params
-                )
-                resp.raise_for_status()
-                data = resp.json()
+                data = self._get(client, path, page_params).json()
                 records.extend(data.get("records", []))
                 next_token = data.get("next_token")
                 if not next_token:
@@ -78,11 +112,7 @@ class WhoopClient:
 
     def get_body_measurement(self) -> dict[str, Any]:
         with httpx.Client(timeout=30) as client:
-            resp = client.get(
-                f"{self.base_url}/v2/user/measurement/body", headers=self._headers()
-            )
-            resp.raise_for_status()
-            return resp.json()
+            return self._get(client, "/v2/user/measurement/body").json()
 
 
 def exchange_code_for_token(code: str) -> WhoopToken:
@@ -1,13 +1,31 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.metrics import PerformanceMiddleware, render_metrics
+from app.api.profiling import ProfilingMiddleware
 from app.api.router import api_router
+from app.api.serialization import ORJSONResponse
+from app.db.instrumentation import install_query_hooks
+from app.db.session import engine
 
-app = FastAPI(title="Athletica API")
+install_query_hooks(engine)
+
+app = FastAPI(title="Athletica API", default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+app.add_middleware(ProfilingMiddleware)
+# Added last so it wraps gzip and times the full response.
+app.add_middleware(PerformanceMiddleware)
 app.include_router(api_router)
 
 
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
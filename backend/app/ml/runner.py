@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.profiling import SamplingProfiler, profile_path, write_profile
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0.0
+
+
+def _prune_runs(root: Path, keep: int) -> None:
+    runs = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name)
+    # Never the newest run: its directory is returned as artifacts_dir.
+    for path in runs[: -max(keep, 1)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# Training runs in a fresh interpreter so pandas/LightGBM allocations are
+# returned to the OS when it exits; the Celery worker never imports them.
+# The result travels back as a JSON file in the run directory.
+def run_training(
+    max_rss_mb: int | None = None, timeout_seconds: int | None = None, profile: bool = False
+) -> dict:
+    max_rss_mb = max_rss_mb or settings.ml_max_rss_mb
+    timeout_seconds = timeout_seconds or settings.ml_timeout_seconds
+    root = Path(settings.ml_artifacts_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid4().hex[:8]}"
+    run_dir = root / run_id
+    run_dir.mkdir()
+    output = run_dir / "result.json"
+
+    started = time.monotonic()
+    peak_mb = 0.0
+    failure = None
+    command = [sys.executable, "-m", "app.ml.runner", "--output", str(output)]
+    if profile:
+        command.append("--profile")
+    with (run_dir / "stdout.log").open("wb") as log:
+        proc = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            while proc.poll() is None:
+                peak_mb = max(peak_mb, _rss_mb(proc.pid))
+                if peak_mb > max_rss_mb:
+                    failure = f"RSS {peak_mb:.0f} MB exceeded limit of {max_rss_mb} MB"
+                    break
+                if time.monotonic() - started > timeout_seconds:
+                    failure = f"timed out after {timeout_seconds}s"
+                    break
+                time.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+    if failure is None and proc.returncode != 0:
+        failure = f"exited with code {proc.returncode}"
+    if failure is None and not output.exists():
+        failure = "no result file written"
+    _prune_runs(root, settings.ml_artifacts_keep)
+    if failure:
+        logger.error("ML run %s failed: %s", run_id, failure)
+        raise RuntimeError(f"ML run {run_id} failed: {failure}")
+
+    result = json.loads(output.read_text())
+    result.update(
+        {
+            "run_id": run_id,
+            "artifacts_dir": str(run_dir),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "sampled_peak_rss_mb": round(peak_mb, 1),
+        }
+    )
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run model training in isolation")
+    parser.add_argument("--output", required=True, help="Path of the JSON result file")
+    parser.add_argument("--profile", action="store_true", help="write a sampling profile")
+    args = parser.parse_args(argv)
+
+    from app.ml.pipeline import train_all_models
+
+    profiler = SamplingProfiler(thread_ids={threading.get_ident()}).start() if args.profile else None
+    try:
+        result = train_all_models()
+    finally:
+        if profiler is not None:
+            write_profile(profiler.stop(), profile_path("train_all_models"), "train_all_models")
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    output = Path(args.output)
+    tmp = output.with_suffix(".tmp")
+    tmp.write_text(json.dumps(result, default=str))
+    os.replace(tmp, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
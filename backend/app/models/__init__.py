@@ -2,13 +2,17 @@ from app.models.user import User
 from app.models.goal import UserGoal
 from app.models.training import TrainingProgram, ProgramDay, ProgramExercise
 from app.models.workout import Workout, WorkoutExercise
-from app.models.whoop import WhoopDaily
+from app.models.whoop import WhoopDaily, WhoopDailyRaw, WhoopWorkout
 from app.models.recommendation import Recommendation, RecommendationFeedback
 from app.models.whoop_oauth import WhoopToken, WhoopOAuthState
 from app.models.nutrition import NutritionDaily
 from app.models.exercise import Exercise
 from app.models.workout_template import WorkoutTemplate, WorkoutTemplateExercise
 from app.models.calendar import CalendarWorkout, CalendarWorkoutExercise
+from app.models.snapshot import DailySnapshot
+from app.models.telegram import TelegramMessage, TelegramUpdate
+from app.models.feature import DailyFeature
+from app.models.pipeline import PipelineRun
 
 __all__ = [
     "User",
@@ -19,6 +23,8 @@ __all__ = [
     "Workout",
     "WorkoutExercise",
     "WhoopDaily",
+    "WhoopDailyRaw",
+    "WhoopWorkout",
     "Recommendation",
     "RecommendationFeedback",
     "WhoopToken",
@@ -29,4 +35,9 @@ __all__ = [
     "WorkoutTemplateExercise",
     "CalendarWorkout",
     "CalendarWorkoutExercise",
+    "DailySnapshot",
+    "TelegramUpdate",
+    "TelegramMessage",
+    "DailyFeature",
+    "PipelineRun",
 ]
@@ -12,7 +12,7 @@ class CalendarWorkout(Base):
     __tablename__ = "calendar_workout"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    date: Mapped[date] = mapped_column(Date)
+    date: Mapped[date] = mapped_column(Date, index=True)
     workout_template_id: Mapped[int] = mapped_column(ForeignKey("workout_template.id"))
     name_snapshot: Mapped[str] = mapped_column(String(128))
 
@@ -21,7 +21,9 @@ class CalendarWorkoutExercise(Base):
     __tablename__ = "calendar_workout_exercise"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    calendar_workout_id: Mapped[int] = mapped_column(ForeignKey("calendar_workout.id"))
+    calendar_workout_id: Mapped[int] = mapped_column(
+        ForeignKey("calendar_workout.id"), index=True
+    )
     exercise_id: Mapped[int] = mapped_column(ForeignKey("exercise.id"))
     exercise_name: Mapped[str] = mapped_column(String(128))
     exercise_type: Mapped[str] = mapped_column(String(16))
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DailySnapshot(Base):
+    __tablename__ = "daily_snapshot"
+
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    goal_progress: Mapped[str] = mapped_column(String(64))
+    whoop_date: Mapped[date | None] = mapped_column(Date)
+    recovery_score: Mapped[float | None] = mapped_column(Float)
+    strain: Mapped[float | None] = mapped_column(Float)
+    hrv: Mapped[float | None] = mapped_column(Float)
+    resting_heart_rate: Mapped[float | None] = mapped_column(Float)
+    sleep_duration_minutes: Mapped[int | None] = mapped_column(Integer)
+    sleep_is_previous: Mapped[bool] = mapped_column(Boolean, default=False)
+    body_weight_kg: Mapped[float | None] = mapped_column(Float)
+    recommendation_id: Mapped[int | None] = mapped_column(ForeignKey("recommendation.id"))
+    recommendation_message: Mapped[str | None] = mapped_column(String(512))
+    recommendation_explanation_json: Mapped[dict | None] = mapped_column(JSON)
+    nutrition_date: Mapped[date] = mapped_column(Date)
+    calories: Mapped[int | None] = mapped_column(Integer)
+    protein_g: Mapped[float | None] = mapped_column(Float)
+    fat_g: Mapped[float | None] = mapped_column(Float)
+    carbs_g: Mapped[float | None] = mapped_column(Float)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, Float, Integer, JSON
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
+# JSONB on PostgreSQL: binary, and TOAST-compressed out of line once a row's
+# payloads grow past ~2 KB.
+RawJSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 class WhoopDaily(Base):
     __tablename__ = "whoop_daily"
+    __table_args__ = (Index("ix_whoop_daily_missing_flag_date", "missing_flag", "date"),)
 
     date: Mapped[date] = mapped_column(Date, primary_key=True)
     hrv: Mapped[float | None] = mapped_column(Float)
@@ -18,10 +24,52 @@ class WhoopDaily(Base):
     strain: Mapped[float | None] = mapped_column(Float)
     sleep_duration_minutes: Mapped[int | None] = mapped_column(Integer)
     sleep_efficiency: Mapped[float | None] = mapped_column(Float)
-    sleep_stages_json: Mapped[dict | None] = mapped_column(JSON)
-    sleep_json: Mapped[dict | None] = mapped_column(JSON)
-    recovery_json: Mapped[dict | None] = mapped_column(JSON)
-    cycle_json: Mapped[dict | None] = mapped_column(JSON)
-    workout_json: Mapped[list | None] = mapped_column(JSON)
     body_weight_kg: Mapped[float | None] = mapped_column(Float)
+    sleep_light_minutes: Mapped[int | None] = mapped_column(Integer)
+    sleep_deep_minutes: Mapped[int | None] = mapped_column(Integer)
+    sleep_rem_minutes: Mapped[int | None] = mapped_column(Integer)
+    sleep_awake_minutes: Mapped[int | None] = mapped_column(Integer)
+    respiratory_rate: Mapped[float | None] = mapped_column(Float)
+    spo2_percentage: Mapped[float | None] = mapped_column(Float)
+    skin_temp_celsius: Mapped[float | None] = mapped_column(Float)
     missing_flag: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+# Raw WHOOP records behind a whoop_daily row. Kept out of the hot table so
+# metric queries never load them; read with app.services.whoop_raw.
+class WhoopDailyRaw(Base):
+    __tablename__ = "whoop_daily_raw"
+
+    date: Mapped[date] = mapped_column(
+        ForeignKey("whoop_daily.date", ondelete="CASCADE"), primary_key=True
+    )
+    cycle: Mapped[dict | None] = mapped_column(RawJSON)
+    recovery: Mapped[dict | None] = mapped_column(RawJSON)
+    sleep: Mapped[dict | None] = mapped_column(RawJSON)
+    workouts: Mapped[list | None] = mapped_column(RawJSON)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+# One row per WHOOP workout, extracted from whoop_daily_raw.workouts.
+class WhoopWorkout(Base):
+    __tablename__ = "whoop_workout"
+    __table_args__ = (Index("ix_whoop_workout_sport_name_date", "sport_name", "date"),)
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    date: Mapped[date] = mapped_column(
+        ForeignKey("whoop_daily.date", ondelete="CASCADE"), index=True
+    )
+    sport_name: Mapped[str | None] = mapped_column(String(64))
+    duration_minutes: Mapped[float | None] = mapped_column(Float)
+    strain: Mapped[float | None] = mapped_column(Float)
+    average_heart_rate: Mapped[int | None] = mapped_column(Integer)
+    max_heart_rate: Mapped[int | None] = mapped_column(Integer)
+    kilojoule: Mapped[float | None] = mapped_column(Float)
+    zone_zero_minutes: Mapped[float | None] = mapped_column(Float)
+    zone_one_minutes: Mapped[float | None] = mapped_column(Float)
+    zone_two_minutes: Mapped[float | None] = mapped_column(Float)
+    zone_three_minutes: Mapped[float | None] = mapped_column(Float)
+    zone_four_minutes: Mapped[float | None] = mapped_column(Float)
+    zone_five_minutes: Mapped[float | None] = mapped_column(Float)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date
 
-from sqlalchemy import Date, Float, ForeignKey, Integer, String
+from sqlalchemy import Date, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -10,9 +10,10 @@ from app.db.base import Base
 
 class Workout(Base):
     __tablename__ = "workout"
+    __table_args__ = (Index("ix_workout_program_day_id_date", "program_day_id", "date"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    date: Mapped[date] = mapped_column(Date)
+    date: Mapped[date] = mapped_column(Date, index=True)
     duration_minutes: Mapped[int] = mapped_column(Integer)
     subjective_fatigue: Mapped[int] = mapped_column(Integer)
     workout_quality: Mapped[str] = mapped_column(String(16))
@@ -25,7 +26,7 @@ class WorkoutExercise(Base):
     workout_id: Mapped[int] = mapped_column(
         ForeignKey("workout.id"), primary_key=True
     )
-    exercise_name: Mapped[str] = mapped_column(String(128), primary_key=True)
+    exercise_name: Mapped[str] = mapped_column(String(128), primary_key=True, index=True)
     set_number: Mapped[int] = mapped_column(Integer, primary_key=True)
     exercise_type: Mapped[str] = mapped_column(String(16), default="strength")
     muscle_group: Mapped[str | None] = mapped_column(String(64))
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class CacheRouteStats(BaseModel):
+    route: str
+    hits: int
+    not_modified: int
+    misses: int
+    hit_ratio: float
+
+
+class CacheStats(BaseModel):
+    routes: list[CacheRouteStats]
+    redis: str
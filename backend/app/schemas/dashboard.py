@@ -10,3 +10,10 @@ class DashboardResponse(BaseModel):
     goal_progress: str
     recovery_score: float | None
     latest_recommendation: str | None
+    whoop_date: date | None = None
+    sleep_hours: float | None = None
+    strain: float | None = None
+    hrv: float | None = None
+    resting_heart_rate: float | None = None
+    calories: int | None = None
+    protein_g: float | None = None
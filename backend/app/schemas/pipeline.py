@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class PipelineRunOut(BaseModel):
+    id: int
+    trigger: str
+    status: str
+    stages: list[dict]
+    error: str | None
+    started_at: datetime
+    finished_at: datetime | None
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class TelegramMessageOut(BaseModel):
+    id: int
+    status: str
+    attempts: int
+    telegram_message_id: int | None
+    edit_of_id: int | None
+    error: str | None
+    created_at: datetime
+    sent_at: datetime | None
@@ -24,3 +24,30 @@ class WorkoutCreate(BaseModel):
     workout_quality: str
     program_day_id: int | None = None
     exercises: list[WorkoutExerciseIn]
+
+
+class WorkoutOut(BaseModel):
+    id: int
+    date: date
+    duration_minutes: int
+    subjective_fatigue: int
+    workout_quality: str
+    program_day_id: int | None
+
+
+class WorkoutExerciseOut(BaseModel):
+    workout_id: int
+    exercise_name: str
+    set_number: int
+    exercise_type: str
+    muscle_group: str | None
+    equipment: str | None
+    reps: int
+    weight_kg: float
+    rpe: float
+    duration_minutes: int | None
+
+
+class WorkoutLastOut(BaseModel):
+    workout: WorkoutOut | None
+    exercises: list[WorkoutExerciseOut]
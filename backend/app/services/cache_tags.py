@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import logging
+
+import redis
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Response cache tags (app/api/cache.py). Writers in the API and in workers
+# bump a tag's version here; cached responses keyed by an older version are
+# never read again.
+CACHE_PREFIX = "cache"
+
+
+def tag_key(tag: str) -> str:
+    return f"{CACHE_PREFIX}:tag:{tag}"
+
+
+def invalidate_tags(*tags: str) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        for tag in tags:
+            pipe.incr(tag_key(tag))
+        pipe.execute()
+    except redis.RedisError:
+        logger.error("Failed to invalidate cache tags %s", ", ".join(tags))
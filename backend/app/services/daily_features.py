@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import delete, func, select, union
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert
+from app.models.feature import DailyFeature
+from app.models.nutrition import NutritionDaily
+from app.models.whoop import WhoopDaily, WhoopWorkout
+from app.models.workout import Workout, WorkoutExercise
+
+WHOOP_FEATURES = (
+    "hrv",
+    "resting_heart_rate",
+    "recovery_score",
+    "strain",
+    "sleep_duration_minutes",
+    "sleep_efficiency",
+    "sleep_deep_minutes",
+    "sleep_rem_minutes",
+    "respiratory_rate",
+    "spo2_percentage",
+    "skin_temp_celsius",
+    "body_weight_kg",
+)
+NUTRITION_FEATURES = ("calories", "protein_g", "fat_g", "carbs_g")
+
+
+def _feature_rows(db: Session, days: set[date]) -> dict[date, dict]:
+    rows: dict[date, dict] = {day: {} for day in days}
+    for whoop in db.query(WhoopDaily).filter(WhoopDaily.date.in_(days)):
+        features = rows[whoop.date]
+        for name in WHOOP_FEATURES:
+            features[name] = getattr(whoop, name)
+        features["missing_flag"] = whoop.missing_flag
+    whoop_workouts = (
+        db.query(
+            WhoopWorkout.date,
+            func.count(WhoopWorkout.id),
+            func.sum(WhoopWorkout.strain),
+            func.sum(
+                func.coalesce(WhoopWorkout.zone_four_minutes, 0)
+                + func.coalesce(WhoopWorkout.zone_five_minutes, 0)
+            ),
+        )
+        .filter(WhoopWorkout.date.in_(days))
+        .group_by(WhoopWorkout.date)
+    )
+    for day, count, strain, high_zone_minutes in whoop_workouts:
+        rows[day].update(
+            {
+                "whoop_workouts": count,
+                "whoop_workout_strain": strain,
+                "whoop_high_zone_minutes": high_zone_minutes,
+            }
+        )
+    for nutrition in db.query(NutritionDaily).filter(NutritionDaily.date.in_(days)):
+        features = rows[nutrition.date]
+        for name in NUTRITION_FEATURES:
+            features[name] = getattr(nutrition, name)
+
+    totals: dict[date, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    exercises = (
+        db.query(Workout.date, WorkoutExercise)
+        .join(WorkoutExercise, WorkoutExercise.workout_id == Workout.id)
+        .filter(Workout.date.in_(days))
+    )
+    for day, ex in exercises:
+        if ex.exercise_type == "strength":
+            group = (ex.muscle_group or "Other").lower()
+            totals[day][f"vol_{group}"] += (ex.reps or 0) * (ex.weight_kg or 0)
+        elif ex.exercise_type == "cardio":
+            equipment = (ex.equipment or "Other").lower().replace(" ", "_")
+            totals[day][f"cardio_{equipment}"] += ex.duration_minutes or 0
+    for day, values in totals.items():
+        rows[day].update(values)
+    return {day: features for day, features in rows.items() if features}
+
+
+# Recomputes the stored feature row of each given day and returns the days
+# whose features actually changed; untouched days stay out of later stages.
+def refresh_daily_features(db: Session, days: set[date]) -> set[date]:
+    if not days:
+        return set()
+    computed = _feature_rows(db, days)
+    existing = {
+        row.date: row for row in db.query(DailyFeature).filter(DailyFeature.date.in_(days))
+    }
+    now = datetime.utcnow()
+    writes, removed = [], []
+    for day in days:
+        features = computed.get(day)
+        row = existing.get(day)
+        if features is None:
+            if row is not None:
+                removed.append(day)
+        elif row is None or row.features != features:
+            writes.append({"date": day, "features": features, "updated_at": now})
+    # Upsert, since a concurrent run may insert the same day first.
+    upsert(db, DailyFeature, writes, ("date",))
+    if removed:
+        db.execute(delete(DailyFeature).where(DailyFeature.date.in_(removed)))
+    db.commit()
+    return {values["date"] for values in writes} | set(removed)
+
+
+# Refreshes every day that has source data or a stored row, a year at a time:
+# the backfill for databases that predate daily_feature, and a full repair.
+def rebuild_daily_features(db: Session, chunk_days: int = 366) -> int:
+    days = sorted(
+        db.execute(
+            union(
+                select(WhoopDaily.date),
+                select(WhoopWorkout.date),
+                select(NutritionDaily.date),
+                select(Workout.date),
+                select(DailyFeature.date),
+            )
+        ).scalars()
+    )
+    changed = 0
+    for start in range(0, len(days), chunk_days):
+        changed += len(refresh_daily_features(db, set(days[start : start + chunk_days])))
+    return changed
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild daily_feature from the source tables")
+    parser.parse_args(argv)
+    with SessionLocal() as db:
+        print({"changed_days": rebuild_daily_features(db)})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
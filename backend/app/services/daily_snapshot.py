@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert
+from app.models.goal import UserGoal
+from app.models.nutrition import NutritionDaily
+from app.models.recommendation import Recommendation
+from app.models.snapshot import DailySnapshot
+from app.models.whoop import WhoopDaily
+
+MSK = ZoneInfo("Europe/Moscow")
+
+
+def snapshot_day() -> date:
+    return datetime.now(MSK).date()
+
+
+def format_goal_progress(goal: UserGoal | None) -> str:
+    if not goal:
+        return "No active goal"
+    return goal.goal_type.capitalize()
+
+
+def get_daily_snapshot(db: Session, day: date | None = None) -> DailySnapshot:
+    day = day or snapshot_day()
+    row = db.get(DailySnapshot, day)
+    if row is None:
+        row = rebuild_daily_snapshot(db, day)
+    return row
+
+
+def _snapshot_values(row: DailySnapshot | None) -> dict | None:
+    if row is None:
+        return None
+    return {
+        column.key: getattr(row, column.key)
+        for column in DailySnapshot.__table__.columns
+        if column.key != "updated_at"
+    }
+
+
+def refresh_daily_snapshot(db: Session, day: date | None = None) -> set[date]:
+    day = day or snapshot_day()
+    before = _snapshot_values(db.get(DailySnapshot, day))
+    after = _snapshot_values(rebuild_daily_snapshot(db, day))
+    return {day} if after != before else set()
+
+
+def rebuild_daily_snapshot(db: Session, day: date | None = None) -> DailySnapshot:
+    day = day or snapshot_day()
+    whoop = (
+        db.query(WhoopDaily)
+        .filter(
+            WhoopDaily.missing_flag.is_(False),
+            WhoopDaily.recovery_score.isnot(None),
+        )
+        .order_by(WhoopDaily.date.desc())
+        .first()
+    )
+    goal = db.query(UserGoal).filter(UserGoal.is_active.is_(True)).first()
+    rec = (
+        db.query(Recommendation)
+        .order_by(Recommendation.date.desc(), Recommendation.id.desc())
+        .first()
+    )
+
+    sleep_minutes = whoop.sleep_duration_minutes if whoop else None
+    sleep_is_previous = False
+    if not sleep_minutes:
+        prev_sleep = (
+            db.query(WhoopDaily)
+            .filter(WhoopDaily.sleep_duration_minutes.isnot(None))
+            .order_by(WhoopDaily.date.desc())
+            .first()
+        )
+        if prev_sleep and prev_sleep.sleep_duration_minutes:
+            sleep_minutes = prev_sleep.sleep_duration_minutes
+            sleep_is_previous = True
+
+    nutrition_day = day - timedelta(days=1)
+    nutrition = db.get(NutritionDaily, nutrition_day)
+
+    values = {
+        "date": day,
+        "goal_progress": format_goal_progress(goal),
+        "whoop_date": whoop.date if whoop else None,
+        "recovery_score": whoop.recovery_score if whoop else None,
+        "strain": whoop.strain if whoop else None,
+        "hrv": whoop.hrv if whoop else None,
+        "resting_heart_rate": whoop.resting_heart_rate if whoop else None,
+        "sleep_duration_minutes": sleep_minutes,
+        "sleep_is_previous": sleep_is_previous,
+        "body_weight_kg": whoop.body_weight_kg if whoop else None,
+        "recommendation_id": rec.id if rec else None,
+        "recommendation_message": rec.message if rec else None,
+        "recommendation_explanation_json": rec.explanation_json if rec else None,
+        "nutrition_date": nutrition_day,
+        "calories": nutrition.calories if nutrition else None,
+        "protein_g": nutrition.protein_g if nutrition else None,
+        "fat_g": nutrition.fat_g if nutrition else None,
+        "carbs_g": nutrition.carbs_g if nutrition else None,
+        "updated_at": datetime.utcnow(),
+    }
+    # Upsert: concurrent rebuilds of a missing day (dashboard reads, writers,
+    # the recompute stage) must not collide on the primary key.
+    upsert(db, DailySnapshot, [values], ("date",))
+    db.commit()
+    return db.get(DailySnapshot, day, populate_existing=True)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.pipeline import PipelineRun
+from app.workers.signatures import RECOMPUTE_DAILY, enqueue
+
+logger = logging.getLogger(__name__)
+
+# Sources are the write paths that start a run; stages consume the dates
+# changed by their upstreams and report the dates they changed themselves.
+SOURCES = ("ingest", "nutrition", "workouts")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    upstream: tuple[str, ...]
+    run: Callable[[Session, set[date]], set[date]]
+
+
+def request_recompute(trigger: str, **changes: set[date] | list[date]) -> None:
+    unknown = set(changes) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown recompute sources: {', '.join(sorted(unknown))}")
+    payload = {
+        source: sorted(day.isoformat() for day in days)
+        for source, days in changes.items()
+        if days
+    }
+    if not payload:
+        return
+    try:
+        # Nobody waits on the result: without the result-backend subscription
+        # a broker outage fails the publish in well under a second.
+        enqueue(RECOMPUTE_DAILY, trigger, payload, ignore_result=True)
+    except Exception:
+        # The caller's write is committed; never fail it for the recompute.
+        # requeue_recomputes publishes the pending run later.
+        logger.exception("Failed to enqueue recompute for %s", trigger)
+        _record_pending(trigger, payload)
+
+
+def pending_changes(run: PipelineRun) -> dict[str, list[str]]:
+    return {entry["stage"]: entry["changed"] for entry in run.stages}
+
+
+def _record_pending(trigger: str, payload: dict[str, list[str]]) -> None:
+    stages = [
+        {"stage": source, "status": "source", "changed": days} for source, days in payload.items()
+    ]
+    try:
+        with SessionLocal() as db:
+            db.add(PipelineRun(trigger=trigger, status="pending", stages=stages))
+            db.commit()
+    except SQLAlchemyError:
+        logger.exception("Failed to record pending recompute for %s", trigger)
+
+
+def run_pipeline(
+    db: Session, trigger: str, stages: tuple[Stage, ...], changes: dict[str, set[date]]
+) -> PipelineRun:
+    run = PipelineRun(trigger=trigger, status="running", stages=[])
+    db.add(run)
+    db.commit()
+
+    changed = {source: set(days) for source, days in changes.items()}
+    trace = [
+        {"stage": source, "status": "source", "changed": sorted(d.isoformat() for d in days)}
+        for source, days in changed.items()
+    ]
+    try:
+        for stage in stages:
+            days = set().union(*(changed.get(up, set()) for up in stage.upstream))
+            entry = {"stage": stage.name, "input": sorted(d.isoformat() for d in days)}
+            trace.append(entry)
+            if not days:
+                entry["status"] = "skipped"
+                changed[stage.name] = set()
+                continue
+            started = time.perf_counter()
+            changed[stage.name] = stage.run(db, days)
+            entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            entry["changed"] = sorted(d.isoformat() for d in changed[stage.name])
+            entry["status"] = "ran"
+        run.status = "ok"
+    except Exception as exc:
+        db.rollback()
+        entry["status"] = "failed"
+        run.status = "failed"
+        run.error = f"{stage.name}: {exc}"[:512]
+        logger.exception("Recompute stage %s failed", stage.name)
+        raise
+    finally:
+        run.stages = trace
+        run.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    return run
@@ -1,20 +1,200 @@
 from __future__ import annotations
 
+import logging
+from functools import lru_cache
+
 import httpx
+import redis
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.telegram import TelegramMessage
+from app.workers.signatures import DELIVER_TELEGRAM_MESSAGE, enqueue
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_METRICS_KEY = "telegram:webhook:metrics"
+
+# Two token buckets (global bot limit and per-chat limit) checked atomically.
+# Returns "0" when a token was taken, otherwise the seconds until one frees up.
+_TOKEN_BUCKET = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[i * 2 - 1])
+  local capacity = tonumber(ARGV[i * 2])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + (now - ts) * rate)
+  levels[i] = tokens
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / rate)
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+  redis.call('EXPIRE', key, 60)
+end
+return '0'
+"""
 
 
-def send_telegram_message(text: str, reply_markup: dict | None = None) -> dict:
-    if not settings.telegram_bot_token or not settings.telegram_chat_id:
+@lru_cache
+def _client() -> httpx.Client:
+    return httpx.Client(
+        base_url=f"{str(settings.telegram_api_base_url).rstrip('/')}/bot{settings.telegram_bot_token}",
+        timeout=15.0,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    )
+
+
+def _call(method: str, payload: dict) -> dict:
+    if not settings.telegram_bot_token or not payload.get("chat_id"):
         return {"status": "error", "detail": "Telegram credentials not configured"}
+    try:
+        resp = _client().post(f"/{method}", json=payload)
+    except httpx.RequestError as exc:
+        return {"status": "retry", "detail": str(exc), "retry_after": None}
 
-    url = f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage"
-    payload = {"chat_id": settings.telegram_chat_id, "text": text}
-    if reply_markup:
-        payload["reply_markup"] = reply_markup
-    with httpx.Client(timeout=15.0) as client:
-        resp = client.post(url, json=payload)
-        resp.raise_for_status()
+    try:
         data = resp.json()
+    except ValueError:
+        data = {}
+    if resp.status_code == 429 or resp.status_code >= 500:
+        retry_after = (data.get("parameters") or {}).get("retry_after")
+        return {
+            "status": "retry",
+            "detail": data.get("description") or resp.text[:256],
+            "retry_after": retry_after,
+        }
+    if resp.is_error:
+        return {"status": "error", "detail": data.get("description") or resp.text[:256]}
     return {"status": "ok", "telegram": data}
+
+
+def send_telegram_message(
+    text: str, reply_markup: dict | None = None, chat_id: str | None = None
+) -> dict:
+    payload = {"chat_id": chat_id or settings.telegram_chat_id, "text": text}
+    if reply_markup:
+        payload["reply_markup"] = reply_markup
+    return _call("sendMessage", payload)
+
+
+def edit_telegram_message(
+    message_id: int, text: str, reply_markup: dict | None = None, chat_id: str | None = None
+) -> dict:
+    payload = {
+        "chat_id": chat_id or settings.telegram_chat_id,
+        "message_id": message_id,
+        "text": text,
+    }
+    if reply_markup:
+        payload["reply_markup"] = reply_markup
+    return _call("editMessageText", payload)
+
+
+def _cooldown_key(chat_id: str) -> str:
+    return f"telegram:cooldown:{chat_id}"
+
+
+def acquire_send_slot(chat_id: str) -> float:
+    try:
+        client = get_redis()
+        cooldown_ms = client.pttl(_cooldown_key(chat_id))
+        if cooldown_ms > 0:
+            return cooldown_ms / 1000
+        global_rate = settings.telegram_global_rate_per_second
+        chat_rate = settings.telegram_chat_rate_per_second
+        wait = client.eval(
+            _TOKEN_BUCKET,
+            2,
+            "telegram:bucket:global",
+            f"telegram:bucket:chat:{chat_id}",
+            global_rate,
+            global_rate,
+            chat_rate,
+            max(chat_rate, 1.0),
+        )
+        return float(wait)
+    except redis.RedisError:
+        logger.warning("Telegram rate limiter unavailable; sending unthrottled")
+        return 0.0
+
+
+def apply_retry_after(chat_id: str, retry_after: float) -> None:
+    try:
+        get_redis().set(_cooldown_key(chat_id), 1, px=int(retry_after * 1000))
+    except redis.RedisError:
+        logger.warning("Failed to store Telegram cooldown for chat %s", chat_id)
+
+
+def _update_key(update_id: int) -> str:
+    return f"telegram:update:{update_id}"
+
+
+def mark_update_seen(update_id: int) -> bool | None:
+    # True for a first delivery, False for a redelivery, None if Redis is down.
+    try:
+        client = get_redis()
+        first = client.set(
+            _update_key(update_id), 1, nx=True, ex=settings.telegram_update_ttl_seconds
+        )
+        client.hincrby(WEBHOOK_METRICS_KEY, "received" if first else "duplicates_dropped", 1)
+        return bool(first)
+    except redis.RedisError:
+        logger.warning("Telegram update dedupe unavailable for update %s", update_id)
+        return None
+
+
+def forget_update(update_id: int) -> None:
+    try:
+        get_redis().delete(_update_key(update_id))
+    except redis.RedisError:
+        logger.warning("Failed to clear dedupe marker for update %s", update_id)
+
+
+def webhook_metrics() -> dict[str, int | str]:
+    try:
+        counters = get_redis().hgetall(WEBHOOK_METRICS_KEY)
+    except redis.RedisError:
+        logger.warning("Telegram webhook metrics unavailable")
+        return {"received": 0, "duplicates_dropped": 0, "redis": "unavailable"}
+    return {
+        "received": int(counters.get(b"received", 0)),
+        "duplicates_dropped": int(counters.get(b"duplicates_dropped", 0)),
+    }
+
+
+def enqueue_telegram_message(
+    db: Session,
+    text: str,
+    reply_markup: dict | None = None,
+    edit_of: TelegramMessage | None = None,
+    topic: str | None = None,
+) -> TelegramMessage:
+    message = TelegramMessage(
+        chat_id=settings.telegram_chat_id or "",
+        text=text,
+        reply_markup=reply_markup,
+        edit_of_id=edit_of.id if edit_of else None,
+        topic=topic,
+        status="queued",
+    )
+    db.add(message)
+    db.commit()
+    try:
+        enqueue(DELIVER_TELEGRAM_MESSAGE, message.id)
+    except Exception:
+        # The row is stored; requeue_telegram_messages publishes it later.
+        logger.exception("Failed to enqueue Telegram message %s", message.id)
+        message.status = "pending"
+        db.commit()
+    return message
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import fcntl
+import io
+import logging
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import orjson
+import zstandard
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.recompute import request_recompute
+from app.services.whoop_ingest import record_day, reduce_whoop_records, write_whoop_days
+
+logger = logging.getLogger(__name__)
+
+# Every fetched WHOOP record, append-only, as zstd-compressed JSON lines:
+#
+#   <whoop_archive_dir>/<YYYY-MM>/<kind>.jsonl.zst   one zstd frame per append
+#   <whoop_archive_dir>/<YYYY-MM>/<kind>.keys        record keys already stored
+#
+# A record is keyed by its id plus updated_at, so a re-fetch of an unchanged
+# record is skipped while a re-scored one is appended; readers keep the newest
+# version of each id. The month is the day the reduce step assigns the record.
+ID_FIELDS = {
+    "cycles": "id",
+    "recoveries": "cycle_id",
+    "sleeps": "id",
+    "workouts": "id",
+    "body": "date",
+}
+PARTITION_PATTERN = re.compile(r"\d{4}-\d{2}")
+
+
+def _record_key(kind: str, record: dict) -> str:
+    return f"{record.get(ID_FIELDS[kind])}@{record.get('updated_at') or ''}"
+
+
+def _append(directory: Path, kind: str, records: list[dict]) -> int:
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / f"{kind}.keys").open("a+") as keys:
+        fcntl.flock(keys, fcntl.LOCK_EX)
+        keys.seek(0)
+        seen = set(keys.read().split())
+        fresh = []
+        for record in records:
+            key = _record_key(kind, record)
+            if key not in seen:
+                seen.add(key)
+                fresh.append((key, record))
+        if not fresh:
+            return 0
+        lines = b"".join(orjson.dumps(record) + b"\n" for _, record in fresh)
+        frame = zstandard.ZstdCompressor(level=settings.whoop_archive_level).compress(lines)
+        # Data before keys: a crash in between can only duplicate records,
+        # which readers collapse, never lose them.
+        with (directory / f"{kind}.jsonl.zst").open("ab") as data:
+            data.write(frame)
+            data.flush()
+            os.fsync(data.fileno())
+        keys.write("".join(f"{key}\n" for key, _ in fresh))
+    return len(fresh)
+
+
+def archive_whoop_payload(payload: dict, root: str | Path | None = None) -> int:
+    root = Path(root or settings.whoop_archive_dir)
+    groups: dict[tuple[str, str], list[dict]] = defaultdict(list)
+    for kind in ("cycles", "recoveries", "sleeps", "workouts"):
+        for record in payload[kind]:
+            day = record_day(kind, record)
+            if day:
+                groups[(f"{day:%Y-%m}", kind)].append(record)
+    body = payload.get("body")
+    if isinstance(body, dict) and body:
+        end_date = payload["end_date"]
+        groups[(f"{end_date:%Y-%m}", "body")].append({"date": end_date.isoformat(), **body})
+    return sum(_append(root / month, kind, records) for (month, kind), records in groups.items())
+
+
+def read_partition(directory: Path, kind: str) -> list[dict]:
+    path = directory / f"{kind}.jsonl.zst"
+    if not path.exists():
+        return []
+    latest: dict[str, dict] = {}
+    with path.open("rb") as fh:
+        reader = zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True)
+        for line in io.TextIOWrapper(reader, encoding="utf-8"):
+            record = orjson.loads(line)
+            record_id = str(record.get(ID_FIELDS[kind]))
+            current = latest.get(record_id)
+            updated = record.get("updated_at") or ""
+            if current is None or updated >= (current.get("updated_at") or ""):
+                latest[record_id] = record
+    return list(latest.values())
+
+
+def partitions(
+    root: str | Path | None = None, since: str | None = None, until: str | None = None
+) -> list[Path]:
+    root = Path(root or settings.whoop_archive_dir)
+    if not root.is_dir():
+        return []
+    return sorted(
+        path
+        for path in root.iterdir()
+        if path.is_dir()
+        and PARTITION_PATTERN.fullmatch(path.name)
+        and (since is None or path.name >= since)
+        and (until is None or path.name <= until)
+    )
+
+
+def _reduce_partition(directory: str) -> tuple[dict[date, dict], dict[date, dict]]:
+    path = Path(directory)
+    body_weights = {
+        date.fromisoformat(record["date"]): record["weight_kilogram"]
+        for record in read_partition(path, "body")
+        if record.get("weight_kilogram") is not None
+    }
+    return reduce_whoop_records(
+        read_partition(path, "cycles"),
+        read_partition(path, "recoveries"),
+        read_partition(path, "sleeps"),
+        read_partition(path, "workouts"),
+        body_weights,
+    )
+
+
+# Rebuilds whoop_daily and whoop_daily_raw from the archive without API calls.
+# Partitions are decompressed and reduced in parallel processes; the writes
+# run here, one transaction per month, in month order.
+def replay_archive(
+    db: Session,
+    root: str | Path | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    workers: int | None = None,
+) -> dict:
+    selected = partitions(root, since, until)
+    changed: set[date] = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reduced = pool.map(_reduce_partition, [str(p) for p in selected])
+        for path, (by_date, raw_by_date) in zip(selected, reduced):
+            if not by_date:
+                continue
+            days = sorted(by_date)
+            month_changed = write_whoop_days(db, days[0], days[-1], by_date, raw_by_date)
+            db.commit()
+            changed |= month_changed
+            logger.info("Replayed %s: %s days, %s changed", path.name, len(days), len(month_changed))
+    request_recompute("whoop_replay", ingest=changed)
+    return {"partitions": len(selected), "changed_days": len(changed)}
+
+
+def archive_stats(root: str | Path | None = None) -> dict:
+    selected = partitions(root)
+    size = sum(f.stat().st_size for p in selected for f in p.glob("*.jsonl.zst"))
+    records = sum(
+        len((p / f"{kind}.keys").read_text().split())
+        for p in selected
+        for kind in ID_FIELDS
+        if (p / f"{kind}.keys").exists()
+    )
+    return {
+        "partitions": len(selected),
+        "first": selected[0].name if selected else None,
+        "last": selected[-1].name if selected else None,
+        "records": records,
+        "compressed_bytes": size,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or replay the raw WHOOP archive")
+    parser.add_argument("--root", help="archive directory (default: ATHLETICA_WHOOP_ARCHIVE_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="partitions, records and size")
+    replay = commands.add_parser("replay", help="rebuild whoop_daily from the archive")
+    replay.add_argument("--since", help="first month, YYYY-MM")
+    replay.add_argument("--until", help="last month, YYYY-MM")
+    replay.add_argument("--workers", type=int, help="parallel partition readers")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(archive_stats(args.root))
+        return 0
+
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        print(replay_archive(db, args.root, args.since, args.until, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
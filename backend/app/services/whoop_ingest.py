@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.whoop import WhoopDaily, WhoopDailyRaw, WhoopWorkout
+
+RAW_FIELDS = ("cycle", "recovery", "sleep", "workouts")
+METRIC_FIELDS = (
+    "hrv",
+    "resting_heart_rate",
+    "recovery_score",
+    "strain",
+    "sleep_duration_minutes",
+    "sleep_efficiency",
+    "body_weight_kg",
+    "sleep_light_minutes",
+    "sleep_deep_minutes",
+    "sleep_rem_minutes",
+    "sleep_awake_minutes",
+    "respiratory_rate",
+    "spo2_percentage",
+    "skin_temp_celsius",
+)
+SLEEP_STAGES = {
+    "sleep_light_minutes": "total_light_sleep_time_milli",
+    "sleep_deep_minutes": "total_slow_wave_sleep_time_milli",
+    "sleep_rem_minutes": "total_rem_sleep_time_milli",
+    "sleep_awake_minutes": "total_awake_time_milli",
+}
+HEART_RATE_ZONES = ("zero", "one", "two", "three", "four", "five")
+
+
+def parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+
+def date_range(start: date, end: date) -> list[date]:
+    days = []
+    current = start
+    while current <= end:
+        days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+# The day a WHOOP record belongs to, by collection name.
+def record_day(kind: str, record: dict) -> date | None:
+    if kind == "cycles":
+        return parse_date(record.get("start"))
+    if kind == "recoveries":
+        return parse_date(record.get("created_at")) or parse_date(record.get("updated_at"))
+    return parse_date(record.get("start")) or parse_date(record.get("created_at"))
+
+
+def recovery_values(recovery: dict) -> dict:
+    score = recovery.get("score") or {}
+    return {
+        "hrv": score.get("hrv_rmssd_milli"),
+        "resting_heart_rate": score.get("resting_heart_rate"),
+        "recovery_score": score.get("recovery_score"),
+        "spo2_percentage": score.get("spo2_percentage"),
+        "skin_temp_celsius": score.get("skin_temp_celsius"),
+    }
+
+
+def sleep_values(sleep: dict) -> dict:
+    score = sleep.get("score") or {}
+    stage_summary = score.get("stage_summary") or {}
+    duration_milli = stage_summary.get("total_in_bed_time_milli")
+    values = {
+        "sleep_duration_minutes": int(duration_milli / 60000) if duration_milli else None,
+        "sleep_efficiency": score.get("sleep_efficiency_percentage"),
+        "respiratory_rate": score.get("respiratory_rate"),
+    }
+    for name, key in SLEEP_STAGES.items():
+        milli = stage_summary.get(key)
+        values[name] = int(milli / 60000) if milli is not None else None
+    return values
+
+
+def workout_values(workout: dict, day: date) -> dict:
+    score = workout.get("score") or {}
+    zones = score.get("zone_durations") or {}
+    start = workout.get("start")
+    end = workout.get("end")
+    duration = None
+    if start and end:
+        elapsed = datetime.fromisoformat(end.replace("Z", "+00:00")) - datetime.fromisoformat(
+            start.replace("Z", "+00:00")
+        )
+        duration = round(elapsed.total_seconds() / 60, 1)
+    values = {
+        "id": str(workout["id"]),
+        "date": day,
+        "sport_name": workout.get("sport_name"),
+        "duration_minutes": duration,
+        "strain": score.get("strain"),
+        "average_heart_rate": score.get("average_heart_rate"),
+        "max_heart_rate": score.get("max_heart_rate"),
+        "kilojoule": score.get("kilojoule"),
+    }
+    for zone in HEART_RATE_ZONES:
+        milli = zones.get(f"zone_{zone}_milli")
+        values[f"zone_{zone}_minutes"] = round(milli / 60000, 1) if milli is not None else None
+    return values
+
+
+# Reduce step: raw API records to per-day metric values and raw payloads.
+# Pure, so the sync and the archive replay share it.
+def reduce_whoop_records(
+    cycles: list[dict],
+    recoveries: list[dict],
+    sleeps: list[dict],
+    workouts: list[dict],
+    body_weights: dict[date, float],
+) -> tuple[dict[date, dict], dict[date, dict]]:
+    by_date: dict[date, dict] = {}
+    raw_by_date: dict[date, dict] = {}
+
+    for cycle in cycles:
+        day = record_day("cycles", cycle)
+        if not day:
+            continue
+        score = cycle.get("score") or {}
+        by_date.setdefault(day, {})
+        by_date[day]["strain"] = score.get("strain")
+        raw_by_date.setdefault(day, {})["cycle"] = cycle
+
+    for rec in recoveries:
+        day = record_day("recoveries", rec)
+        if not day:
+            continue
+        by_date.setdefault(day, {}).update(recovery_values(rec))
+        raw_by_date.setdefault(day, {})["recovery"] = rec
+
+    for sleep in sleeps:
+        day = record_day("sleeps", sleep)
+        if not day:
+            continue
+        by_date.setdefault(day, {}).update(sleep_values(sleep))
+        raw_by_date.setdefault(day, {})["sleep"] = sleep
+
+    for workout in workouts:
+        day = record_day("workouts", workout)
+        if not day:
+            continue
+        by_date.setdefault(day, {})
+        raw_by_date.setdefault(day, {}).setdefault("workouts", []).append(workout)
+
+    for day, weight in body_weights.items():
+        by_date.setdefault(day, {})
+        by_date[day]["body_weight_kg"] = weight
+
+    return by_date, raw_by_date
+
+
+# Write step: apply reduced days in [start, end] to whoop_daily,
+# whoop_daily_raw and whoop_workout, touching only values that differ. Days
+# without data are marked missing and workouts no longer reported are
+# removed. Returns the days whose metrics changed; the caller commits.
+def write_whoop_days(
+    db: Session,
+    start: date,
+    end: date,
+    by_date: dict[date, dict],
+    raw_by_date: dict[date, dict],
+) -> set[date]:
+    workouts = [
+        workout_values(workout, day)
+        for day, raw in raw_by_date.items()
+        if start <= day <= end
+        for workout in raw.get("workouts") or []
+        if workout.get("id") is not None
+    ]
+    existing = {
+        row.date: row for row in db.query(WhoopDaily).filter(WhoopDaily.date.between(start, end))
+    }
+    existing_raw = {
+        row.date: row
+        for row in db.query(WhoopDailyRaw).filter(WhoopDailyRaw.date.between(start, end))
+    }
+    # Also by id, so a workout that moved into the window is updated in place.
+    existing_workouts = {
+        row.id: row
+        for row in db.query(WhoopWorkout).filter(
+            or_(
+                WhoopWorkout.date.between(start, end),
+                WhoopWorkout.id.in_([values["id"] for values in workouts]),
+            )
+        )
+    }
+    changed_days: set[date] = set()
+    for day in date_range(start, end):
+        row = existing.get(day)
+        data = by_date.get(day)
+        if not row:
+            row = WhoopDaily(date=day)
+            db.add(row)
+        if data is not None:
+            values = {name: data.get(name) for name in METRIC_FIELDS}
+            values["missing_flag"] = False
+        else:
+            values = {"missing_flag": True}
+        for name, value in values.items():
+            if getattr(row, name) != value:
+                setattr(row, name, value)
+                changed_days.add(day)
+
+        # Raw payloads do not feed features, so they never mark a day changed.
+        raw = raw_by_date.get(day)
+        if raw:
+            raw_row = existing_raw.get(day)
+            if not raw_row:
+                raw_row = WhoopDailyRaw(date=day)
+                db.add(raw_row)
+            for name in RAW_FIELDS:
+                if getattr(raw_row, name) != raw.get(name):
+                    setattr(raw_row, name, raw.get(name))
+
+    for values in workouts:
+        workout = existing_workouts.pop(values["id"], None)
+        if workout is None:
+            db.add(WhoopWorkout(**values))
+            changed_days.add(values["date"])
+            continue
+        for name, value in values.items():
+            if getattr(workout, name) != value:
+                changed_days.update((workout.date, values["date"]))
+                setattr(workout, name, value)
+    for workout in existing_workouts.values():
+        db.delete(workout)
+        changed_days.add(workout.date)
+    return changed_days
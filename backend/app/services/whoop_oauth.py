@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import json
+import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from secrets import token_urlsafe
 from urllib.parse import urlencode
 
+import redis
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.redis import get_redis, redis_lock
 from app.integrations.whoop_client import (
     WhoopToken,
     exchange_code_for_token,
@@ -14,6 +19,11 @@ from app.integrations.whoop_client import (
 )
 from app.models.whoop_oauth import WhoopOAuthState, WhoopToken as WhoopTokenModel
 
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_KEY = "whoop:token"
+REFRESH_LOCK_KEY = "whoop:token:refresh"
+
 SCOPES = [
     "read:recovery",
     "read:cycles",
@@ -25,6 +35,21 @@ SCOPES = [
 ]
 
 
+# The refresh token is never cached: it stays in the whoop_token table.
+@dataclass(frozen=True)
+class CachedWhoopToken:
+    access_token: str
+    expires_at: datetime
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at <= datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+# Process-local copy of the current token, backed by Redis and finally the
+# whoop_token table, so most callers never hit the database.
+_local_token: CachedWhoopToken | None = None
+
+
 def build_auth_url(db: Session) -> tuple[str, str]:
     if settings.whoop_redirect_url is None:
         raise ValueError("WHOOP redirect URL is not configured")
@@ -56,30 +81,108 @@ def exchange_code(db: Session, code: str, state: str) -> WhoopToken:
     return token
 
 
-def get_valid_token(db: Session) -> WhoopTokenModel | None:
-    token_row = db.query(WhoopTokenModel).order_by(WhoopTokenModel.id.desc()).first()
-    if not token_row:
+def _remember(token: CachedWhoopToken) -> None:
+    global _local_token
+    _local_token = token
+    ttl = int((token.expires_at - datetime.now(timezone.utc)).total_seconds())
+    if ttl <= 0:
+        return
+    payload = {"access_token": token.access_token, "expires_at": token.expires_at.isoformat()}
+    try:
+        get_redis().set(TOKEN_CACHE_KEY, json.dumps(payload), ex=ttl)
+    except redis.RedisError:
+        logger.warning("Failed to cache WHOOP token in Redis")
+
+
+def _forget() -> None:
+    global _local_token
+    _local_token = None
+    try:
+        get_redis().delete(TOKEN_CACHE_KEY)
+    except redis.RedisError:
+        logger.warning("Failed to drop cached WHOOP token from Redis")
+
+
+def _token_row(db: Session) -> WhoopTokenModel | None:
+    return db.query(WhoopTokenModel).order_by(WhoopTokenModel.id.desc()).first()
+
+
+def _cached(row: WhoopTokenModel) -> CachedWhoopToken:
+    expires_at = row.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return CachedWhoopToken(access_token=row.access_token, expires_at=expires_at)
+
+
+def _current_token(db: Session) -> CachedWhoopToken | None:
+    global _local_token
+    margin = settings.whoop_token_refresh_margin_seconds
+    if _local_token and not _local_token.expires_within(margin):
+        return _local_token
+    try:
+        raw = get_redis().get(TOKEN_CACHE_KEY)
+    except redis.RedisError:
+        raw = None
+    if raw:
+        data = json.loads(raw)
+        token = CachedWhoopToken(
+            access_token=data["access_token"],
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+        )
+        if not token.expires_within(margin):
+            _local_token = token
+            return token
+    row = _token_row(db)
+    if not row:
         return None
+    token = _cached(row)
+    _remember(token)
+    return token
+
 
-    if token_row.expires_at <= datetime.now(timezone.utc):
-        if not token_row.refresh_token:
+def _refresh(db: Session, stale_access_token: str) -> CachedWhoopToken | None:
+    # Single flight across workers: whoever holds the lock refreshes, everyone
+    # else waits and then picks up the rotated token from the database.
+    with redis_lock(REFRESH_LOCK_KEY, timeout=60, blocking_timeout=30) as held:
+        row = _token_row(db)
+        if not row:
+            return None
+        if row.access_token != stale_access_token:
+            current = _cached(row)
+            _remember(current)
+            return current
+        if not held or not row.refresh_token:
             return None
-        new_token = refresh_access_token(token_row.refresh_token)
-        _upsert_token(db, new_token)
-        token_row = db.query(WhoopTokenModel).order_by(WhoopTokenModel.id.desc()).first()
-    return token_row
+        new_token = refresh_access_token(row.refresh_token)
+        return _upsert_token(db, new_token)
 
 
-def force_refresh_token(db: Session) -> WhoopTokenModel | None:
-    token_row = db.query(WhoopTokenModel).order_by(WhoopTokenModel.id.desc()).first()
-    if not token_row or not token_row.refresh_token:
+def get_valid_token(
+    db: Session, refresh_margin_seconds: int | None = None
+) -> CachedWhoopToken | None:
+    token = _current_token(db)
+    if not token:
         return None
-    new_token = refresh_access_token(token_row.refresh_token)
-    _upsert_token(db, new_token)
-    return db.query(WhoopTokenModel).order_by(WhoopTokenModel.id.desc()).first()
+    margin = (
+        settings.whoop_token_refresh_margin_seconds
+        if refresh_margin_seconds is None
+        else refresh_margin_seconds
+    )
+    if token.expires_within(margin):
+        refreshed = _refresh(db, token.access_token)
+        if refreshed:
+            return refreshed
+        if token.expires_within(0):
+            return None
+    return token
+
+
+def force_refresh_token(db: Session, stale_access_token: str) -> CachedWhoopToken | None:
+    _forget()
+    return _refresh(db, stale_access_token)
 
 
-def _upsert_token(db: Session, token: WhoopToken) -> None:
+def _upsert_token(db: Session, token: WhoopToken) -> CachedWhoopToken:
     expires_at = datetime.now(timezone.utc) + timedelta(seconds=token.expires_in)
 
     db.query(WhoopTokenModel).delete()
@@ -92,3 +195,6 @@ def _upsert_token(db: Session, token: WhoopToken) -> None:
         )
     )
     db.commit()
+    cached = CachedWhoopToken(access_token=token.access_token, expires_at=expires_at)
+    _remember(cached)
+    return cached
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from datetime import date
+
+from sqlalchemy import (
+    Engine,
+    bindparam,
+    column,
+    func,
+    insert,
+    inspect,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.models.whoop import WhoopDaily, WhoopDailyRaw, WhoopWorkout
+from app.services.recompute import request_recompute
+from app.services.whoop_ingest import SLEEP_STAGES, recovery_values, sleep_values, workout_values
+
+logger = logging.getLogger(__name__)
+
+# Inline JSON columns whoop_daily carried before the payloads moved to
+# whoop_daily_raw, mapped to their new names. sleep_stages_json duplicated
+# sleep.score.stage_summary and is dropped without a copy.
+LEGACY_COLUMNS = {
+    "cycle_json": "cycle",
+    "recovery_json": "recovery",
+    "sleep_json": "sleep",
+    "workout_json": "workouts",
+}
+DROPPED_COLUMNS = (*LEGACY_COLUMNS, "sleep_stages_json")
+# Typed whoop_daily columns filled from the raw payloads by extract_whoop_typed.
+TYPED_COLUMNS = (*SLEEP_STAGES, "respiratory_rate", "spo2_percentage", "skin_temp_celsius")
+EXTRACT_BATCH = 1000
+
+
+def get_whoop_raw(db: Session, day: date) -> WhoopDailyRaw | None:
+    return db.get(WhoopDailyRaw, day)
+
+
+def list_whoop_raw(db: Session, start: date, end: date) -> list[WhoopDailyRaw]:
+    return (
+        db.query(WhoopDailyRaw)
+        .filter(WhoopDailyRaw.date.between(start, end))
+        .order_by(WhoopDailyRaw.date)
+        .all()
+    )
+
+
+# Copies payloads still stored inline on whoop_daily into whoop_daily_raw
+# (skipping days already there), then optionally drops the old columns.
+def backfill_whoop_raw(engine: Engine, drop_columns: bool = False) -> dict:
+    WhoopDailyRaw.__table__.create(engine, checkfirst=True)
+    present = {col["name"] for col in inspect(engine).get_columns("whoop_daily")}
+    legacy = [name for name in LEGACY_COLUMNS if name in present]
+    copied = 0
+    if legacy:
+        source = table("whoop_daily", column("date"), *(column(name) for name in legacy))
+        raw = WhoopDailyRaw.__table__
+        rows = (
+            select(
+                source.c.date,
+                *(source.c[name] for name in legacy),
+                func.current_timestamp(),
+            )
+            .where(source.c.date.not_in(select(raw.c.date)))
+            .where(or_(*(source.c[name].isnot(None) for name in legacy)))
+        )
+        targets = ["date", *(LEGACY_COLUMNS[name] for name in legacy), "updated_at"]
+        with engine.begin() as conn:
+            copied = conn.execute(insert(raw).from_select(targets, rows)).rowcount
+    dropped = []
+    if drop_columns:
+        with engine.begin() as conn:
+            for name in DROPPED_COLUMNS:
+                if name in present:
+                    conn.execute(text(f"ALTER TABLE whoop_daily DROP COLUMN {name}"))
+                    dropped.append(name)
+    logger.info("Backfilled %s whoop_daily_raw rows, dropped %s", copied, dropped or "nothing")
+    return {"copied": copied, "dropped": dropped}
+
+
+# Adds the typed columns and whoop_workout to an existing schema and fills
+# them from whoop_daily_raw, one batch of days per transaction. Days already
+# extracted keep their values; workouts already present are skipped.
+def extract_whoop_typed(engine: Engine) -> dict:
+    present = {col["name"] for col in inspect(engine).get_columns("whoop_daily")}
+    columns = WhoopDaily.__table__.c
+    with engine.begin() as conn:
+        for name in TYPED_COLUMNS:
+            if name not in present:
+                ddl = columns[name].type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE whoop_daily ADD COLUMN {name} {ddl}"))
+    WhoopWorkout.__table__.create(engine, checkfirst=True)
+
+    raw = WhoopDailyRaw.__table__
+    daily = WhoopDaily.__table__
+    set_typed = (
+        update(daily)
+        .where(daily.c.date == bindparam("day"))
+        .values({name: bindparam(name) for name in TYPED_COLUMNS})
+    )
+    changed: set[date] = set()
+    workouts = 0
+    after = date.min
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(raw.c.date, raw.c.recovery, raw.c.sleep, raw.c.workouts)
+                .where(raw.c.date > after)
+                .order_by(raw.c.date)
+                .limit(EXTRACT_BATCH)
+            ).all()
+            if not rows:
+                break
+            after = rows[-1].date
+            days = [row.date for row in rows]
+            done = set(
+                conn.execute(
+                    select(daily.c.date)
+                    .where(daily.c.date.in_(days))
+                    .where(or_(*(daily.c[name].isnot(None) for name in TYPED_COLUMNS)))
+                ).scalars()
+            )
+            typed = []
+            new_workouts = []
+            for row in rows:
+                values = {name: None for name in TYPED_COLUMNS}
+                if row.recovery:
+                    values.update(recovery_values(row.recovery))
+                if row.sleep:
+                    values.update(sleep_values(row.sleep))
+                if row.date not in done and any(values[name] is not None for name in TYPED_COLUMNS):
+                    typed.append({"day": row.date, **{name: values[name] for name in TYPED_COLUMNS}})
+                new_workouts.extend(
+                    workout_values(workout, row.date)
+                    for workout in row.workouts or []
+                    if workout.get("id") is not None
+                )
+            if new_workouts:
+                stored = set(
+                    conn.execute(
+                        select(WhoopWorkout.id).where(
+                            WhoopWorkout.id.in_([values["id"] for values in new_workouts])
+                        )
+                    ).scalars()
+                )
+                new_workouts = [values for values in new_workouts if values["id"] not in stored]
+            if typed:
+                conn.execute(set_typed, typed)
+            if new_workouts:
+                conn.execute(insert(WhoopWorkout), new_workouts)
+        changed.update(values["day"] for values in typed)
+        changed.update(values["date"] for values in new_workouts)
+        workouts += len(new_workouts)
+    request_recompute("whoop_extract", ingest=changed)
+    logger.info("Extracted typed WHOOP values for %s days, %s workouts", len(changed), workouts)
+    return {"days": len(changed), "workouts": workouts}
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(
+        description="Move inline WHOOP JSON into whoop_daily_raw and extract typed columns"
+    )
+    parser.add_argument(
+        "--drop-columns", action="store_true", help="drop the inline JSON columns afterwards"
+    )
+    args = parser.parse_args(argv)
+    print(backfill_whoop_raw(engine, drop_columns=args.drop_columns))
+    print(extract_whoop_typed(engine))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.workers.signatures import SYNC_WHOOP, enqueue
+
+SYNC_LOCK_KEY = "whoop:sync:running"
+SYNC_RERUN_KEY = "whoop:sync:rerun"
+
+
+def request_whoop_sync() -> dict:
+    try:
+        client = get_redis()
+        running = client.get(SYNC_LOCK_KEY)
+        if running:
+            client.set(SYNC_RERUN_KEY, 1, ex=settings.whoop_sync_lock_seconds)
+            return {"status": "running", "run_id": running.decode()}
+    except redis.RedisError:
+        pass
+    result = enqueue(SYNC_WHOOP)
+    return {"status": "queued", "run_id": result.id}
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Exchange, Queue
 
 from app.core.config import settings
 
@@ -11,12 +12,90 @@ celery_app = Celery(
     backend=settings.redis_url,
     include=["app.workers.tasks"],
 )
+
+# Three queues so user-facing work never waits behind batch jobs:
+#   interactive - Telegram updates, insights and outbound messages (seconds)
+#   whoop       - WHOOP API I/O (minutes, network bound)
+#   ml          - feature building and model training (many minutes, CPU/RAM bound)
+# Concurrency and prefetch are set per worker in docker-compose.yml.
+celery_app.conf.task_queues = tuple(
+    Queue(name, Exchange(name, type="direct"), routing_key=name)
+    for name in ("interactive", "whoop", "ml")
+)
+celery_app.conf.task_default_queue = "interactive"
 celery_app.conf.task_routes = {
     "app.workers.tasks.sync_whoop": {"queue": "whoop"},
+    "app.workers.tasks.refresh_whoop_token": {"queue": "whoop"},
     "app.workers.tasks.train_models": {"queue": "ml"},
-    "app.workers.tasks.send_daily_insight": {"queue": "ml"},
-    "app.workers.tasks.send_nutrition_prompt": {"queue": "ml"},
+    "app.workers.tasks.send_daily_insight": {"queue": "interactive"},
+    "app.workers.tasks.send_nutrition_prompt": {"queue": "interactive"},
+    "app.workers.tasks.process_telegram_update": {"queue": "interactive"},
+    "app.workers.tasks.deliver_telegram_message": {"queue": "interactive"},
+    "app.workers.tasks.requeue_telegram_messages": {"queue": "interactive"},
+    "app.workers.tasks.recompute_daily": {"queue": "interactive"},
+    "app.workers.tasks.requeue_recomputes": {"queue": "interactive"},
+}
+# Redis priorities: 0 is served first within a queue.
+celery_app.conf.broker_transport_options = {
+    "priority_steps": list(range(10)),
+    "queue_order_strategy": "priority",
+}
+celery_app.conf.task_default_priority = 5
+celery_app.conf.task_annotations = {
+    "app.workers.tasks.process_telegram_update": {
+        "priority": 0,
+        "soft_time_limit": 30,
+        "time_limit": 60,
+    },
+    "app.workers.tasks.deliver_telegram_message": {
+        "priority": 1,
+        "soft_time_limit": 30,
+        "time_limit": 45,
+    },
+    "app.workers.tasks.send_daily_insight": {
+        "priority": 2,
+        "soft_time_limit": 60,
+        "time_limit": 90,
+    },
+    "app.workers.tasks.send_nutrition_prompt": {
+        "priority": 3,
+        "soft_time_limit": 30,
+        "time_limit": 60,
+    },
+    "app.workers.tasks.requeue_telegram_messages": {
+        "priority": 3,
+        "soft_time_limit": 30,
+        "time_limit": 60,
+    },
+    "app.workers.tasks.recompute_daily": {
+        "priority": 4,
+        "soft_time_limit": 60,
+        "time_limit": 90,
+    },
+    "app.workers.tasks.requeue_recomputes": {
+        "priority": 4,
+        "soft_time_limit": 30,
+        "time_limit": 60,
+    },
+    "app.workers.tasks.refresh_whoop_token": {
+        "priority": 0,
+        "soft_time_limit": 60,
+        "time_limit": 90,
+    },
+    "app.workers.tasks.sync_whoop": {
+        "priority": 5,
+        "soft_time_limit": 600,
+        "time_limit": 900,
+    },
+    "app.workers.tasks.train_models": {
+        "priority": 9,
+        "soft_time_limit": 1800,
+        "time_limit": 2100,
+    },
 }
+celery_app.conf.task_acks_late = True
+celery_app.conf.task_reject_on_worker_lost = True
+celery_app.conf.worker_prefetch_multiplier = 1
 celery_app.conf.timezone = "Europe/Moscow"
 celery_app.conf.enable_utc = False
 celery_app.conf.beat_schedule = {
@@ -24,8 +103,23 @@ celery_app.conf.beat_schedule = {
         "task": "app.workers.tasks.sync_whoop",
         "schedule": crontab(minute=0),
     },
+    "whoop-token-refresh": {
+        "task": "app.workers.tasks.refresh_whoop_token",
+        "schedule": crontab(minute="*/5"),
+    },
+    "telegram-message-requeue": {
+        "task": "app.workers.tasks.requeue_telegram_messages",
+        "schedule": crontab(minute="*"),
+    },
+    "recompute-requeue": {
+        "task": "app.workers.tasks.requeue_recomputes",
+        "schedule": crontab(minute="*"),
+    },
     "daily-telegram-nutrition-prompt": {
         "task": "app.workers.tasks.send_nutrition_prompt",
         "schedule": crontab(hour=11, minute=0),
     },
 }
+
+# Connect the signal handlers in every process that publishes or runs tasks.
+from app.workers import monitoring  # noqa: E402,F401
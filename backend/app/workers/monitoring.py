@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import redis
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_ready,
+)
+
+from app.core.config import settings
+from app.core.metrics import (
+    DEFAULT_BUCKETS,
+    Histogram,
+    bucket_index,
+    render_histogram,
+    render_samples,
+)
+from app.core.profiling import (
+    SamplingProfiler,
+    profile_path,
+    task_profiling_enabled,
+    write_profile,
+)
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "metrics:celery"
+PUBLISHED_HEADER = "athletica_published_at"
+COUNTERS = ("succeeded", "failed", "retried")
+
+_started: dict[str, float] = {}
+_profiles: dict[str, SamplingProfiler] = {}
+
+
+def _histogram_key(metric: str, task: str) -> str:
+    return f"{METRICS_PREFIX}:{metric}:{task}"
+
+
+def _observe(pipe: redis.client.Pipeline, metric: str, task: str, value: float) -> None:
+    key = _histogram_key(metric, task)
+    pipe.hincrby(key, f"b{bucket_index(DEFAULT_BUCKETS, value)}", 1)
+    pipe.hincrbyfloat(key, "sum", value)
+    pipe.hincrby(key, "count", 1)
+    pipe.sadd(f"{METRICS_PREFIX}:tasks", task)
+
+
+def _count(task: str, counter: str) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hincrby(f"{METRICS_PREFIX}:counters:{task}", counter, 1)
+        pipe.sadd(f"{METRICS_PREFIX}:tasks", task)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Failed to record %s for task %s", counter, task)
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers: dict | None = None, **_: object) -> None:
+    if headers is not None:
+        headers[PUBLISHED_HEADER] = time.time()
+
+
+@task_prerun.connect
+def _on_prerun(task_id: str | None = None, task=None, **_: object) -> None:
+    now = time.time()
+    _started[task_id] = time.perf_counter()
+    published = task.request.get(PUBLISHED_HEADER) if task is not None else None
+    if not published or task.request.is_eager:
+        return
+    # Delayed tasks (countdown/eta) only start waiting once they are due.
+    eta = task.request.eta
+    if eta:
+        due = datetime.fromisoformat(eta).timestamp() if isinstance(eta, str) else eta.timestamp()
+        published = max(published, due)
+    try:
+        pipe = get_redis().pipeline()
+        _observe(pipe, "queue_wait", task.name, max(0.0, now - published))
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Failed to record queue wait for %s", task.name)
+
+
+@task_postrun.connect
+def _on_postrun(task_id: str | None = None, task=None, state: str | None = None, **_: object) -> None:
+    started = _started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    runtime = time.perf_counter() - started
+    try:
+        pipe = get_redis().pipeline()
+        _observe(pipe, "runtime", task.name, runtime)
+        pipe.hset(f"{METRICS_PREFIX}:last:{task.name}", mapping={"runtime": runtime, "at": time.time()})
+        if state == "SUCCESS":
+            pipe.hincrby(f"{METRICS_PREFIX}:counters:{task.name}", "succeeded", 1)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Failed to record runtime for %s", task.name)
+
+
+@task_failure.connect
+def _on_failure(sender=None, **_: object) -> None:
+    if sender is not None:
+        _count(sender.name, "failed")
+
+
+@task_retry.connect
+def _on_retry(sender=None, **_: object) -> None:
+    if sender is not None:
+        _count(sender.name, "retried")
+
+
+# Tasks declared with profiles_subprocess=True hand the profile to the child
+# process doing the work; sampling their own thread would only show the wait.
+@task_prerun.connect
+def _start_profile(task_id: str | None = None, task=None, **_: object) -> None:
+    if task is None or getattr(task, "profiles_subprocess", False):
+        return
+    if not task_profiling_enabled(task.name, task.request):
+        return
+    _profiles[task_id] = SamplingProfiler(thread_ids={threading.get_ident()}).start()
+
+
+@task_postrun.connect
+def _stop_profile(task_id: str | None = None, task=None, **_: object) -> None:
+    profiler = _profiles.pop(task_id, None)
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        path = write_profile(profiler, profile_path(task.name), task.name)
+        logger.info("Profile of %s written to %s", task.name, path)
+    except OSError:
+        logger.exception("Failed to write profile for %s", task.name)
+
+
+def collect() -> dict[str, dict]:
+    client = get_redis()
+    tasks = sorted(t.decode() for t in client.smembers(f"{METRICS_PREFIX}:tasks"))
+    pipe = client.pipeline()
+    for task in tasks:
+        pipe.hgetall(_histogram_key("runtime", task))
+        pipe.hgetall(_histogram_key("queue_wait", task))
+        pipe.hgetall(f"{METRICS_PREFIX}:counters:{task}")
+        pipe.hgetall(f"{METRICS_PREFIX}:last:{task}")
+    raw = pipe.execute()
+    data = {}
+    for i, task in enumerate(tasks):
+        runtime, wait, counters, last = raw[i * 4 : i * 4 + 4]
+        data[task] = {
+            "runtime": Histogram.from_fields(runtime),
+            "queue_wait": Histogram.from_fields(wait),
+            "counters": {name: int(counters.get(name.encode(), 0)) for name in COUNTERS},
+            "last_runtime": float(last[b"runtime"]) if b"runtime" in last else None,
+        }
+    return data
+
+
+def render_prometheus(data: dict[str, dict]) -> str:
+    lines = render_histogram(
+        "athletica_celery_task_runtime_seconds",
+        "Task execution time.",
+        (({"task": task}, item["runtime"]) for task, item in data.items()),
+    )
+    lines += render_histogram(
+        "athletica_celery_task_queue_wait_seconds",
+        "Time between publish (or ETA) and start.",
+        (({"task": task}, item["queue_wait"]) for task, item in data.items()),
+    )
+    lines += render_samples(
+        "athletica_celery_task_total",
+        "counter",
+        "Finished tasks by outcome.",
+        (
+            ({"task": task, "outcome": name}, item["counters"][name])
+            for task, item in data.items()
+            for name in COUNTERS
+        ),
+    )
+    lines += render_samples(
+        "athletica_celery_task_last_runtime_seconds",
+        "gauge",
+        "Runtime of the most recent execution.",
+        (
+            ({"task": task}, item["last_runtime"])
+            for task, item in data.items()
+            if item["last_runtime"] is not None
+        ),
+    )
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_prometheus(collect()).encode()
+        except redis.RedisError:
+            self.send_error(503, "Redis unavailable")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@worker_ready.connect
+def _start_metrics_server(**_: object) -> None:
+    port = settings.worker_metrics_port
+    if not port:
+        return
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Celery metrics on :%s/metrics", port)
+
+
+def _fmt(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    return f"{seconds:.1f}s"
+
+
+def report(data: dict[str, dict], slow_factor: float) -> str:
+    header = (
+        f"{'task':<42} {'runs':>6} {'p50':>8} {'p95':>8} {'last':>8} "
+        f"{'wait p95':>9} {'retried':>8} {'failed':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for task, item in data.items():
+        runtime = item["runtime"]
+        p50 = runtime.quantile(0.5)
+        last = item["last_runtime"]
+        flag = "  SLOW" if last is not None and p50 and last > p50 * slow_factor else ""
+        lines.append(
+            f"{task.rsplit('.', 1)[-1]:<42} {runtime.count:>6} {_fmt(p50):>8} "
+            f"{_fmt(runtime.quantile(0.95)):>8} {_fmt(last):>8} "
+            f"{_fmt(item['queue_wait'].quantile(0.95)):>9} "
+            f"{item['counters']['retried']:>8} {item['counters']['failed']:>7}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise Celery task metrics")
+    parser.add_argument("--prometheus", action="store_true", help="print the raw exposition")
+    parser.add_argument(
+        "--slow-factor",
+        type=float,
+        default=2.0,
+        help="flag tasks whose last run exceeded the median by this factor",
+    )
+    args = parser.parse_args(argv)
+    data = collect()
+    print(render_prometheus(data) if args.prometheus else report(data, args.slow_factor))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
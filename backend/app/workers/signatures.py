@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from celery.result import AsyncResult
+
+from app.workers.celery_app import celery_app
+
+# Publishers outside the workers (the API, services) enqueue by name so they
+# never import app.workers.tasks and what it pulls in. When the task is not
+# registered in this process Celery publishes with send_task, which applies
+# task_routes but not task_annotations, so the priority is passed explicitly.
+PROCESS_TELEGRAM_UPDATE = "app.workers.tasks.process_telegram_update"
+DELIVER_TELEGRAM_MESSAGE = "app.workers.tasks.deliver_telegram_message"
+RECOMPUTE_DAILY = "app.workers.tasks.recompute_daily"
+SYNC_WHOOP = "app.workers.tasks.sync_whoop"
+
+
+def enqueue(name: str, *args: object, **options: object) -> AsyncResult:
+    annotation = celery_app.conf.task_annotations.get(name) or {}
+    if "priority" in annotation:
+        options.setdefault("priority", annotation["priority"])
+    return celery_app.signature(name, args=args).apply_async(**options)
@@ -1,40 +1,91 @@
 from __future__ import annotations
 
+import logging
+import re
 from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from os import getenv
+from uuid import uuid4
 
 import httpx
+import redis
+from celery.exceptions import Retry
 
+from app.core.config import settings
+from app.core.profiling import task_profiling_enabled
+from app.core.redis import get_redis, redis_lock
 from app.db.session import SessionLocal
-from app.integrations.whoop_client import WhoopClient
-from app.ml.pipeline import train_all_models
-from app.models.goal import UserGoal
+from app.integrations.whoop_client import WhoopClient, retry_after_seconds
+from app.ml.runner import run_training
 from app.models.nutrition import NutritionDaily
+from app.models.pipeline import PipelineRun
 from app.models.recommendation import Recommendation, RecommendationFeedback
+from app.models.snapshot import DailySnapshot
+from app.models.telegram import TelegramMessage, TelegramUpdate
 from app.models.whoop import WhoopDaily
-from app.services.telegram import send_telegram_message
+from app.services.cache_tags import invalidate_tags
+from app.services.daily_features import refresh_daily_features
+from app.services.daily_snapshot import (
+    get_daily_snapshot,
+    refresh_daily_snapshot,
+    snapshot_day,
+)
+from app.services.recompute import Stage, pending_changes, request_recompute, run_pipeline
+from app.services.telegram import (
+    acquire_send_slot,
+    apply_retry_after,
+    edit_telegram_message,
+    enqueue_telegram_message,
+    send_telegram_message,
+)
+from app.services.whoop_archive import archive_whoop_payload
+from app.services.whoop_ingest import reduce_whoop_records, write_whoop_days
 from app.services.whoop_oauth import force_refresh_token, get_valid_token
+from app.services.whoop_sync import SYNC_LOCK_KEY, SYNC_RERUN_KEY
 from app.workers.celery_app import celery_app
 
+logger = logging.getLogger(__name__)
 
-def _parse_date(value: str | None) -> date | None:
-    if not value:
-        return None
-    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
 
+# Only one sync runs at a time. A trigger that arrives mid-run (beat, cron or
+# manual) leaves a rerun marker instead of fetching the same days in parallel.
+@celery_app.task(bind=True)
+def sync_whoop(self) -> dict:
+    run_id = self.request.id or uuid4().hex
+    try:
+        client = get_redis()
+        lock = client.lock(
+            SYNC_LOCK_KEY, timeout=settings.whoop_sync_lock_seconds, thread_local=False
+        )
+        if not lock.acquire(blocking=False, token=run_id):
+            client.set(SYNC_RERUN_KEY, 1, ex=settings.whoop_sync_lock_seconds)
+            running = client.get(SYNC_LOCK_KEY)
+            return {"status": "coalesced", "run_id": running.decode() if running else None}
+    except redis.RedisError:
+        lock = None
+
+    retrying = False
+    try:
+        return _sync_whoop()
+    except Retry:
+        retrying = True
+        raise
+    finally:
+        if lock is not None:
+            _finish_sync(lock, rerun=not retrying)
 
-def _date_range(start: date, end: date) -> list[date]:
-    days = []
-    current = start
-    while current <= end:
-        days.append(current)
-        current += timedelta(days=1)
-    return days
 
+def _finish_sync(lock: redis.lock.Lock, rerun: bool) -> None:
+    try:
+        lock.release()
+        # A pending retry keeps the marker; it is consumed when that run ends.
+        if rerun and get_redis().getdel(SYNC_RERUN_KEY):
+            sync_whoop.delay()
+    except redis.RedisError:
+        logger.warning("Failed to release WHOOP sync lock")
 
-@celery_app.task
-def sync_whoop() -> dict:
+
+def _sync_whoop() -> dict:
     db = SessionLocal()
     try:
         token_row = get_valid_token(db)
@@ -75,32 +126,46 @@ def sync_whoop() -> dict:
         try:
             payload = _fetch_all()
         except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 401:
-                refreshed = force_refresh_token(db)
-                if not refreshed:
-                    return {"status": "unauthorized"}
-                client = WhoopClient(refreshed.access_token)
-                payload = _fetch_all()
-                return _ingest_whoop(db, payload)
-            raise
+            if exc.response.status_code != 401:
+                raise
+            refreshed = force_refresh_token(db, token_row.access_token)
+            if not refreshed:
+                return {"status": "unauthorized"}
+            client = WhoopClient(refreshed.access_token)
+            payload = _fetch_all()
+        _archive_whoop(payload)
         return _ingest_whoop(db, payload)
     except httpx.RequestError as exc:
         raise sync_whoop.retry(exc=exc, countdown=30, max_retries=5)
     except httpx.HTTPStatusError as exc:
-        raise sync_whoop.retry(exc=exc, countdown=60, max_retries=3)
+        countdown = 60
+        if exc.response.status_code == 429:
+            countdown = max(countdown, retry_after_seconds(exc.response))
+        raise sync_whoop.retry(exc=exc, countdown=countdown, max_retries=3)
     finally:
         db.close()
 
 
 @celery_app.task
-def train_models() -> dict:
-    return train_all_models()
+def refresh_whoop_token() -> dict:
+    db = SessionLocal()
+    try:
+        # Refresh well ahead of the inline margin so syncs never pay for it.
+        margin = settings.whoop_token_refresh_margin_seconds * 3
+        token = get_valid_token(db, refresh_margin_seconds=margin)
+        if not token:
+            return {"status": "unauthorized"}
+        return {"status": "ok", "expires_at": token.expires_at.isoformat()}
+    finally:
+        db.close()
 
 
-def _format_goal_progress(goal: UserGoal | None) -> str:
-    if not goal:
-        return "No active goal"
-    return goal.goal_type.capitalize()
+@celery_app.task(bind=True, ignore_result=True, profiles_subprocess=True)
+def train_models(self) -> dict:
+    # Feature building runs in the child process, so profile only there.
+    result = run_training(profile=task_profiling_enabled(self.name, self.request))
+    logger.info("ML run %s finished: %s", result["run_id"], result)
+    return result
 
 
 def _format_reason(explanation: dict | None) -> str:
@@ -113,30 +178,28 @@ def _format_reason(explanation: dict | None) -> str:
     return f"\nReason:\n{lines}"
 
 
-def _calc_nutrition_note(
-    db: SessionLocal, day: date, body_weight_kg: float | None
-) -> tuple[str, str]:
-    row = db.query(NutritionDaily).filter(NutritionDaily.date == day).first()
-    if not row:
+def _calc_nutrition_note(snapshot: DailySnapshot) -> tuple[str, str]:
+    day = snapshot.nutrition_date
+    if snapshot.calories is None:
         return (
             f"Nutrition ({day}): not logged.",
             "Nutrition Recommendation:\nLog your intake for the previous day.",
         )
 
     summary = (
-        f"Nutrition ({day}): {row.calories} kcal · "
-        f"P {row.protein_g}g · F {row.fat_g}g · C {row.carbs_g}g"
+        f"Nutrition ({day}): {snapshot.calories} kcal · "
+        f"P {snapshot.protein_g}g · F {snapshot.fat_g}g · C {snapshot.carbs_g}g"
     )
     recs = []
-    if body_weight_kg:
-        target_protein = 1.6 * body_weight_kg
-        if row.protein_g < target_protein:
+    if snapshot.body_weight_kg:
+        target_protein = 1.6 * snapshot.body_weight_kg
+        if snapshot.protein_g < target_protein:
             recs.append(
-                f"Increase protein by ~{int(target_protein - row.protein_g)}g."
+                f"Increase protein by ~{int(target_protein - snapshot.protein_g)}g."
             )
-    if row.calories < 1800:
+    if snapshot.calories < 1800:
         recs.append("Calories look low; consider a small increase.")
-    elif row.calories > 3200:
+    elif snapshot.calories > 3200:
         recs.append("Calories look high; consider a small reduction.")
     if not recs:
         recs.append("Keep current nutrition plan today.")
@@ -154,180 +217,415 @@ def send_nutrition_prompt() -> dict:
         "`calories protein fat carbs`\n"
         "Example: `2200 160 70 240`"
     )
-    send_telegram_message(message)
-    return {"status": "ok", "date": str(target_day)}
+    db = SessionLocal()
+    try:
+        outbound = enqueue_telegram_message(db, message)
+        return {"status": "queued", "date": str(target_day), "message_id": outbound.id}
+    finally:
+        db.close()
+
+
+def _compose_daily_insight(snapshot: DailySnapshot) -> tuple[str, dict | None]:
+    sleep_hours = (
+        round(snapshot.sleep_duration_minutes / 60, 1)
+        if snapshot.sleep_duration_minutes
+        else None
+    )
+    sleep_label = "Sleep (prev)" if snapshot.sleep_is_previous else "Sleep"
+    recovery = int(snapshot.recovery_score) if snapshot.recovery_score else None
+    strain = round(snapshot.strain, 1) if snapshot.strain else None
+    hrv = int(snapshot.hrv) if snapshot.hrv else None
+    resting_hr = int(snapshot.resting_heart_rate) if snapshot.resting_heart_rate else None
+
+    message = "📊 Daily Insight\n\n"
+    message += f"Goal Progress: {snapshot.goal_progress}\n"
+    if snapshot.whoop_date:
+        message += f"Last Whoop Day: {snapshot.whoop_date}\n"
+    message += (
+        f"Recovery Score: {recovery} / 100\n" if recovery is not None else ""
+    )
+    if sleep_hours is not None:
+        message += f"{sleep_label}: {sleep_hours}h\n"
+    if strain is not None:
+        message += f"Strain: {strain}\n"
+    if hrv is not None:
+        message += f"HRV: {hrv} ms\n"
+    if resting_hr is not None:
+        message += f"Resting HR: {resting_hr} bpm\n"
+
+    if snapshot.recommendation_id:
+        message += "\n⚠ Recommendation:\n"
+        message += f"{snapshot.recommendation_message}\n"
+        message += _format_reason(snapshot.recommendation_explanation_json)
+    else:
+        message += "\n✅ Recommendation:\nKeep current plan today."
+
+    nutrition_summary, nutrition_rec = _calc_nutrition_note(snapshot)
+    message += f"\n\n🍽 {nutrition_summary}\n{nutrition_rec}"
+
+    reply_markup = None
+    if snapshot.recommendation_id:
+        rec_id = snapshot.recommendation_id
+        reply_markup = {
+            "inline_keyboard": [
+                [
+                    {"text": "👍 Accept", "callback_data": f"rec:{rec_id}:accepted"},
+                    {"text": "👎 Ignore", "callback_data": f"rec:{rec_id}:ignored"},
+                ]
+            ]
+        }
+    return message, reply_markup
+
+
+def _insight_topic(day: date) -> str:
+    return f"daily_insight:{day.isoformat()}"
+
+
+def request_daily_insight(day: date | None = None) -> dict:
+    day = day or snapshot_day()
+    pending_key = f"insight:pending:{day.isoformat()}"
+    window = settings.insight_debounce_seconds
+    try:
+        scheduled = get_redis().set(pending_key, 1, nx=True, ex=window + 60)
+    except redis.RedisError:
+        scheduled = True
+    if not scheduled:
+        return {"status": "coalesced", "date": str(day)}
+    send_daily_insight.apply_async(args=[day.isoformat()], countdown=window)
+    return {"status": "scheduled", "date": str(day)}
 
 
 @celery_app.task
-def send_daily_insight() -> dict:
+def send_daily_insight(day: str | None = None) -> dict:
+    target_day = date.fromisoformat(day) if day else snapshot_day()
+    # Triggers arriving from here on schedule a fresh run that sees newer data.
+    try:
+        get_redis().delete(f"insight:pending:{target_day.isoformat()}")
+    except redis.RedisError:
+        pass
+
     db = SessionLocal()
     try:
-        today = datetime.now(ZoneInfo("Europe/Moscow")).date()
-        whoop = (
-            db.query(WhoopDaily)
+        lock_name = f"insight:lock:{target_day.isoformat()}"
+        with redis_lock(lock_name, timeout=120, blocking_timeout=60) as held:
+            if not held:
+                send_daily_insight.apply_async(
+                    args=[target_day.isoformat()], countdown=settings.insight_debounce_seconds
+                )
+                return {"status": "deferred", "date": str(target_day)}
+            snapshot = get_daily_snapshot(db, target_day)
+            message, reply_markup = _compose_daily_insight(snapshot)
+            topic = _insight_topic(target_day)
+            previous = (
+                db.query(TelegramMessage)
+                .filter(TelegramMessage.topic == topic, TelegramMessage.status != "failed")
+                .order_by(TelegramMessage.id.desc())
+                .first()
+            )
+            if previous and previous.text == message and previous.reply_markup == reply_markup:
+                return {"status": "unchanged", "date": str(target_day), "message_id": previous.id}
+
+            original = previous
+            if previous and previous.edit_of_id:
+                original = db.get(TelegramMessage, previous.edit_of_id)
+            if original and original.status in ("pending", "queued"):
+                original.text = message
+                original.reply_markup = reply_markup
+                db.commit()
+                return {"status": "updated", "date": str(target_day), "message_id": original.id}
+
+            outbound = enqueue_telegram_message(
+                db, message, reply_markup=reply_markup, edit_of=original, topic=topic
+            )
+            return {"status": "queued", "date": str(target_day), "message_id": outbound.id}
+    finally:
+        db.close()
+
+
+def _snapshot_stage(db: SessionLocal, days: set[date]) -> set[date]:
+    # days are the days whose daily_feature row changed. Today's snapshot
+    # reads the newest WHOOP day and yesterday's nutrition, so edits to older
+    # days cannot move it. A fallback sleep value may come from any day.
+    today = snapshot_day()
+    current = db.get(DailySnapshot, today)
+    if (
+        current is not None
+        and current.whoop_date is not None
+        and not current.sleep_is_previous
+        and all(day < current.whoop_date and day != current.nutrition_date for day in days)
+    ):
+        return set()
+    return refresh_daily_snapshot(db, today)
+
+
+def _insight_stage(db: SessionLocal, days: set[date]) -> set[date]:
+    # days holds today if the snapshot moved, plus any nutrition days logged.
+    # Logging yesterday's nutrition sends the day's insight (or refreshes
+    # it); a moved snapshot only refreshes an insight that was already sent.
+    today = snapshot_day()
+    if today - timedelta(days=1) not in days:
+        if today not in days:
+            return set()
+        sent = (
+            db.query(TelegramMessage.id)
             .filter(
-                WhoopDaily.missing_flag.is_(False),
-                WhoopDaily.recovery_score.isnot(None),
+                TelegramMessage.topic == _insight_topic(today),
+                TelegramMessage.status != "failed",
             )
-            .order_by(WhoopDaily.date.desc())
-            .first()
-        )
-        goal = db.query(UserGoal).filter(UserGoal.is_active.is_(True)).first()
-        rec = (
-            db.query(Recommendation)
-            .order_by(Recommendation.date.desc(), Recommendation.id.desc())
             .first()
         )
+        if not sent:
+            return set()
+    request_daily_insight(today)
+    return {today}
 
-        sleep_hours = None
-        sleep_label = "Sleep"
-        if whoop and whoop.sleep_duration_minutes:
-            sleep_hours = round(whoop.sleep_duration_minutes / 60, 1)
-        else:
-            prev_sleep = (
-                db.query(WhoopDaily)
-                .filter(WhoopDaily.sleep_duration_minutes.isnot(None))
-                .order_by(WhoopDaily.date.desc())
-                .first()
-            )
-            if prev_sleep and prev_sleep.sleep_duration_minutes:
-                sleep_hours = round(prev_sleep.sleep_duration_minutes / 60, 1)
-                sleep_label = "Sleep (prev)"
-        recovery = int(whoop.recovery_score) if whoop and whoop.recovery_score else None
-        strain = round(whoop.strain, 1) if whoop and whoop.strain else None
-        hrv = int(whoop.hrv) if whoop and whoop.hrv else None
-        resting_hr = (
-            int(whoop.resting_heart_rate)
-            if whoop and whoop.resting_heart_rate
-            else None
+
+RECOMPUTE_STAGES = (
+    Stage("features", ("ingest", "nutrition", "workouts"), refresh_daily_features),
+    Stage("snapshot", ("features",), _snapshot_stage),
+    Stage("insight", ("snapshot", "nutrition"), _insight_stage),
+)
+
+
+@celery_app.task(ignore_result=True)
+def recompute_daily(trigger: str, changes: dict[str, list[str]]) -> dict:
+    db = SessionLocal()
+    try:
+        run = run_pipeline(
+            db,
+            trigger,
+            RECOMPUTE_STAGES,
+            {source: {date.fromisoformat(d) for d in days} for source, days in changes.items()},
         )
+        return {"status": run.status, "run_id": run.id}
+    finally:
+        db.close()
+
 
-        message = "📊 Daily Insight\n\n"
-        message += f"Goal Progress: {_format_goal_progress(goal)}\n"
-        if whoop:
-            message += f"Last Whoop Day: {whoop.date}\n"
-        message += (
-            f"Recovery Score: {recovery} / 100\n" if recovery is not None else ""
+# Publishes the runs request_recompute recorded as "pending" because the
+# broker was unreachable.
+@celery_app.task
+def requeue_recomputes() -> dict:
+    db = SessionLocal()
+    try:
+        runs = (
+            db.query(PipelineRun)
+            .filter(PipelineRun.status == "pending")
+            .order_by(PipelineRun.id)
+            .all()
         )
-        if sleep_hours is not None:
-            message += f"{sleep_label}: {sleep_hours}h\n"
-        if strain is not None:
-            message += f"Strain: {strain}\n"
-        if hrv is not None:
-            message += f"HRV: {hrv} ms\n"
-        if resting_hr is not None:
-            message += f"Resting HR: {resting_hr} bpm\n"
-
-        if rec:
-            message += "\n⚠ Recommendation:\n"
-            message += f"{rec.message}\n"
-            message += _format_reason(rec.explanation_json)
+        for run in runs:
+            recompute_daily.apply_async(args=[run.trigger, pending_changes(run)])
+            run.status = "requeued"
+            run.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        return {"status": "ok", "requeued": len(runs)}
+    finally:
+        db.close()
+
+
+def _handle_nutrition_message(db: SessionLocal, message: dict) -> dict:
+    text = message.get("text") or ""
+    target_day = datetime.now(ZoneInfo("Europe/Moscow")).date() - timedelta(days=1)
+    date_match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
+    if date_match:
+        try:
+            target_day = datetime.fromisoformat(date_match.group(1)).date()
+        except ValueError:
+            pass
+    numbers = [int(n) for n in re.findall(r"\d+", text)]
+    if len(numbers) < 4:
+        return {"status": "ignored"}
+    calories, protein, fat, carbs = numbers[:4]
+    row = db.query(NutritionDaily).filter(NutritionDaily.date == target_day).first()
+    if not row:
+        row = NutritionDaily(date=target_day)
+        db.add(row)
+    row.calories = calories
+    row.protein_g = protein
+    row.fat_g = fat
+    row.carbs_g = carbs
+    db.commit()
+    invalidate_tags(NutritionDaily.__tablename__)
+    # The recompute run refreshes the snapshot and sends (or refreshes) the
+    # daily insight.
+    request_recompute("telegram_nutrition", nutrition={target_day})
+
+    enqueue_telegram_message(db, f"Nutrition saved ✅ for {target_day}")
+    return {"status": "ok"}
+
+
+def _handle_callback(db: SessionLocal, callback: dict) -> dict:
+    data = callback.get("data", "")
+    if not data.startswith("rec:"):
+        return {"status": "ignored"}
+    try:
+        _, rec_id, feedback = data.split(":", 2)
+        rec_id_int = int(rec_id)
+    except ValueError:
+        return {"status": "invalid"}
+
+    exists = db.query(Recommendation).filter(Recommendation.id == rec_id_int).first()
+    if not exists:
+        return {"status": "not_found"}
+
+    existing = (
+        db.query(RecommendationFeedback)
+        .filter(RecommendationFeedback.recommendation_id == rec_id_int)
+        .first()
+    )
+    if existing:
+        existing.feedback = feedback
+    else:
+        db.add(RecommendationFeedback(recommendation_id=rec_id_int, feedback=feedback))
+    db.commit()
+    return {"status": "ok"}
+
+
+@celery_app.task
+def process_telegram_update(update_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        update = db.get(TelegramUpdate, update_id)
+        if not update:
+            return {"status": "missing"}
+        if update.processed_at:
+            return {"status": update.status}
+        payload = update.payload
+        if payload.get("callback_query"):
+            result = _handle_callback(db, payload["callback_query"])
+        elif payload.get("message"):
+            result = _handle_nutrition_message(db, payload["message"])
         else:
-            message += "\n✅ Recommendation:\nKeep current plan today."
+            result = {"status": "ignored"}
+        update.status = result["status"]
+        update.processed_at = datetime.now(timezone.utc)
+        db.commit()
+        return result
+    finally:
+        db.close()
 
-        nutrition_day = today - timedelta(days=1)
-        nutrition_summary, nutrition_rec = _calc_nutrition_note(
-            db, nutrition_day, whoop.body_weight_kg if whoop else None
-        )
-        message += f"\n\n🍽 {nutrition_summary}\n{nutrition_rec}"
-
-        reply_markup = None
-        if rec:
-            reply_markup = {
-                "inline_keyboard": [
-                    [
-                        {"text": "👍 Accept", "callback_data": f"rec:{rec.id}:accepted"},
-                        {"text": "👎 Ignore", "callback_data": f"rec:{rec.id}:ignored"},
-                    ]
-                ]
-            }
 
-        result = send_telegram_message(message, reply_markup=reply_markup)
-        return {"status": "ok", "date": str(today), "telegram": result.get("status")}
+@celery_app.task(bind=True, max_retries=None)
+def deliver_telegram_message(self, message_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        message = db.get(TelegramMessage, message_id)
+        if not message or message.status in ("sent", "failed"):
+            return {"status": message.status if message else "missing"}
+
+        wait = acquire_send_slot(message.chat_id)
+        if wait > 0:
+            raise self.retry(countdown=wait)
+
+        target = db.get(TelegramMessage, message.edit_of_id) if message.edit_of_id else None
+        message.attempts += 1
+        if target and target.telegram_message_id:
+            result = edit_telegram_message(
+                target.telegram_message_id,
+                message.text,
+                reply_markup=message.reply_markup,
+                chat_id=message.chat_id,
+            )
+        else:
+            result = send_telegram_message(
+                message.text, reply_markup=message.reply_markup, chat_id=message.chat_id
+            )
+
+        if result["status"] == "ok":
+            sent = result["telegram"].get("result")
+            message.status = "sent"
+            message.sent_at = datetime.now(timezone.utc)
+            message.error = None
+            if isinstance(sent, dict) and sent.get("message_id"):
+                message.telegram_message_id = sent["message_id"]
+            elif target:
+                message.telegram_message_id = target.telegram_message_id
+            db.commit()
+            return {"status": "sent", "message_id": message.id}
+
+        message.error = str(result.get("detail"))[:512]
+        if result["status"] == "retry" and message.attempts < settings.telegram_max_delivery_attempts:
+            retry_after = result.get("retry_after")
+            if retry_after:
+                apply_retry_after(message.chat_id, retry_after)
+            db.commit()
+            raise self.retry(countdown=retry_after or min(2 ** message.attempts, 300))
+
+        message.status = "failed"
+        db.commit()
+        return {"status": "failed", "message_id": message.id}
     finally:
         db.close()
 
-def _ingest_whoop(db: SessionLocal, payload: dict) -> dict:
-    cycles = payload["cycles"]
-    recoveries = payload["recoveries"]
-    sleeps = payload["sleeps"]
-    workouts = payload["workouts"]
-    body = payload["body"]
-    start_date = payload["start_date"]
-    end_date = payload["end_date"]
 
-    by_date: dict[date, dict] = {}
-
-    for cycle in cycles:
-        day = _parse_date(cycle.get("start"))
-        if not day:
-            continue
-        score = cycle.get("score") or {}
-        by_date.setdefault(day, {})
-        by_date[day]["strain"] = score.get("strain")
-        by_date[day]["cycle_json"] = cycle
-
-    for rec in recoveries:
-        day = _parse_date(rec.get("created_at")) or _parse_date(rec.get("updated_at"))
-        if not day:
-            continue
-        score = rec.get("score") or {}
-        by_date.setdefault(day, {})
-        by_date[day]["hrv"] = score.get("hrv_rmssd_milli")
-        by_date[day]["resting_heart_rate"] = score.get("resting_heart_rate")
-        by_date[day]["recovery_score"] = score.get("recovery_score")
-        by_date[day]["recovery_json"] = rec
-
-    for sleep in sleeps:
-        day = _parse_date(sleep.get("start")) or _parse_date(sleep.get("created_at"))
-        if not day:
-            continue
-        score = sleep.get("score") or {}
-        stage_summary = (score.get("stage_summary") or {})
-        duration_milli = stage_summary.get("total_in_bed_time_milli")
-        by_date.setdefault(day, {})
-        by_date[day]["sleep_duration_minutes"] = (
-            int(duration_milli / 60000) if duration_milli else None
+# Publishes messages whose hand-off to the broker failed ("pending") and
+# queued ones no worker has attempted in telegram_requeue_after_seconds, e.g.
+# when the publisher died between the commit and the publish.
+@celery_app.task
+def requeue_telegram_messages() -> dict:
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.telegram_requeue_after_seconds)
+    db = SessionLocal()
+    try:
+        messages = (
+            db.query(TelegramMessage)
+            .filter(
+                (TelegramMessage.status == "pending")
+                | (
+                    (TelegramMessage.status == "queued")
+                    & (TelegramMessage.attempts == 0)
+                    & (TelegramMessage.created_at < stale_before)
+                )
+            )
+            .order_by(TelegramMessage.id)
+            .all()
         )
-        by_date[day]["sleep_efficiency"] = score.get("sleep_efficiency_percentage")
-        by_date[day]["sleep_stages_json"] = stage_summary or None
-        by_date[day]["sleep_json"] = sleep
-
-    for workout in workouts:
-        day = _parse_date(workout.get("start")) or _parse_date(workout.get("created_at"))
-        if not day:
-            continue
-        by_date.setdefault(day, {})
-        items = by_date[day].setdefault("workout_json", [])
-        items.append(workout)
+        ids = [message.id for message in messages]
+        for message in messages:
+            message.status = "queued"
+        # Committed before publishing, so a fast worker's status is not overwritten.
+        db.commit()
+        for index, message_id in enumerate(ids):
+            try:
+                deliver_telegram_message.delay(message_id)
+            except Exception:
+                logger.exception("Failed to requeue Telegram message %s", message_id)
+                db.query(TelegramMessage).filter(TelegramMessage.id.in_(ids[index:])).update(
+                    {TelegramMessage.status: "pending"}, synchronize_session=False
+                )
+                db.commit()
+                return {"status": "error", "requeued": index}
+        return {"status": "ok", "requeued": len(ids)}
+    finally:
+        db.close()
+
+
+def _archive_whoop(payload: dict) -> None:
+    if not settings.whoop_archive_enabled:
+        return
+    try:
+        archive_whoop_payload(payload)
+    except OSError:
+        logger.exception("Failed to archive WHOOP records")
 
-    body_weight = body.get("weight_kilogram") if isinstance(body, dict) else None
-    if body_weight is not None:
-        by_date.setdefault(end_date, {})
-        by_date[end_date]["body_weight_kg"] = body_weight
-
-    for day in _date_range(start_date, end_date):
-        row = db.query(WhoopDaily).filter(WhoopDaily.date == day).first()
-        data = by_date.get(day)
-        if not row:
-            row = WhoopDaily(date=day)
-            db.add(row)
-        if data:
-            row.hrv = data.get("hrv")
-            row.resting_heart_rate = data.get("resting_heart_rate")
-            row.recovery_score = data.get("recovery_score")
-            row.strain = data.get("strain")
-            row.sleep_duration_minutes = data.get("sleep_duration_minutes")
-            row.sleep_efficiency = data.get("sleep_efficiency")
-            row.sleep_stages_json = data.get("sleep_stages_json")
-            row.sleep_json = data.get("sleep_json")
-            row.recovery_json = data.get("recovery_json")
-            row.cycle_json = data.get("cycle_json")
-            row.workout_json = data.get("workout_json")
-            row.body_weight_kg = data.get("body_weight_kg")
-            row.missing_flag = False
-        else:
-            row.missing_flag = True
 
+def _ingest_whoop(db: SessionLocal, payload: dict) -> dict:
+    start_date = payload["start_date"]
+    end_date = payload["end_date"]
+    body = payload["body"]
+    body_weight = body.get("weight_kilogram") if isinstance(body, dict) else None
+    by_date, raw_by_date = reduce_whoop_records(
+        payload["cycles"],
+        payload["recoveries"],
+        payload["sleeps"],
+        payload["workouts"],
+        {end_date: body_weight} if body_weight is not None else {},
+    )
+    changed_days = write_whoop_days(db, start_date, end_date, by_date, raw_by_date)
     db.commit()
-    return {"status": "ok", "days": (end_date - start_date).days + 1}
+    request_recompute("whoop_sync", ingest=changed_days)
+    return {
+        "status": "ok",
+        "days": (end_date - start_date).days + 1,
+        "changed_days": len(changed_days),
+    }
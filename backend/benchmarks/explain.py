@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Migrates an empty database to head, seeds synthetic history and checks with
+# EXPLAIN that each hot query is served by the index meant for it.
+parser = argparse.ArgumentParser(description="Check that hot queries use their indexes")
+parser.add_argument("--years", type=int, default=3, help="years of synthetic history")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument(
+    "--database-url",
+    help="SQLAlchemy URL of an empty database (default: a temporary SQLite file)",
+)
+parser.add_argument("--verbose", action="store_true", help="print every plan")
+ARGS = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+
+if not ARGS.database_url:
+    ARGS.database_url = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="athletica-explain-"), "explain.db"
+    )
+os.environ["ATHLETICA_DATABASE_URL"] = ARGS.database_url
+os.environ["ATHLETICA_REDIS_URL"] = "redis://127.0.0.1:1/0"
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import Connection, Select, select, text  # noqa: E402
+
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.calendar import CalendarWorkout, CalendarWorkoutExercise  # noqa: E402
+from app.models.recommendation import Recommendation  # noqa: E402
+from app.models.whoop import WhoopDaily, WhoopWorkout  # noqa: E402
+from app.models.workout import Workout, WorkoutExercise  # noqa: E402
+from benchmarks.generator import generate, sync_sequences  # noqa: E402
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+# The queries behind /calendar, /workouts/last, /recommendations, the daily
+# snapshot (send_daily_insight) and the features stage, with the index each
+# one should use.
+def _cases(end) -> list[tuple[str, Select, str]]:
+    month = end - timedelta(days=30)
+    return [
+        (
+            "calendar_range",
+            select(CalendarWorkout)
+            .where(CalendarWorkout.date >= month, CalendarWorkout.date <= end)
+            .order_by(CalendarWorkout.date.desc()),
+            "ix_calendar_workout_date",
+        ),
+        (
+            "calendar_exercises",
+            select(CalendarWorkoutExercise).where(CalendarWorkoutExercise.calendar_workout_id == 1),
+            "ix_calendar_workout_exercise_calendar_workout_id",
+        ),
+        (
+            "workouts_last",
+            select(Workout).order_by(Workout.date.desc()).limit(1),
+            "ix_workout_date",
+        ),
+        (
+            "workouts_last_program_day",
+            select(Workout)
+            .where(Workout.program_day_id == 1)
+            .order_by(Workout.date.desc())
+            .limit(1),
+            "ix_workout_program_day_id_date",
+        ),
+        (
+            "exercise_history",
+            select(WorkoutExercise).where(WorkoutExercise.exercise_name == "Back Squat"),
+            "ix_workout_exercise_exercise_name",
+        ),
+        (
+            "recommendations",
+            select(Recommendation).order_by(Recommendation.date.desc()).limit(30),
+            "ix_recommendation_date_id",
+        ),
+        (
+            "snapshot_recommendation",
+            select(Recommendation)
+            .order_by(Recommendation.date.desc(), Recommendation.id.desc())
+            .limit(1),
+            "ix_recommendation_date_id",
+        ),
+        (
+            "snapshot_whoop",
+            select(WhoopDaily)
+            .where(WhoopDaily.missing_flag.is_(False), WhoopDaily.recovery_score.isnot(None))
+            .order_by(WhoopDaily.date.desc())
+            .limit(1),
+            "ix_whoop_daily_missing_flag_date",
+        ),
+        (
+            "feature_whoop_workouts",
+            select(WhoopWorkout).where(
+                WhoopWorkout.date.in_([end - timedelta(days=i) for i in range(7)])
+            ),
+            "ix_whoop_workout_date",
+        ),
+    ]
+
+
+def _plan(conn: Connection, statement: Select) -> tuple[list[str], set[str]]:
+    sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+        lines, indexes, nodes = [], set(), [plan]
+        while nodes:
+            node = nodes.pop()
+            lines.append(f"{node['Node Type']} {node.get('Index Name', node.get('Relation Name', ''))}")
+            if "Index Name" in node:
+                indexes.add(node["Index Name"])
+            nodes.extend(node.get("Plans", []))
+        return lines, indexes
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    lines = [row[-1] for row in rows]
+    indexes = {
+        detail.split(" INDEX ", 1)[1].split()[0] for detail in lines if " INDEX " in detail
+    }
+    return lines, indexes
+
+
+def main() -> int:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    command.upgrade(config, "head")
+    with SessionLocal() as db:
+        history = generate(db, years=ARGS.years, seed=ARGS.seed)
+    sync_sequences(engine)
+    end = datetime.fromisoformat(history["end"]).date()
+
+    failures = 0
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for name, statement, index in _cases(end):
+            lines, used = _plan(conn, statement)
+            ok = index in used
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<26} {index}")
+            if ARGS.verbose or not ok:
+                for line in lines:
+                    print(f"       {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Stand-in for the Telegram Bot API methods the app calls (sendMessage and
+# editMessageText). Stdlib only, so benchmarks can start it before the app
+# reads its settings:
+#
+#   ATHLETICA_TELEGRAM_API_BASE_URL=http://127.0.0.1:8766
+#   ATHLETICA_TELEGRAM_BOT_TOKEN=fake
+#   ATHLETICA_TELEGRAM_CHAT_ID=1
+
+METHODS = ("sendMessage", "editMessageText")
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        seed: int = 7,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.lock = threading.Lock()
+        self.stats: Counter[str] = Counter()
+        self._message_ids = 0
+        self._rng = random.Random(seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeTelegramServer:
+        threading.Thread(target=self.serve_forever, name="fake-telegram", daemon=True).start()
+        return self
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            with self.lock:
+                jitter = self._rng.uniform(0, self.jitter)
+            time.sleep(self.latency + jitter)
+
+    def next_message_id(self) -> int:
+        with self.lock:
+            self._message_ids += 1
+            return self._message_ids
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += value
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.stats)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeTelegramServer
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/_stats":
+            self._send(200, self.server.snapshot())
+            return
+        self._send(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/_reset":
+            self.server.reset_stats()
+            self._send(200, {})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        # Paths look like /bot<token>/<method>.
+        method = path.rsplit("/", 1)[-1]
+        if method not in METHODS:
+            self._send(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+        self.server.count(method)
+        self.server.delay()
+        message_id = body.get("message_id") or self.server.next_message_id()
+        self._send(
+            200,
+            {
+                "ok": True,
+                "result": {
+                    "message_id": message_id,
+                    "chat": {"id": body.get("chat_id")},
+                    "date": int(time.time()),
+                    "text": body.get("text", ""),
+                },
+            },
+        )
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def start_fake_telegram(host: str = "127.0.0.1", port: int = 0, **options: object) -> FakeTelegramServer:
+    return FakeTelegramServer((host, port), **options).start()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = FakeTelegramServer(
+        (args.host, args.port),
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+    )
+    print(f"Fake Telegram API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
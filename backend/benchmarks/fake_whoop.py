@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Stand-in for the WHOOP developer API (v2 collections, body measurement and
+# the OAuth token endpoint). Stdlib only, so benchmarks can start it before the
+# app reads its settings:
+#
+#   ATHLETICA_WHOOP_API_BASE_URL=http://127.0.0.1:8765
+#   ATHLETICA_WHOOP_TOKEN_URL=http://127.0.0.1:8765/oauth/oauth2/token
+
+MAX_PAGE_SIZE = 25
+DEFAULT_PAGE_SIZE = 10
+COLLECTIONS = {
+    "/v2/cycle": "cycles",
+    "/v2/recovery": "recoveries",
+    "/v2/activity/sleep": "sleeps",
+    "/v2/activity/workout": "workouts",
+}
+ZONE_SHARES = {"zero": 0.05, "one": 0.15, "two": 0.35, "three": 0.25, "four": 0.15, "five": 0.05}
+TOKEN_PATH = "/oauth/oauth2/token"
+BODY_PATH = "/v2/user/measurement/body"
+
+
+def _stamp(value: datetime) -> str:
+    return value.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _parse_stamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def build_dataset(days: int, end: date, seed: int = 7) -> dict[str, list[dict]]:
+    rng = random.Random(seed)
+    data: dict[str, list[dict]] = {name: [] for name in COLLECTIONS.values()}
+    for i in range(days):
+        day = end - timedelta(days=days - 1 - i)
+        cycle_start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(
+            hours=6, minutes=rng.randint(0, 90)
+        )
+        sleep_start = cycle_start - timedelta(minutes=rng.randint(420, 540))
+        in_bed = int((cycle_start - sleep_start).total_seconds() * 1000)
+        cycle_id = 100_000 + i
+        sleep_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        created = _stamp(cycle_start + timedelta(minutes=5))
+        data["cycles"].append(
+            {
+                "id": cycle_id,
+                "user_id": 1,
+                "created_at": created,
+                "updated_at": created,
+                "start": _stamp(cycle_start),
+                "end": _stamp(cycle_start + timedelta(days=1)),
+                "timezone_offset": "+00:00",
+                "score_state": "SCORED",
+                "score": {
+                    "strain": round(rng.uniform(4, 19), 4),
+                    "kilojoule": round(rng.uniform(6000, 14000), 1),
+                    "average_heart_rate": rng.randint(60, 80),
+                    "max_heart_rate": rng.randint(140, 190),
+                },
+            }
+        )
+        data["recoveries"].append(
+            {
+                "cycle_id": cycle_id,
+                "sleep_id": sleep_id,
+                "user_id": 1,
+                "created_at": created,
+                "updated_at": created,
+                "score_state": "SCORED",
+                "score": {
+                    "user_calibrating": False,
+                    "recovery_score": rng.randint(20, 99),
+                    "resting_heart_rate": rng.randint(46, 62),
+                    "hrv_rmssd_milli": round(rng.uniform(30, 90), 4),
+                    "spo2_percentage": round(rng.uniform(94, 99), 2),
+                    "skin_temp_celsius": round(rng.uniform(32.5, 34.5), 2),
+                },
+            }
+        )
+        data["sleeps"].append(
+            {
+                "id": sleep_id,
+                "cycle_id": cycle_id,
+                "user_id": 1,
+                "created_at": created,
+                "updated_at": created,
+                "start": _stamp(sleep_start),
+                "end": _stamp(cycle_start),
+                "timezone_offset": "+00:00",
+                "nap": False,
+                "score_state": "SCORED",
+                "score": {
+                    "stage_summary": {
+                        "total_in_bed_time_milli": in_bed,
+                        "total_awake_time_milli": int(in_bed * 0.08),
+                        "total_light_sleep_time_milli": int(in_bed * 0.5),
+                        "total_slow_wave_sleep_time_milli": int(in_bed * 0.2),
+                        "total_rem_sleep_time_milli": int(in_bed * 0.22),
+                        "sleep_cycle_count": rng.randint(3, 6),
+                        "disturbance_count": rng.randint(0, 15),
+                    },
+                    "respiratory_rate": round(rng.uniform(13, 17), 2),
+                    "sleep_performance_percentage": rng.randint(60, 100),
+                    "sleep_consistency_percentage": rng.randint(50, 95),
+                    "sleep_efficiency_percentage": round(rng.uniform(80, 98), 2),
+                },
+            }
+        )
+        for _ in range(rng.choice((0, 1, 1, 2))):
+            start = cycle_start + timedelta(hours=rng.randint(2, 12))
+            minutes = rng.randint(25, 90)
+            data["workouts"].append(
+                {
+                    "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    "user_id": 1,
+                    "created_at": _stamp(start + timedelta(minutes=minutes + 2)),
+                    "updated_at": _stamp(start + timedelta(minutes=minutes + 2)),
+                    "start": _stamp(start),
+                    "end": _stamp(start + timedelta(minutes=minutes)),
+                    "timezone_offset": "+00:00",
+                    "sport_name": rng.choice(("weightlifting", "running", "cycling")),
+                    "score_state": "SCORED",
+                    "score": {
+                        "strain": round(rng.uniform(4, 16), 4),
+                        "average_heart_rate": rng.randint(100, 150),
+                        "max_heart_rate": rng.randint(150, 190),
+                        "kilojoule": round(rng.uniform(800, 3000), 1),
+                        "zone_durations": {
+                            f"zone_{zone}_milli": int(minutes * 60000 * share)
+                            for zone, share in ZONE_SHARES.items()
+                        },
+                    },
+                }
+            )
+    # The API lists newest first.
+    for records in data.values():
+        records.reverse()
+    return data
+
+
+class FakeWhoopServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        days: int = 180,
+        end: date | None = None,
+        seed: int = 7,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit: int = 0,
+        rate_window: float = 60.0,
+        token_requests: int = 0,
+        expires_in: int = 3600,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.data = build_dataset(days, end or datetime.now(timezone.utc).date(), seed)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.token_requests = token_requests
+        self.expires_in = expires_in
+        self.lock = threading.Lock()
+        self.stats: Counter[str] = Counter()
+        self._recent: deque[float] = deque()
+        self._access: dict[str, int] = {}
+        self._refresh: set[str] = set()
+        self._rng = random.Random(seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeWhoopServer:
+        threading.Thread(target=self.serve_forever, name="fake-whoop", daemon=True).start()
+        return self
+
+    def issue_token(self) -> dict:
+        with self.lock:
+            access = f"fake-access-{uuid.uuid4().hex}"
+            refresh = f"fake-refresh-{uuid.uuid4().hex}"
+            self._access[access] = 0
+            self._refresh.add(refresh)
+            self.stats["tokens_issued"] += 1
+        return {
+            "access_token": access,
+            "refresh_token": refresh,
+            "expires_in": self.expires_in,
+            "scope": "offline read:recovery read:cycles read:workout read:sleep",
+            "token_type": "bearer",
+        }
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            with self.lock:
+                jitter = self._rng.uniform(0, self.jitter)
+            time.sleep(self.latency + jitter)
+
+    def check_rate(self) -> float | None:
+        # Sliding window like WHOOP's per-minute limit; returns Retry-After.
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            while self._recent and self._recent[0] <= now - self.rate_window:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return self._recent[0] + self.rate_window - now
+            self._recent.append(now)
+        return None
+
+    def check_token(self, header: str | None) -> bool:
+        token = (header or "").removeprefix("Bearer ").strip()
+        with self.lock:
+            if token not in self._access:
+                return False
+            self._access[token] += 1
+            # Revoke after N calls to exercise the 401 -> refresh path.
+            if self.token_requests and self._access[token] > self.token_requests:
+                del self._access[token]
+                return False
+        return True
+
+    def use_refresh_token(self, token: str) -> bool:
+        with self.lock:
+            if token not in self._refresh:
+                return False
+            self._refresh.discard(token)
+            return True
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += value
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.stats)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeWhoopServer
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: dict | None = None, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count(f"status_{status}")
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            self._send(200, self.server.snapshot())
+            return
+        self.server.count("requests")
+        self.server.delay()
+        retry_after = self.server.check_rate()
+        if retry_after is not None:
+            self._send(429, {"message": "Too Many Requests"}, {"Retry-After": f"{retry_after:.3f}"})
+            return
+        if not self.server.check_token(self.headers.get("Authorization")):
+            self._send(401, {"message": "Authorization was not valid"})
+            return
+        if url.path == BODY_PATH:
+            self._send(200, {"height_meter": 1.82, "weight_kilogram": 81.4, "max_heart_rate": 191})
+            return
+        collection = COLLECTIONS.get(url.path)
+        if collection is None:
+            self._send(404, {"message": "Not Found"})
+            return
+        self._send_page(collection, {k: v[-1] for k, v in parse_qs(url.query).items()})
+
+    def _send_page(self, collection: str, params: dict[str, str]) -> None:
+        try:
+            limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+            offset = int(base64.urlsafe_b64decode(params["nextToken"])) if "nextToken" in params else 0
+            start = _parse_stamp(params.get("start"))
+            end = _parse_stamp(params.get("end"))
+        except ValueError:
+            self._send(400, {"message": "Invalid query parameters"})
+            return
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            self._send(400, {"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"})
+            return
+        field = "created_at" if collection == "recoveries" else "start"
+        records = [
+            record
+            for record in self.server.data[collection]
+            if (start is None or _parse_stamp(record[field]) >= start)
+            and (end is None or _parse_stamp(record[field]) < end)
+        ]
+        page = records[offset : offset + limit]
+        next_offset = offset + limit
+        next_token = (
+            base64.urlsafe_b64encode(str(next_offset).encode()).decode()
+            if next_offset < len(records)
+            else None
+        )
+        self.server.count("records", len(page))
+        self._send(200, {"records": page, "next_token": next_token})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/_reset":
+            self.server.reset_stats()
+            self._send(200, {})
+            return
+        if url.path != TOKEN_PATH:
+            self._send(404, {"message": "Not Found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        self.server.delay()
+        grant = form.get("grant_type")
+        if grant == "refresh_token":
+            if not self.server.use_refresh_token(form.get("refresh_token", "")):
+                self._send(400, {"error": "invalid_grant"})
+                return
+            self.server.count("refreshes")
+        elif grant != "authorization_code" or not form.get("code"):
+            self._send(400, {"error": "unsupported_grant_type"})
+            return
+        self._send(200, self.server.issue_token())
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def start_fake_whoop(host: str = "127.0.0.1", port: int = 0, **options: object) -> FakeWhoopServer:
+    return FakeWhoopServer((host, port), **options).start()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the WHOOP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--days", type=int, default=180, help="days of history to serve")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per window (0: off)")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="window in seconds")
+    parser.add_argument(
+        "--token-requests", type=int, default=0, help="revoke access tokens after N calls (0: never)"
+    )
+    parser.add_argument("--expires-in", type=int, default=3600)
+    args = parser.parse_args(argv)
+    server = FakeWhoopServer(
+        (args.host, args.port),
+        days=args.days,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        token_requests=args.token_requests,
+        expires_in=args.expires_in,
+    )
+    print(f"Fake WHOOP API on {server.url} ({args.days} days)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Engine, insert, text
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.calendar import CalendarWorkout, CalendarWorkoutExercise
+from app.models.exercise import Exercise
+from app.models.goal import UserGoal
+from app.models.nutrition import NutritionDaily
+from app.models.recommendation import Recommendation
+from app.models.training import ProgramDay, TrainingProgram
+from app.models.whoop import WhoopDaily, WhoopDailyRaw, WhoopWorkout
+from app.models.workout import Workout, WorkoutExercise
+from app.models.workout_template import WorkoutTemplate, WorkoutTemplateExercise
+from app.services.daily_features import rebuild_daily_features
+from app.services.whoop_ingest import workout_values
+
+# Deterministic synthetic history: the same (years, seed, end) always yields
+# byte-identical rows, so results stay comparable between commits.
+
+EXERCISES = (
+    ("Back Squat", "strength", "Legs", "Barbell"),
+    ("Romanian Deadlift", "strength", "Legs", "Barbell"),
+    ("Bench Press", "strength", "Chest", "Barbell"),
+    ("Incline Dumbbell Press", "strength", "Chest", "Dumbbell"),
+    ("Pull Up", "strength", "Back", "Bodyweight"),
+    ("Barbell Row", "strength", "Back", "Barbell"),
+    ("Overhead Press", "strength", "Shoulders", "Barbell"),
+    ("Lateral Raise", "strength", "Shoulders", "Dumbbell"),
+    ("Biceps Curl", "strength", "Arms", "Dumbbell"),
+    ("Triceps Pushdown", "strength", "Arms", "Cable"),
+    ("Rowing Erg", "cardio", "Other", "Rower"),
+    ("Zone 2 Ride", "cardio", "Other", "Bike"),
+)
+PROGRAM_DAYS = (
+    ("Lower", (0, 1, 10)),
+    ("Push", (2, 3, 6, 9)),
+    ("Pull", (4, 5, 8)),
+    ("Upper", (2, 5, 6, 7, 11)),
+)
+WORKOUT_WEEKDAYS = (0, 1, 3, 4)
+SETS_PER_EXERCISE = 4
+BATCH = 5000
+
+
+def _chunks(rows: list[dict]):
+    for i in range(0, len(rows), BATCH):
+        yield rows[i : i + BATCH]
+
+
+def _insert(db: Session, model: type, rows: list[dict]) -> None:
+    for chunk in _chunks(rows):
+        db.execute(insert(model), chunk)
+
+
+# extra draws the typed WHOOP values and workouts; keeping them off rng leaves
+# every other generated row unchanged.
+def _whoop_row(
+    rng: random.Random, extra: random.Random, day: date, weight: float
+) -> tuple[dict, dict | None]:
+    missing = rng.random() < 0.03
+    if missing:
+        return {"date": day, "missing_flag": True}, None
+    recovery = max(1.0, min(99.0, rng.gauss(62, 15)))
+    sleep_minutes = int(max(240, rng.gauss(430, 45)))
+    stages = {
+        "total_in_bed_time_milli": sleep_minutes * 60000,
+        "total_light_sleep_time_milli": int(sleep_minutes * 0.5) * 60000,
+        "total_slow_wave_sleep_time_milli": int(sleep_minutes * 0.2) * 60000,
+        "total_rem_sleep_time_milli": int(sleep_minutes * 0.22) * 60000,
+        "total_awake_time_milli": int(sleep_minutes * 0.08) * 60000,
+    }
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+    daily = {
+        "date": day,
+        "hrv": round(max(15.0, rng.gauss(58, 12)), 2),
+        "resting_heart_rate": round(rng.gauss(54, 4), 1),
+        "recovery_score": round(recovery, 1),
+        "strain": round(max(2.0, rng.gauss(11, 3.5)), 2),
+        "sleep_duration_minutes": sleep_minutes,
+        "sleep_efficiency": round(min(100.0, rng.gauss(89, 4)), 1),
+        "body_weight_kg": round(weight, 1),
+        "sleep_light_minutes": int(sleep_minutes * 0.5),
+        "sleep_deep_minutes": int(sleep_minutes * 0.2),
+        "sleep_rem_minutes": int(sleep_minutes * 0.22),
+        "sleep_awake_minutes": int(sleep_minutes * 0.08),
+        "respiratory_rate": round(extra.gauss(15, 0.8), 2),
+        "spo2_percentage": round(min(100.0, extra.gauss(96.5, 1)), 2),
+        "skin_temp_celsius": round(extra.gauss(33.5, 0.4), 2),
+        "missing_flag": False,
+    }
+    workouts = None
+    if day.weekday() in WORKOUT_WEEKDAYS:
+        minutes = extra.randint(45, 90)
+        workouts = [
+            {
+                "id": f"{day.isoformat()}-1",
+                "start": (start + timedelta(hours=18)).isoformat(),
+                "end": (start + timedelta(hours=18, minutes=minutes)).isoformat(),
+                "sport_name": "weightlifting",
+                "score": {
+                    "strain": round(extra.uniform(6, 15), 2),
+                    "average_heart_rate": extra.randint(100, 140),
+                    "max_heart_rate": extra.randint(150, 185),
+                    "kilojoule": round(extra.uniform(800, 2500), 1),
+                    "zone_durations": {
+                        f"zone_{zone}_milli": int(minutes * 60000 * share)
+                        for zone, share in (
+                            ("zero", 0.1),
+                            ("one", 0.3),
+                            ("two", 0.3),
+                            ("three", 0.2),
+                            ("four", 0.08),
+                            ("five", 0.02),
+                        )
+                    },
+                },
+            }
+        ]
+    raw = {
+        "date": day,
+        "sleep": {
+            "start": start.isoformat(),
+            "score": {
+                "stage_summary": stages,
+                "respiratory_rate": daily["respiratory_rate"],
+            },
+        },
+        "recovery": {
+            "created_at": start.isoformat(),
+            "score": {
+                "recovery_score": recovery,
+                "spo2_percentage": daily["spo2_percentage"],
+                "skin_temp_celsius": daily["skin_temp_celsius"],
+            },
+        },
+        "cycle": {"start": start.isoformat(), "score": {"strain": 11}},
+        "workouts": workouts,
+        "updated_at": start,
+    }
+    return daily, raw
+
+
+def generate(db: Session, years: int = 3, seed: int = 42, end: date | None = None) -> dict:
+    rng = random.Random(seed)
+    extra = random.Random(seed + 1)
+    end = end or date(2026, 1, 1)
+    start = end - timedelta(days=365 * years)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    db.add(UserGoal(goal_type="cut", start_date=start, priority_muscle_groups=["Legs"]))
+    db.add_all(
+        Exercise(name=name, exercise_type=kind, muscle_group=group, equipment=equipment)
+        for name, kind, group, equipment in EXERCISES
+    )
+    program = TrainingProgram(name="Synthetic 4-day split")
+    db.add(program)
+    db.flush()
+    program_days = [ProgramDay(program_id=program.id, day_name=name) for name, _ in PROGRAM_DAYS]
+    templates = [WorkoutTemplate(name=name) for name, _ in PROGRAM_DAYS]
+    db.add_all(program_days + templates)
+    db.flush()
+    exercise_ids = {name: i + 1 for i, (name, *_) in enumerate(EXERCISES)}
+    _insert(
+        db,
+        WorkoutTemplateExercise,
+        [
+            {
+                "workout_template_id": template.id,
+                "exercise_id": exercise_ids[EXERCISES[idx][0]],
+                "order_index": order,
+                "target_sets": SETS_PER_EXERCISE,
+            }
+            for template, (_, indexes) in zip(templates, PROGRAM_DAYS)
+            for order, idx in enumerate(indexes)
+        ],
+    )
+
+    weight = 84.0
+    whoop, whoop_raw, whoop_workouts, nutrition, recommendations = [], [], [], [], []
+    workouts, workout_exercises = [], []
+    calendar, calendar_exercises = [], []
+    workout_id = calendar_id = 0
+    for day in days:
+        weight += rng.gauss(-0.01, 0.15)
+        daily, raw = _whoop_row(rng, extra, day, weight)
+        whoop.append(daily)
+        if raw:
+            whoop_raw.append(raw)
+            whoop_workouts.extend(workout_values(w, day) for w in raw["workouts"] or [])
+        if rng.random() > 0.1:
+            nutrition.append(
+                {
+                    "date": day,
+                    "calories": int(rng.gauss(2300, 250)),
+                    "protein_g": round(rng.gauss(150, 20), 1),
+                    "fat_g": round(rng.gauss(70, 12), 1),
+                    "carbs_g": round(rng.gauss(240, 40), 1),
+                }
+            )
+        if day.weekday() == 0:
+            recommendations.append(
+                {
+                    "date": day,
+                    "type": "recovery",
+                    "message": "Reduce volume by 20% today.",
+                    "confidence_score": round(rng.random(), 3),
+                    "model_version": "synthetic",
+                    "explanation_json": {"reasons": ["HRV below baseline", "High strain"]},
+                }
+            )
+        if day.weekday() not in WORKOUT_WEEKDAYS:
+            continue
+        slot = WORKOUT_WEEKDAYS.index(day.weekday())
+        _, indexes = PROGRAM_DAYS[slot]
+        workout_id += 1
+        calendar_id += 1
+        workouts.append(
+            {
+                "id": workout_id,
+                "date": day,
+                "duration_minutes": int(rng.gauss(65, 10)),
+                "subjective_fatigue": rng.randint(3, 8),
+                "workout_quality": rng.choice(("good", "ok", "bad")),
+                "program_day_id": program_days[slot].id,
+            }
+        )
+        calendar.append(
+            {
+                "id": calendar_id,
+                "date": day,
+                "workout_template_id": templates[slot].id,
+                "name_snapshot": templates[slot].name,
+            }
+        )
+        for idx in indexes:
+            name, kind, group, equipment = EXERCISES[idx]
+            for set_number in range(1, SETS_PER_EXERCISE + 1):
+                reps = 0 if kind == "cardio" else rng.randint(5, 12)
+                weight_kg = 0.0 if kind == "cardio" else round(rng.uniform(20, 140), 1)
+                duration = rng.randint(10, 30) if kind == "cardio" else None
+                workout_exercises.append(
+                    {
+                        "workout_id": workout_id,
+                        "exercise_name": name,
+                        "set_number": set_number,
+                        "exercise_type": kind,
+                        "muscle_group": group,
+                        "equipment": equipment,
+                        "reps": reps,
+                        "weight_kg": weight_kg,
+                        "rpe": round(rng.uniform(6, 9.5), 1),
+                        "duration_minutes": duration,
+                    }
+                )
+                calendar_exercises.append(
+                    {
+                        "calendar_workout_id": calendar_id,
+                        "exercise_id": exercise_ids[name],
+                        "exercise_name": name,
+                        "exercise_type": kind,
+                        "muscle_group": group,
+                        "equipment": equipment,
+                        "set_number": set_number,
+                        "reps": reps,
+                        "weight_kg": weight_kg,
+                        "duration_minutes": duration,
+                    }
+                )
+
+    _insert(db, WhoopDaily, whoop)
+    _insert(db, WhoopDailyRaw, whoop_raw)
+    _insert(db, WhoopWorkout, whoop_workouts)
+    _insert(db, NutritionDaily, nutrition)
+    _insert(db, Recommendation, recommendations)
+    _insert(db, Workout, workouts)
+    _insert(db, WorkoutExercise, workout_exercises)
+    _insert(db, CalendarWorkout, calendar)
+    _insert(db, CalendarWorkoutExercise, calendar_exercises)
+    db.commit()
+    # The bulk inserts bypass the recompute pipeline; build its feature rows.
+    features = rebuild_daily_features(db)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "whoop_daily": len(whoop),
+        "whoop_daily_raw": len(whoop_raw),
+        "whoop_workout": len(whoop_workouts),
+        "nutrition_daily": len(nutrition),
+        "recommendation": len(recommendations),
+        "workout": len(workouts),
+        "workout_exercise": len(workout_exercises),
+        "calendar_workout": len(calendar),
+        "calendar_workout_exercise": len(calendar_exercises),
+        "daily_feature": features,
+    }
+
+
+def sync_sequences(engine: Engine) -> None:
+    # generate() inserts explicit ids; move PostgreSQL sequences past them.
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if "id" in table.c and table.c.id.autoincrement is not False:
+                conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                    )
+                )
+
+
+def whoop_payload(end: date, days: int, variant: int = 0) -> dict:
+    # Shaped like WhoopClient responses; variant shifts scores so repeated
+    # ingests of the same window still change rows.
+    start = end - timedelta(days=days - 1)
+    cycles, recoveries, sleeps = [], [], []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        stamp = f"{day.isoformat()}T06:00:00Z"
+        cycles.append({"start": stamp, "score": {"strain": 10.0 + (i + variant) % 7}})
+        recoveries.append(
+            {
+                "created_at": stamp,
+                "score": {
+                    "recovery_score": 40 + (i * 7 + variant) % 55,
+                    "hrv_rmssd_milli": 45.0 + (i + variant) % 20,
+                    "resting_heart_rate": 52 + (i + variant) % 6,
+                },
+            }
+        )
+        sleeps.append(
+            {
+                "start": stamp,
+                "score": {
+                    "sleep_efficiency_percentage": 85 + (i + variant) % 10,
+                    "stage_summary": {"total_in_bed_time_milli": (400 + variant) * 60000},
+                },
+            }
+        )
+    return {
+        "cycles": cycles,
+        "recoveries": recoveries,
+        "sleeps": sleeps,
+        "workouts": [],
+        "body": {"weight_kilogram": 80.0 + variant / 10},
+        "start_date": start,
+        "end_date": end,
+    }
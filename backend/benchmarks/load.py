@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from itertools import count
+
+import httpx
+
+# Replays frontend sessions against the API at a fixed number of concurrent
+# virtual users. Without --base-url it seeds a temporary database with the
+# benchmark generator and serves the app in-process with uvicorn. Celery runs
+# eagerly there, so writes include the work they trigger, unless --workers
+# starts worker threads on an in-memory broker as the deployment's interactive
+# worker would consume. Client, server and workers then share one
+# interpreter: compare runs made the same way.
+parser = argparse.ArgumentParser(description="Load-test the Athletica API with scripted sessions")
+parser.add_argument("--base-url", help="running API to test (default: serve the app in-process)")
+parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual users")
+parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+parser.add_argument("--think-ms", type=float, default=0.0, help="pause between requests")
+parser.add_argument("--years", type=int, default=1, help="seeded history (in-process only)")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--database-url", help="empty database to seed (in-process only)")
+parser.add_argument("--redis-url", default="redis://127.0.0.1:1/0")
+parser.add_argument(
+    "--workers",
+    action="store_true",
+    help="run Celery in in-process workers instead of eagerly (in-process only)",
+)
+parser.add_argument(
+    "--slow-telegram-ms",
+    type=float,
+    help="serve the Telegram API from a local stand-in with this latency (in-process only; "
+    "implies --workers)",
+)
+parser.add_argument(
+    "--max-webhook-p95-ms",
+    type=float,
+    help="with --slow-telegram-ms, exit 1 if the webhook p95 is above this "
+    "(default: the stand-in's latency)",
+)
+parser.add_argument("--output", default="load-results.json")
+parser.add_argument("--baseline", help="results file to gate against")
+parser.add_argument(
+    "--max-regression",
+    type=float,
+    default=0.25,
+    help="allowed relative p95 increase or throughput drop against the baseline",
+)
+ARGS = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+if ARGS.base_url and (ARGS.workers or ARGS.slow_telegram_ms is not None):
+    parser.error("--workers and --slow-telegram-ms need the in-process app (no --base-url)")
+if ARGS.slow_telegram_ms is not None:
+    # The webhook only acks; the sends belong on a worker, not in the request.
+    ARGS.workers = True
+    if ARGS.max_webhook_p95_ms is None:
+        ARGS.max_webhook_p95_ms = ARGS.slow_telegram_ms
+
+if not ARGS.base_url:
+    if not ARGS.database_url:
+        ARGS.database_url = "sqlite:///" + os.path.join(
+            tempfile.mkdtemp(prefix="athletica-load-"), "load.db"
+        )
+    os.environ["ATHLETICA_DATABASE_URL"] = ARGS.database_url
+    os.environ["ATHLETICA_REDIS_URL"] = ARGS.redis_url
+
+# Session mix: (name, weight). Reads dominate, as in the frontend.
+SESSIONS = (
+    ("dashboard", 4),
+    ("calendar_month", 3),
+    ("templates", 2),
+    ("log_workout", 1),
+    ("telegram_nutrition", 1),
+)
+WEBHOOK_ROUTE = "POST /telegram/webhook"
+TELEGRAM_ROUTES = {WEBHOOK_ROUTE}
+STATUS_ERROR = 400
+_update_ids = count(int(time.time() * 1000))
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.measuring = False
+        self.started = 0.0
+        self.stopped = 0.0
+
+    def begin(self) -> None:
+        self.measuring = True
+        self.started = time.perf_counter()
+
+    def end(self) -> None:
+        self.measuring = False
+        self.stopped = time.perf_counter()
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        if not self.measuring:
+            return
+        self.samples[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+
+class Session:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, data: dict) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.data = data
+
+    async def call(self, method: str, route: str, path: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            ok = response.status_code < STATUS_ERROR
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(f"{method} {route}", time.perf_counter() - started, ok)
+        if ARGS.think_ms:
+            await asyncio.sleep(ARGS.think_ms / 1000)
+        return response
+
+    async def dashboard(self) -> None:
+        await self.call("GET", "/dashboard", "/dashboard")
+
+    async def calendar_month(self) -> None:
+        start = date.fromisoformat(self.data["start"])
+        end = date.fromisoformat(self.data["end"])
+        first = (start + timedelta(days=self.rng.randrange((end - start).days + 1))).replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        response = await self.call(
+            "GET",
+            "/calendar",
+            "/calendar",
+            params={"date_from": first.isoformat(), "date_to": last.isoformat()},
+        )
+        entries = response.json() if response is not None and response.status_code == 200 else []
+        if entries:
+            entry = self.rng.choice(entries)
+            await self.call("GET", "/calendar/{calendar_id}", f"/calendar/{entry['id']}")
+
+    async def templates(self) -> None:
+        response = await self.call("GET", "/workouts/templates", "/workouts/templates")
+        templates = response.json() if response is not None and response.status_code == 200 else []
+        if templates:
+            template = self.rng.choice(templates)
+            await self.call(
+                "GET",
+                "/workouts/templates/{template_id}/exercises",
+                f"/workouts/templates/{template['id']}/exercises",
+            )
+
+    async def log_workout(self) -> None:
+        program_day_id = self.rng.choice(self.data["program_day_ids"])
+        await self.call(
+            "GET", "/workouts/last", "/workouts/last", params={"program_day_id": program_day_id}
+        )
+        day = date.fromisoformat(self.data["end"]) - timedelta(days=self.rng.randrange(30))
+        exercises = [
+            {
+                "exercise_name": name,
+                "set_number": set_number,
+                "exercise_type": "strength",
+                "muscle_group": group,
+                "reps": self.rng.randint(5, 12),
+                "weight_kg": round(self.rng.uniform(20, 120), 1),
+                "rpe": 8,
+            }
+            for name, group in self.rng.sample(self.data["exercises"], 3)
+            for set_number in range(1, 4)
+        ]
+        await self.call(
+            "POST",
+            "/workouts",
+            "/workouts",
+            json={
+                "date": day.isoformat(),
+                "duration_minutes": 60,
+                "subjective_fatigue": 5,
+                "workout_quality": "good",
+                "program_day_id": program_day_id,
+                "exercises": exercises,
+            },
+        )
+
+    async def telegram_nutrition(self) -> None:
+        update_id = next(_update_ids)
+        calories = self.rng.randint(1800, 2800)
+        text = f"{calories} {self.rng.randint(120, 190)} {self.rng.randint(50, 90)} {self.rng.randint(150, 300)}"
+        await self.call(
+            "POST",
+            "/telegram/webhook",
+            "/telegram/webhook",
+            json={
+                "update_id": update_id,
+                "message": {"message_id": update_id % 1_000_000, "chat": {"id": 1}, "text": text},
+            },
+        )
+
+
+async def _user(index: int, client: httpx.AsyncClient, recorder: Recorder, data: dict, stop: float) -> None:
+    rng = random.Random(ARGS.seed * 1000 + index)
+    session = Session(client, recorder, rng, data)
+    names = [name for name, _ in SESSIONS]
+    weights = [weight for _, weight in SESSIONS]
+    while time.perf_counter() < stop:
+        await getattr(session, rng.choices(names, weights)[0])()
+
+
+async def _drive(base_url: str, data: dict) -> Recorder:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=ARGS.concurrency, max_keepalive_connections=ARGS.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop = time.perf_counter() + ARGS.warmup + ARGS.duration
+        users = [
+            asyncio.create_task(_user(i, client, recorder, data, stop)) for i in range(ARGS.concurrency)
+        ]
+        await asyncio.sleep(ARGS.warmup)
+        recorder.begin()
+        await asyncio.gather(*users)
+        recorder.end()
+    return recorder
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarise(recorder: Recorder) -> dict:
+    elapsed = recorder.stopped - recorder.started
+    routes = {}
+    for route, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        routes[route] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(route, 0),
+            "rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        }
+    total = sum(item["requests"] for item in routes.values())
+    # Every route that does not talk to Telegram, pooled: what a slow Telegram
+    # API must not drag down.
+    others = sorted(
+        sample
+        for route, samples in recorder.samples.items()
+        if route not in TELEGRAM_ROUTES
+        for sample in samples
+    )
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(item["errors"] for item in routes.values()),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+        "other_routes": {
+            "requests": len(others),
+            "p50_ms": round(_percentile(others, 0.50) * 1000, 2) if others else 0.0,
+            "p95_ms": round(_percentile(others, 0.95) * 1000, 2) if others else 0.0,
+            "p99_ms": round(_percentile(others, 0.99) * 1000, 2) if others else 0.0,
+        },
+    }
+
+
+def gate(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    failures = []
+    mode = baseline["meta"].get("celery", "eager")
+    if mode != current["meta"]["celery"]:
+        failures.append(f"baseline ran Celery {mode}, this run {current['meta']['celery']}")
+    before = baseline["summary"]
+    after = current["summary"]
+    if after["errors"]:
+        failures.append(f"{after['errors']} failed requests")
+    if after["rps"] < before["rps"] * (1 - max_regression):
+        failures.append(f"throughput {after['rps']} rps < baseline {before['rps']} rps")
+    for route, item in after["routes"].items():
+        previous = before["routes"].get(route)
+        if previous and item["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            failures.append(f"{route}: p95 {item['p95_ms']}ms > baseline {previous['p95_ms']}ms")
+    previous = before.get("other_routes")
+    item = after["other_routes"]
+    if previous and item["p99_ms"] > previous["p99_ms"] * (1 + max_regression):
+        failures.append(f"other routes: p99 {item['p99_ms']}ms > baseline {previous['p99_ms']}ms")
+    return failures
+
+
+def _print(summary: dict) -> None:
+    print(f"{'route':<48} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for route, item in summary["routes"].items():
+        print(
+            f"{route:<48} {item['requests']:>6} {item['errors']:>4} {item['rps']:>8.1f} "
+            f"{item['p50_ms']:>7.1f}ms {item['p95_ms']:>7.1f}ms {item['p99_ms']:>7.1f}ms"
+        )
+    print(f"{'total':<48} {summary['requests']:>6} {summary['errors']:>4} {summary['rps']:>8.1f}")
+    others = summary["other_routes"]
+    print(
+        f"{'all but telegram':<48} {others['requests']:>6} {'':>4} {'':>8} "
+        f"{others['p50_ms']:>7.1f}ms {others['p95_ms']:>7.1f}ms {others['p99_ms']:>7.1f}ms"
+    )
+
+
+def _seed() -> dict:
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.workers.celery_app import celery_app
+    from benchmarks.generator import EXERCISES, generate, sync_sequences
+
+    if ARGS.workers:
+        celery_app.conf.broker_url = "memory://"
+        celery_app.conf.broker_transport_options = {"polling_interval": 0.01}
+        celery_app.conf.task_ignore_result = True
+    else:
+        celery_app.conf.task_always_eager = True
+    # The API publishes by name; register the tasks so eager calls and the
+    # in-process workers can run them.
+    celery_app.loader.import_default_modules()
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        history = generate(db, years=ARGS.years, seed=ARGS.seed)
+    sync_sequences(engine)
+    return {
+        **history,
+        "program_day_ids": [1, 2, 3, 4],
+        "exercises": [(name, group) for name, kind, group, _ in EXERCISES if kind == "strength"],
+    }
+
+
+# Everything the API publishes is routed to the interactive queue; this is
+# the deployment's interactive worker (-c 4) as threads in this process. With
+# the in-memory broker a worker whose prefetch is full only fetches again on a
+# 2 s poll, so the prefetch is raised well above any backlog a run builds.
+def _start_workers(stack: ExitStack) -> None:
+    from celery.contrib.testing.worker import start_worker
+
+    from app.workers.celery_app import celery_app
+
+    stack.enter_context(
+        start_worker(
+            celery_app,
+            pool="threads",
+            concurrency=4,
+            prefetch_multiplier=1000,
+            queues=["interactive"],
+            perform_ping_check=False,
+            shutdown_timeout=ARGS.slow_telegram_ms / 1000 + 10 if ARGS.slow_telegram_ms else 10.0,
+        )
+    )
+
+
+def _serve() -> tuple[str, object]:
+    import uvicorn
+
+    from app.main import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    )
+    threading.Thread(target=server.run, name="uvicorn", daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def _remote_data(base_url: str) -> dict:
+    # Against a running API the session data comes from the API itself.
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        calendar = client.get("/calendar").json()
+        exercises = client.get("/exercises").json()
+    days = sorted(entry["date"] for entry in calendar) or [datetime.now(timezone.utc).date().isoformat()]
+    return {
+        "start": days[0],
+        "end": days[-1],
+        "program_day_ids": [1],
+        "exercises": [
+            (item["name"], item.get("muscle_group"))
+            for item in exercises
+            if item.get("exercise_type", "strength") == "strength"
+        ][:20],
+    }
+
+
+def main() -> int:
+    for name in (
+        "app.api.cache",
+        "app.core.redis",
+        "app.services.cache_tags",
+        "app.services.telegram",
+        "app.workers.monitoring",
+        "celery",
+    ):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    telegram = None
+    if ARGS.slow_telegram_ms is not None:
+        from benchmarks.fake_telegram import start_fake_telegram
+
+        # Set before _seed() first imports the app and its settings.
+        telegram = start_fake_telegram(latency_ms=ARGS.slow_telegram_ms)
+        os.environ["ATHLETICA_TELEGRAM_API_BASE_URL"] = telegram.url
+        os.environ["ATHLETICA_TELEGRAM_BOT_TOKEN"] = "fake"
+        os.environ["ATHLETICA_TELEGRAM_CHAT_ID"] = "1"
+
+    server = None
+    with ExitStack() as stack:
+        if ARGS.base_url:
+            base_url = ARGS.base_url.rstrip("/")
+            data = _remote_data(base_url)
+        else:
+            data = _seed()
+            if ARGS.workers:
+                _start_workers(stack)
+            base_url, server = _serve()
+
+        recorder = asyncio.run(_drive(base_url, data))
+        if server is not None:
+            server.should_exit = True
+    if telegram is not None:
+        telegram.shutdown()
+
+    summary = summarise(recorder)
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": ARGS.base_url or "in-process",
+            "concurrency": ARGS.concurrency,
+            "duration": ARGS.duration,
+            "think_ms": ARGS.think_ms,
+            "celery": "eager" if not ARGS.workers else "workers",
+            "slow_telegram_ms": ARGS.slow_telegram_ms,
+            "telegram_calls": telegram.snapshot() if telegram is not None else None,
+            "years": ARGS.years,
+            "seed": ARGS.seed,
+        },
+        "summary": summary,
+    }
+    _print(summary)
+    with open(ARGS.output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\nResults written to {ARGS.output}")
+
+    failed = False
+    webhook = summary["routes"].get(WEBHOOK_ROUTE)
+    if ARGS.max_webhook_p95_ms is not None and webhook:
+        if webhook["p95_ms"] > ARGS.max_webhook_p95_ms:
+            print(f"FAIL webhook p95 {webhook['p95_ms']}ms > {ARGS.max_webhook_p95_ms:.0f}ms")
+            failed = True
+        else:
+            print(f"Webhook acked within {ARGS.max_webhook_p95_ms:.0f}ms at p95")
+    if ARGS.baseline:
+        with open(ARGS.baseline) as fh:
+            failures = gate(results, json.load(fh), ARGS.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            failed = True
+        else:
+            print(f"Within {ARGS.max_regression:.0%} of {ARGS.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Settings are read at import time, so point the app at a scratch database,
+# an unreachable Redis (cache calls fail fast and fall through) and eager Celery.
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="athletica-budgets-"), "budgets.db")
+os.environ.setdefault("ATHLETICA_DATABASE_URL", f"sqlite:///{_DB_PATH}")
+os.environ.setdefault("ATHLETICA_REDIS_URL", "redis://127.0.0.1:1/0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.instrumentation import QueryBudgetExceeded, query_budget  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.exercise import Exercise  # noqa: E402
+from app.models.workout_template import WorkoutTemplate  # noqa: E402
+from app.workers.celery_app import celery_app  # noqa: E402
+from app.workers.tasks import _ingest_whoop  # noqa: E402
+
+# Budgets do not grow with the number of items written; a loop that issues one
+# query per exercise or per day breaks them immediately.
+ITEMS = 25
+
+
+def _seed() -> None:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all(
+            Exercise(
+                name=f"Exercise {i}",
+                exercise_type="strength",
+                muscle_group="Legs",
+                equipment="Barbell",
+            )
+            for i in range(ITEMS)
+        )
+        db.add(WorkoutTemplate(name="Budget template"))
+        db.commit()
+
+
+def _calendar_payload(day: str) -> dict:
+    return {
+        "date": day,
+        "workout_template_id": 1,
+        "exercises": [
+            {"exercise_id": i + 1, "set_number": 1, "reps": 5, "weight_kg": 100}
+            for i in range(ITEMS)
+        ],
+    }
+
+
+def _whoop_payload(start: date, days: int) -> dict:
+    records = [
+        {
+            "start": f"{start + timedelta(days=i)}T06:00:00Z",
+            "created_at": f"{start + timedelta(days=i)}T07:00:00Z",
+            "score": {"strain": 10 + i % 5, "recovery_score": 60, "hrv_rmssd_milli": 55},
+        }
+        for i in range(days)
+    ]
+    return {
+        "cycles": records,
+        "recoveries": records,
+        "sleeps": [],
+        "workouts": [],
+        "body": {"weight_kilogram": 80},
+        "start_date": start,
+        "end_date": start + timedelta(days=days - 1),
+    }
+
+
+def _cases(client: TestClient):
+    def ok(response):
+        assert response.status_code == 200, response.text
+
+    yield "POST /calendar", 8, lambda: ok(client.post("/calendar", json=_calendar_payload("2026-01-01")))
+    yield "PUT /calendar/{id}", 10, lambda: ok(client.put("/calendar/1", json=_calendar_payload("2026-01-02")))
+    yield "PUT /workouts/templates/{id}/exercises", 8, lambda: ok(
+        client.put(
+            "/workouts/templates/1/exercises",
+            json={
+                "exercises": [
+                    {"exercise_id": i + 1, "order_index": i, "target_sets": 3} for i in range(ITEMS)
+                ]
+            },
+        )
+    )
+
+    def ingest() -> None:
+        with SessionLocal() as db:
+            _ingest_whoop(db, _whoop_payload(date(2026, 1, 1), ITEMS))
+
+    # Includes the eager recompute run the ingest triggers.
+    yield "_ingest_whoop", 30, ingest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check per-endpoint SQL query budgets")
+    parser.add_argument("--max-repeats", type=int, default=3)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    celery_app.conf.task_always_eager = True
+    for name in ("app.api.cache", "app.services.cache_tags", "app.workers.monitoring"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+    _seed()
+    client = TestClient(app)
+    failures = 0
+    for label, budget, run in _cases(client):
+        try:
+            with query_budget(engine, budget, max_repeats=args.max_repeats, label=label) as recorder:
+                run()
+        except QueryBudgetExceeded as exc:
+            failures += 1
+            print(f"FAIL {exc}\n")
+            continue
+        print(f"ok   {label}: {recorder.count} statements (budget {budget})")
+        if args.verbose:
+            print(recorder.report())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
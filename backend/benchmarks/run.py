@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Settings are read at import time: configure the app before importing it.
+# Redis defaults to an unreachable port so cache and dedupe calls fail fast and
+# fall through; pass --redis-url to benchmark with the response cache on.
+parser = argparse.ArgumentParser(description="Run Athletica hot-path benchmarks")
+parser.add_argument("--years", type=int, default=3, help="years of synthetic history")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--repeat", type=int, default=20)
+parser.add_argument(
+    "--database-url",
+    help="SQLAlchemy URL of an empty database (default: a temporary SQLite file)",
+)
+parser.add_argument("--redis-url", default="redis://127.0.0.1:1/0")
+parser.add_argument("--output", default="benchmark-results.json")
+parser.add_argument("--compare", help="previous results file to diff against")
+parser.add_argument("--only", nargs="*", help="run only these cases")
+ARGS = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+
+if not ARGS.database_url:
+    ARGS.database_url = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="athletica-bench-"), "bench.db"
+    )
+os.environ["ATHLETICA_DATABASE_URL"] = ARGS.database_url
+os.environ["ATHLETICA_REDIS_URL"] = ARGS.redis_url
+
+import orjson  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import inspect, text  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.instrumentation import QueryRecorder  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.whoop import WhoopDaily  # noqa: E402
+from app.workers.celery_app import celery_app  # noqa: E402
+from benchmarks.generator import generate, sync_sequences, whoop_payload  # noqa: E402
+
+
+def _measure(fn, repeat: int) -> dict:
+    samples, queries, size = [], [], None
+    for i in range(repeat):
+        with QueryRecorder(engine) as recorder:
+            started = time.perf_counter()
+            size = fn(i)
+            samples.append((time.perf_counter() - started) * 1000)
+        queries.append(recorder.count)
+    samples.sort()
+    result = {
+        "repeat": repeat,
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "queries": max(queries),
+    }
+    if isinstance(size, dict):
+        result.update(size)
+    elif size is not None:
+        result["bytes"] = size
+    return result
+
+
+def _cases(client: TestClient, history: dict):
+    end = datetime.fromisoformat(history["end"]).date()
+
+    def http(method: str, path: str, **kwargs):
+        def run(_: int) -> int:
+            response = client.request(method, path, **kwargs)
+            assert response.status_code < 400, f"{path}: {response.status_code} {response.text[:200]}"
+            return len(response.content)
+
+        return run
+
+    def wire_bytes(response) -> int:
+        # Status line, headers and body, as sent over HTTP/1.1.
+        head = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n")
+        head += sum(len(name) + len(value) + 4 for name, value in response.headers.raw) + 2
+        return head + len(response.content)
+
+    def revalidate(path: str):
+        # A client holding the ETag from a full load gets a 304 from cached_route.
+        headers = {"Accept-Encoding": "identity"}
+        full = client.get(path, headers=headers)
+        etag = full.headers.get("etag")
+        assert etag, f"{path}: no ETag (is Redis reachable?)"
+
+        def run(_: int) -> dict:
+            response = client.get(path, headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 304, f"{path}: {response.status_code}, expected 304"
+            return {"bytes_200": wire_bytes(full), "bytes_304": wire_bytes(response)}
+
+        return run
+
+    def whoop_scan(_: int) -> None:
+        with SessionLocal() as db:
+            db.query(WhoopDaily).all()
+
+    def feature_frame(_: int) -> None:
+        from app.ml.pipeline import build_feature_frame
+
+        with SessionLocal() as db:
+            build_feature_frame(db)
+
+    def insight(_: int) -> int:
+        from app.services.daily_snapshot import rebuild_daily_snapshot
+        from app.workers.tasks import _compose_daily_insight
+
+        with SessionLocal() as db:
+            message, _ = _compose_daily_insight(rebuild_daily_snapshot(db))
+        return len(message.encode())
+
+    def ingest(i: int) -> None:
+        from app.workers.tasks import _ingest_whoop
+
+        with SessionLocal() as db:
+            _ingest_whoop(db, whoop_payload(end, 30, variant=i % 2 + 1))
+
+    def webhook(i: int) -> int:
+        payload = {
+            "update_id": 10_000_000 + i,
+            "message": {"message_id": i, "chat": {"id": 1}, "text": "2200 160 70 240"},
+        }
+        return http("POST", "/telegram/webhook", json=payload)(i)
+
+    yield "get_calendar", http("GET", "/calendar")
+    yield "get_nutrition", http("GET", "/nutrition")
+    yield "get_nutrition_gzip", http("GET", "/nutrition", headers={"Accept-Encoding": "gzip"})
+    # The response cache needs Redis; without --redis-url there is no ETag.
+    if ARGS.redis_url != parser.get_default("redis_url"):
+        yield "nutrition_304", revalidate("/nutrition")
+        yield "calendar_304", revalidate("/calendar")
+    yield "get_workouts_last", http("GET", "/workouts/last", params={"program_day_id": 1})
+    yield "get_dashboard", http("GET", "/dashboard")
+    yield "daily_insight_compose", insight
+    yield "scan_whoop_daily", whoop_scan
+    yield "build_feature_frame", feature_frame
+    # Writers last: they change the data the read cases see.
+    yield "ingest_whoop_30d", ingest
+    yield "telegram_webhook", webhook
+
+
+def _whoop_row_width() -> dict:
+    # Average width of a whoop_daily row as stored and as loaded by the ORM.
+    with SessionLocal() as db:
+        rows = db.query(WhoopDaily).all()
+        stored = (
+            db.execute(text("SELECT avg(pg_column_size(w.*)) FROM whoop_daily w")).scalar()
+            if engine.dialect.name == "postgresql"
+            else None
+        )
+    columns = [attr.key for attr in inspect(WhoopDaily).column_attrs]
+    loaded = sum(
+        len(orjson.dumps({key: getattr(row, key) for key in columns}, default=str)) for row in rows
+    )
+    return {
+        "columns": len(columns),
+        "loaded_bytes": round(loaded / max(len(rows), 1), 1),
+        "stored_bytes": round(float(stored), 1) if stored is not None else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(current: dict, path: str) -> None:
+    with open(path) as fh:
+        baseline = json.load(fh)
+    print(f"\n{'case':<26} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in current["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            print(f"{name:<26} {'-':>10} {result['median_ms']:>9.2f}ms {'new':>8}")
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        print(
+            f"{name:<26} {before['median_ms']:>8.2f}ms {result['median_ms']:>8.2f}ms {change:>+7.1f}%"
+        )
+
+
+def main() -> int:
+    # Tasks (recompute, Telegram processing and delivery) run inline so the
+    # writer cases measure the work they trigger.
+    celery_app.conf.task_always_eager = True
+    # The API publishes by name; register the tasks so eager calls run them.
+    celery_app.loader.import_default_modules()
+    quiet = (
+        "app.api.cache",
+        "app.core.redis",
+        "app.services.cache_tags",
+        "app.services.telegram",
+        "app.workers.monitoring",
+    )
+    for name in quiet:
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        history = generate(db, years=ARGS.years, seed=ARGS.seed)
+    sync_sequences(engine)
+    seed_seconds = time.perf_counter() - started
+
+    client = TestClient(app)
+    cases = {}
+    for name, fn in _cases(client, history):
+        if ARGS.only and name not in ARGS.only:
+            continue
+        cases[name] = _measure(fn, ARGS.repeat)
+        line = f"{name:<26} {cases[name]['median_ms']:>9.2f}ms  {cases[name]['queries']:>4} queries"
+        if "bytes_304" in cases[name]:
+            line += f"  200: {cases[name]['bytes_200']} B, 304: {cases[name]['bytes_304']} B"
+        print(line)
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "redis": ARGS.redis_url != parser.get_default("redis_url"),
+            "years": ARGS.years,
+            "seed": ARGS.seed,
+            "seed_seconds": round(seed_seconds, 2),
+            "rows": history,
+            "whoop_daily_row": _whoop_row_width(),
+        },
+        "cases": cases,
+    }
+    with open(ARGS.output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\nResults written to {ARGS.output}")
+    if ARGS.compare:
+        _compare(results, ARGS.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
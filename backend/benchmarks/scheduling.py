@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime
+
+# Times send_daily_insight from publish to finish while a training-sized task
+# holds the ml worker. Workers run as threads in this process, on an in-memory
+# broker unless --broker-url is given:
+#
+#   split   the configured routes; an interactive worker (-c 4) and an ml
+#           worker (-c 1), as in docker-compose.yml
+#   shared  one worker with one slot consuming both queues, as when insights
+#           and training shared the ml queue
+#
+# The training stub sleeps instead of training: it only has to occupy the slot.
+parser = argparse.ArgumentParser(description="Measure insight latency while training runs")
+parser.add_argument("--mode", choices=("split", "shared", "both"), default="both")
+parser.add_argument("--training-seconds", type=float, default=10.0)
+parser.add_argument("--insights", type=int, default=20, help="insights published during training")
+parser.add_argument("--interval-ms", type=float, default=200.0, help="pause between insights")
+parser.add_argument(
+    "--max-p95-ms",
+    type=float,
+    default=1000.0,
+    help="exit 1 if the split topology's insight p95 is above this",
+)
+parser.add_argument("--years", type=int, default=1, help="years of synthetic history")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument(
+    "--database-url",
+    help="SQLAlchemy URL of an empty database (default: a temporary SQLite file)",
+)
+parser.add_argument("--redis-url", default="redis://127.0.0.1:1/0")
+parser.add_argument("--broker-url", default="memory://")
+ARGS = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+
+if not ARGS.database_url:
+    ARGS.database_url = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="athletica-scheduling-"), "scheduling.db"
+    )
+os.environ["ATHLETICA_DATABASE_URL"] = ARGS.database_url
+os.environ["ATHLETICA_REDIS_URL"] = ARGS.redis_url
+
+from celery.contrib.testing.worker import start_worker  # noqa: E402
+from celery.signals import task_postrun, task_prerun  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.workers.celery_app import celery_app  # noqa: E402
+from benchmarks.generator import generate, sync_sequences  # noqa: E402
+
+TRAIN_MODELS = "app.workers.tasks.train_models"
+SEND_DAILY_INSIGHT = "app.workers.tasks.send_daily_insight"
+TRAINING_STUB = "benchmarks.scheduling.training_stub"
+
+_lock = threading.Lock()
+_published: dict[str, float] = {}
+_started: dict[str, float] = {}
+_finished: dict[str, float] = {}
+
+
+@celery_app.task(name=TRAINING_STUB)
+def training_stub(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@task_prerun.connect
+def _on_prerun(task_id: str | None = None, **_: object) -> None:
+    with _lock:
+        _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_postrun(task_id: str | None = None, **_: object) -> None:
+    with _lock:
+        _finished[task_id] = time.perf_counter()
+
+
+def _publish(name: str, *args: object) -> str:
+    task = celery_app.tasks[name]
+    published = time.perf_counter()
+    task_id = task.apply_async(args=args).id
+    with _lock:
+        _published[task_id] = published
+    return task_id
+
+
+def _wait(task_ids: list[str], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _lock:
+            if all(task_id in _finished for task_id in task_ids):
+                return True
+        time.sleep(0.01)
+    return False
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# Single-slot workers use the solo pool: with threads and an in-memory broker
+# the next message is only fetched on the worker's 2 s poll after an ack.
+def _workers(mode: str) -> list[dict]:
+    options = {"perform_ping_check": False, "shutdown_timeout": 30.0}
+    single = {**options, "pool": "solo", "concurrency": 1, "prefetch_multiplier": 1}
+    if mode == "split":
+        return [
+            {**options, "queues": ["interactive"], "pool": "threads", "concurrency": 4},
+            {**single, "queues": ["ml"]},
+        ]
+    return [{**single, "queues": ["interactive", "ml"]}]
+
+
+def run(mode: str) -> dict:
+    with ExitStack() as stack:
+        for options in _workers(mode):
+            stack.enter_context(start_worker(celery_app, **options))
+        training = _publish(TRAINING_STUB, ARGS.training_seconds)
+        # Let training take its slot before the first insight arrives.
+        time.sleep(0.2)
+        day = datetime.now().date().isoformat()
+        insights = []
+        for _ in range(ARGS.insights):
+            insights.append(_publish(SEND_DAILY_INSIGHT, day))
+            time.sleep(ARGS.interval_ms / 1000)
+        timeout = ARGS.training_seconds + ARGS.insights * 5 + 30
+        if not _wait([training, *insights], timeout):
+            raise RuntimeError(f"{mode}: tasks did not finish within {timeout:.0f}s")
+
+    with _lock:
+        latency = sorted((_finished[i] - _published[i]) * 1000 for i in insights)
+        waits = sorted((_started[i] - _published[i]) * 1000 for i in insights)
+    return {
+        "insights": len(latency),
+        "p50_ms": round(_percentile(latency, 0.50), 1),
+        "p95_ms": round(_percentile(latency, 0.95), 1),
+        "max_ms": round(latency[-1], 1),
+        "queue_wait_p95_ms": round(_percentile(waits, 0.95), 1),
+    }
+
+
+def main() -> int:
+    for name in ("app.core.redis", "app.services.telegram", "app.workers.monitoring", "celery"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    celery_app.conf.broker_url = ARGS.broker_url
+    if ARGS.broker_url.startswith("memory://"):
+        celery_app.conf.broker_transport_options = {"polling_interval": 0.01}
+    celery_app.conf.task_ignore_result = True
+    celery_app.loader.import_default_modules()
+    # The stub is routed and annotated like the task it stands in for.
+    celery_app.conf.task_routes[TRAINING_STUB] = celery_app.conf.task_routes[TRAIN_MODELS]
+    celery_app.conf.task_annotations[TRAINING_STUB] = celery_app.conf.task_annotations[TRAIN_MODELS]
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        generate(db, years=ARGS.years, seed=ARGS.seed)
+    sync_sequences(engine)
+
+    modes = ("split", "shared") if ARGS.mode == "both" else (ARGS.mode,)
+    print(f"training {ARGS.training_seconds:.0f}s, {ARGS.insights} insights every {ARGS.interval_ms:.0f}ms")
+    print(f"{'topology':<10} {'n':>4} {'p50':>10} {'p95':>10} {'max':>10} {'wait p95':>10}")
+    results = {}
+    for mode in modes:
+        item = results[mode] = run(mode)
+        print(
+            f"{mode:<10} {item['insights']:>4} {item['p50_ms']:>8.1f}ms {item['p95_ms']:>8.1f}ms "
+            f"{item['max_ms']:>8.1f}ms {item['queue_wait_p95_ms']:>8.1f}ms"
+        )
+
+    split = results.get("split")
+    if split and split["p95_ms"] > ARGS.max_p95_ms:
+        print(f"FAIL insight p95 {split['p95_ms']}ms > {ARGS.max_p95_ms:.0f}ms while training runs")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.serialization import columns_for, rows_response
+from app.db.base import Base
+from app.models.nutrition import NutritionDaily
+from app.schemas.nutrition import NutritionOut
+
+# Compares the old /nutrition list path (ORM entities, model_validate per row,
+# then FastAPI's response_model round trip) with the column-tuple + orjson path.
+
+
+def _seed(db: Session, rows: int) -> None:
+    start = date(2010, 1, 1)
+    db.add_all(
+        NutritionDaily(
+            date=start + timedelta(days=i),
+            calories=2000 + i % 700,
+            protein_g=120.0 + i % 60,
+            fat_g=60.0 + i % 30,
+            carbs_g=200.0 + i % 120,
+        )
+        for i in range(rows)
+    )
+    db.commit()
+
+
+def _legacy(db: Session) -> bytes:
+    rows = db.query(NutritionDaily).order_by(NutritionDaily.date.desc()).all()
+    items = [NutritionOut.model_validate(r, from_attributes=True) for r in rows]
+    adapter = TypeAdapter(list[NutritionOut])
+    validated = adapter.validate_python([item.model_dump() for item in items])
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _fast(db: Session) -> bytes:
+    rows = (
+        db.query(*columns_for(NutritionDaily, NutritionOut))
+        .order_by(NutritionDaily.date.desc())
+        .all()
+    )
+    return rows_response(rows).body
+
+
+def _time(fn, db: Session, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        body = fn(db)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "bytes": len(body),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /nutrition list serialization")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[NutritionDaily.__table__])
+    with Session(engine) as db:
+        _seed(db, args.rows)
+        result = {
+            "rows": args.rows,
+            "legacy": _time(_legacy, db, args.repeat),
+            "fast": _time(_fast, db, args.repeat),
+        }
+    result["speedup"] = round(result["legacy"]["median_ms"] / result["fast"]["median_ms"], 2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures API startup in fresh interpreters (import app.main and run the
+# lifespan) and fails if worker-only or ML modules end up in the API process.
+FORBIDDEN = (
+    "pandas",
+    "numpy",
+    "sklearn",
+    "lightgbm",
+    "mlflow",
+    "app.ml.pipeline",
+    "app.ml.runner",
+    "app.workers.tasks",
+)
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter() - started
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/health")
+ready = time.perf_counter() - started
+rss_kb = 0
+with open("/proc/self/status") as fh:
+    for line in fh:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "import_seconds": imported,
+    "ready_seconds": ready,
+    "rss_mb": rss_kb / 1024,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "forbidden": sorted(
+        {name for name in FORBIDDEN for m in sys.modules if m == name or m.startswith(name + ".")}
+    ),
+}))
+"""
+
+
+def probe() -> dict:
+    env = {
+        **os.environ,
+        "ATHLETICA_DATABASE_URL": os.environ.get("ATHLETICA_DATABASE_URL", "sqlite://"),
+        "ATHLETICA_REDIS_URL": os.environ.get("ATHLETICA_REDIS_URL", "redis://127.0.0.1:1/0"),
+    }
+    code = f"FORBIDDEN = {FORBIDDEN!r}\n{PROBE}"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"API startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check API startup time, RSS and imports")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-rss-mb", type=float, help="fail above this steady-state RSS")
+    parser.add_argument("--max-ready-seconds", type=float, help="fail above this median")
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(args.repeat)]
+    ready = statistics.median(run["ready_seconds"] for run in runs)
+    imported = statistics.median(run["import_seconds"] for run in runs)
+    rss = max(run["rss_mb"] for run in runs)
+    print(
+        f"import {imported * 1000:.0f}ms  ready {ready * 1000:.0f}ms  "
+        f"rss {rss:.1f} MB  modules {runs[0]['modules']}"
+    )
+
+    failures = []
+    forbidden = sorted({name for run in runs for name in run["forbidden"]})
+    if forbidden:
+        failures.append(f"worker-only modules imported by the API: {', '.join(forbidden)}")
+    if args.max_rss_mb is not None and rss > args.max_rss_mb:
+        failures.append(f"RSS {rss:.1f} MB above {args.max_rss_mb} MB")
+    if args.max_ready_seconds is not None and ready > args.max_ready_seconds:
+        failures.append(f"startup {ready:.2f}s above {args.max_ready_seconds}s")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks.fake_whoop import start_fake_whoop
+
+# End-to-end WHOOP sync against the local stand-in: token exchange, paginated
+# fetches (with injected latency, 429s and token revocation), ingest and the
+# recompute it triggers. The server must be up before the app reads settings.
+parser = argparse.ArgumentParser(description="Benchmark WHOOP sync against a fake API")
+parser.add_argument("--days", type=int, default=180, help="days of history served")
+parser.add_argument("--repeat", type=int, default=5, help="incremental syncs after the first")
+parser.add_argument("--concurrency", type=int, default=4, help="parallel fetch-only clients")
+parser.add_argument("--latency-ms", type=float, default=20.0)
+parser.add_argument("--jitter-ms", type=float, default=10.0)
+parser.add_argument("--rate-limit", type=int, default=0, help="requests per window (0: off)")
+parser.add_argument("--rate-window", type=float, default=1.0)
+parser.add_argument("--token-requests", type=int, default=0, help="revoke tokens after N calls")
+parser.add_argument("--database-url", help="SQLAlchemy URL of an empty database")
+parser.add_argument("--redis-url", default="redis://127.0.0.1:1/0")
+parser.add_argument("--output", help="write results as JSON")
+ARGS = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+if ARGS.token_requests and ARGS.concurrency > 1 and ARGS.redis_url == parser.get_default("redis_url"):
+    # Refresh tokens rotate; without the Redis refresh lock parallel clients
+    # race on the same one and all but the first get invalid_grant.
+    parser.error("--token-requests with --concurrency > 1 needs a reachable --redis-url")
+
+SERVER = start_fake_whoop(
+    days=ARGS.days,
+    latency_ms=ARGS.latency_ms,
+    jitter_ms=ARGS.jitter_ms,
+    rate_limit=ARGS.rate_limit,
+    rate_window=ARGS.rate_window,
+    token_requests=ARGS.token_requests,
+)
+if not ARGS.database_url:
+    ARGS.database_url = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="athletica-whoop-"), "bench.db"
+    )
+os.environ["ATHLETICA_DATABASE_URL"] = ARGS.database_url
+os.environ["ATHLETICA_REDIS_URL"] = ARGS.redis_url
+os.environ["ATHLETICA_WHOOP_API_BASE_URL"] = SERVER.url
+os.environ["ATHLETICA_WHOOP_TOKEN_URL"] = f"{SERVER.url}/oauth/oauth2/token"
+os.environ["ATHLETICA_WHOOP_CLIENT_ID"] = "bench"
+os.environ["ATHLETICA_WHOOP_CLIENT_SECRET"] = "bench"
+os.environ["ATHLETICA_WHOOP_SYNC_DAYS"] = "30"
+os.environ["ATHLETICA_WHOOP_ARCHIVE_DIR"] = tempfile.mkdtemp(prefix="athletica-archive-")
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.integrations.whoop_client import WhoopClient, exchange_code_for_token  # noqa: E402
+from app.services.whoop_oauth import (  # noqa: E402
+    _upsert_token,
+    force_refresh_token,
+    get_valid_token,
+)
+from app.workers.celery_app import celery_app  # noqa: E402
+from app.workers.tasks import _sync_whoop  # noqa: E402
+
+
+def _run(fn) -> dict:
+    SERVER.reset_stats()
+    started = time.perf_counter()
+    outcome = fn()
+    seconds = time.perf_counter() - started
+    stats = SERVER.snapshot()
+    return {
+        "seconds": round(seconds, 3),
+        "requests": stats.get("requests", 0),
+        "records": stats.get("records", 0),
+        "rate_limited": stats.get("status_429", 0),
+        "unauthorized": stats.get("status_401", 0),
+        "refreshes": stats.get("refreshes", 0),
+        "records_per_second": round(stats.get("records", 0) / seconds, 1) if seconds else None,
+        "outcome": outcome,
+    }
+
+
+def _fetch_window(days: int) -> int:
+    end = datetime.now(timezone.utc)
+    start = (end - timedelta(days=days)).isoformat().replace("+00:00", "Z")
+    end_stamp = end.isoformat().replace("+00:00", "Z")
+    with SessionLocal() as db:
+        token = get_valid_token(db)
+        total = 0
+        for name in ("get_cycles", "get_recoveries", "get_sleeps", "get_workouts"):
+            # Same recovery as the sync task: one forced refresh per 401.
+            try:
+                records = getattr(WhoopClient(token.access_token), name)(start=start, end=end_stamp)
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 401:
+                    raise
+                token = force_refresh_token(db, token.access_token)
+                records = getattr(WhoopClient(token.access_token), name)(start=start, end=end_stamp)
+            total += len(records["records"])
+    return total
+
+
+def main() -> int:
+    celery_app.conf.task_always_eager = True
+    for name in ("app.api.cache", "app.core.redis", "app.services.whoop_oauth", "app.workers.monitoring"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        _upsert_token(db, exchange_code_for_token("bench"))
+
+    results = {"initial_sync": _run(lambda: _sync_whoop()["status"])}
+    incremental = [_run(lambda: _sync_whoop()["status"]) for _ in range(ARGS.repeat)]
+    if incremental:
+        results["incremental_sync"] = {
+            "repeat": len(incremental),
+            "median_seconds": round(statistics.median(r["seconds"] for r in incremental), 3),
+            "requests": max(r["requests"] for r in incremental),
+            "rate_limited": sum(r["rate_limited"] for r in incremental),
+            "refreshes": sum(r["refreshes"] for r in incremental),
+        }
+
+    def concurrent() -> int:
+        with ThreadPoolExecutor(ARGS.concurrency) as pool:
+            return sum(pool.map(_fetch_window, [ARGS.days] * ARGS.concurrency))
+
+    results["concurrent_fetch"] = {"clients": ARGS.concurrency, **_run(concurrent)}
+
+    for name, result in results.items():
+        print(f"{name:<18} {json.dumps(result)}")
+    if ARGS.output:
+        with open(ARGS.output, "w") as fh:
+            json.dump({"args": vars(ARGS), "results": results}, fh, indent=2)
+    SERVER.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())